@@ -25,6 +25,7 @@ import subprocess
 from os import set_inheritable
 
 from myhdl._intbv import intbv
+from myhdl._xbv import xbv, _newxbv, _fromHex, _toHex
 from myhdl import _simulator, CosimulationError
 
 _MAXLINE = 4096
@@ -145,7 +146,14 @@ class Cosimulation(object):
         e = buf.split()
         for i in range(1, len(e), 2):
             s, v = self._toSigDict[e[i]], e[i + 1]
-            if v in 'zZ':
+            if isinstance(s._val, xbv):
+                # four-state signals take x and z digits as they come
+                val, xmask = _fromHex(v)
+                if not xmask and s._min is not None and s._min < 0:
+                    if val >= (1 << (s._nrbits - 1)):
+                        val |= (-1 << s._nrbits)
+                next = _newxbv(val, xmask)
+            elif v in 'zZ':
                 next = None
             elif v in 'xX':
                 next = s._init
@@ -170,6 +178,10 @@ class Cosimulation(object):
         if self._hasChange:
             self._hasChange = 0
             for s in self._fromSigs:
+                if isinstance(s._val, xbv) and s._val._xmask:
+                    buflist.append(_toHex(s._val._val, s._val._xmask,
+                                          s._nrbits))
+                    continue
                 v = int(s._val)
                 # signed support
                 if s._nrbits and v < 0:
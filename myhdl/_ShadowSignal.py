@@ -25,8 +25,8 @@ import warnings
 from copy import deepcopy
 
 from myhdl._Signal import _Signal
-from myhdl._Waiter import _SignalWaiter, _SignalTupleWaiter
 from myhdl._intbv import intbv
+from myhdl._xbv import xbv
 from myhdl._simulator import _siglist
 from myhdl._bin import bin
 
@@ -49,7 +49,7 @@ class _ShadowSignal(_Signal):
 
 class _SliceSignal(_ShadowSignal):
 
-    __slots__ = ('_sig', '_left', '_right')
+    __slots__ = ('_sig', '_left', '_right', '_shift', '_mask')
 
     def __init__(self, sig, left, right=None):
         # XXX error checks
@@ -61,11 +61,32 @@ class _SliceSignal(_ShadowSignal):
         sig._read = True
         self._left = left
         self._right = right
+        # the position of the slice in the parent value
         if right is None:
-            gen = self._genfuncIndex()
+            self._shift = left
+            self._mask = 1
         else:
-            gen = self._genfuncSlice()
-        self._waiter = _SignalWaiter(gen)
+            self._shift = right
+            self._mask = (1 << (left - right)) - 1
+        sig._addShadow(self)
+
+    def _propagate(self, sig):
+        """ Follow a change of the parent signal. """
+        val = sig._val
+        if isinstance(val, xbv):
+            if self._right is None:
+                self._setNextVal(val[self._left])
+            else:
+                self._setNextVal(val[self._left:self._right])
+        else:
+            if isinstance(val, intbv):
+                val = val._val
+            val = val >> self._shift & self._mask
+            if self._right is None:
+                self._next = bool(val)
+            else:
+                self._next._val = val
+        _siglist.append(self)
 
     def __repr__(self):
         if self._right is None:
@@ -73,20 +94,6 @@ class _SliceSignal(_ShadowSignal):
         else:
             return repr(self._sig) + '({}, {})'.format(self._left, self._right)
 
-    def _genfuncIndex(self):
-        sig, index = self._sig, self._left
-        set_next = _Signal.next.fset
-        while 1:
-            set_next(self, sig[index])
-            yield sig
-
-    def _genfuncSlice(self):
-        sig, left, right = self._sig, self._left, self._right
-        set_next = _Signal.next.fset
-        while 1:
-            set_next(self, sig[left:right])
-            yield sig
-
     def _setName(self, hdl):
         # if we depend on a ShadowSignal ourselves
         # it would be nice if we 'resolve' the slicing chain
@@ -144,7 +151,7 @@ class _SliceSignal(_ShadowSignal):
 
 class ConcatSignal(_ShadowSignal):
 
-    __slots__ = ('_args', '_sigargs', '_initval')
+    __slots__ = ('_args', '_sigargs', '_initval', '_fields', '_pending')
 
     def __init__(self, *args):
         assert len(args) >= 2
@@ -153,6 +160,7 @@ class ConcatSignal(_ShadowSignal):
 
         nrbits = 0
         val = 0
+        widths = []
         for a in args:
             if isinstance(a, intbv):
                 w = a._nrbits
@@ -175,35 +183,43 @@ class ConcatSignal(_ShadowSignal):
                                 % type(a))
             nrbits += w
             val = val << w | v & (1 << w) - 1
+            widths.append(w)
         self._initval = val
         ini = intbv(val)[nrbits:]
         _ShadowSignal.__init__(self, ini)
-        gen = self.genfunc()
-        self._waiter = _SignalTupleWaiter(gen)
-
-    def genfunc(self):
-        set_next = _Signal.next.fset
-        args = self._args
-        sigargs = self._sigargs
-        nrbits = self._nrbits
-        newval = intbv(self._initval)[nrbits:]
-        while 1:
-            hi = nrbits
-            for a in args:
-                if isinstance(a, bool):
-                    w = 1
-                else:
-                    w = len(a)
-                lo = hi - w
-                # note: 'a in sigargs' is equivalence check, not identity
-                if isinstance(a, _Signal):
-                    if isinstance(a._val, intbv):
-                        newval[hi:lo] = a[w:]
-                    else:
-                        newval[hi:lo] = a
-                hi = lo
-            set_next(self, newval)
-            yield sigargs
+        self._pending = False
+        # the (offset, mask) fields of each signal argument
+        self._fields = fields = {}
+        lo = nrbits
+        for a, w in zip(args, widths):
+            lo -= w
+            if isinstance(a, _Signal):
+                if id(a) not in fields:
+                    fields[id(a)] = []
+                    a._addShadow(self)
+                fields[id(a)].append((lo, ((1 << w) - 1) << lo))
+
+    def _propagate(self, sig):
+        """ Patch the field of an argument signal that has changed. """
+        v = sig._val
+        if isinstance(v, intbv):
+            v = v._val
+        next = self._next
+        val = next._val
+        for lo, mask in self._fields[id(sig)]:
+            val = val & ~mask | (v << lo) & mask
+        next._val = val
+        if not self._pending:
+            self._pending = True
+            _siglist.append(self)
+
+    def _update(self):
+        self._pending = False
+        return _ShadowSignal._update(self)
+
+    def _clear(self):
+        _ShadowSignal._clear(self)
+        self._pending = False
 
     def _markRead(self):
         self._read = True
@@ -360,7 +376,7 @@ def TristateSignal(val):
 
 class _TristateSignal(_ShadowSignal):
 
-    __slots__ = ('_drivers', '_orival')
+    __slots__ = ('_drivers', '_orival', '_active', '_pending')
 
     def __init__(self, val):
         self._drivers = []
@@ -369,29 +385,44 @@ class _TristateSignal(_ShadowSignal):
         self._orival = deepcopy(val)  # keep for drivers
         # reset signal values to None
         self._next = self._val = self._init = None
-        self._waiter = _SignalTupleWaiter(self._resolve())
+        # the drivers with a value different from None
+        self._active = {}
+        self._pending = False
 
     def driver(self):
         d = _TristateDriver(self)
         self._drivers.append(d)
+        d._addShadow(self)
         return d
 
-    def _resolve(self):
-        # set_next = _ShadowSignal._set_next
-        senslist = self._drivers
-        while 1:
-            yield senslist
-            res = None
-            for d in senslist:
-                if res is None:
-                    res = d._val
-                elif d._val is not None:
-                    warnings.warn("Bus contention", category=BusContentionWarning)
-                    res = None
-                    break
-            self._next = res
+    def _propagate(self, d):
+        """ Keep track of the active drivers after a driver change. """
+        active = self._active
+        if d._val is None:
+            active.pop(id(d), None)
+        else:
+            active[id(d)] = d
+        if not self._pending:
+            self._pending = True
             _siglist.append(self)
 
+    def _update(self):
+        self._pending = False
+        active = self._active
+        if len(active) == 1:
+            for d in active.values():
+                self._next = d._val
+        else:
+            if active:
+                warnings.warn("Bus contention", category=BusContentionWarning)
+            self._next = None
+        return _ShadowSignal._update(self)
+
+    def _clear(self):
+        _ShadowSignal._clear(self)
+        self._active.clear()
+        self._pending = False
+
     def toVerilog(self):
         lines = []
         for d in self._drivers:
@@ -26,13 +26,16 @@ posedge -- callable to model a rising edge on a signal in a yield statement
 negedge -- callable to model a falling edge on a signal in a yield statement
 
 """
+from collections import deque
 from copy import copy, deepcopy
+from itertools import repeat
 
 from myhdl import _simulator as sim
 from myhdl._simulator import _futureEvents
 from myhdl._simulator import _siglist
 from myhdl._simulator import _signals
 from myhdl._intbv import intbv
+from myhdl._xbv import xbv, _split
 from myhdl._bin import bin
 
 # from myhdl._enum import EnumItemType
@@ -58,6 +61,22 @@ class _WaiterList(list):
             self[:] = [w for w in self if not w.hasRun]
 
 
+class _Subscribers(object):
+
+    """ Persistent waiters on the triggers of a signal.
+
+    Unlike the waiters in a _WaiterList, subscribers stay registered after
+    they are triggered.
+    """
+
+    __slots__ = ('event', 'posedge', 'negedge')
+
+    def __init__(self):
+        self.event = []
+        self.posedge = []
+        self.negedge = []
+
+
 class _PosedgeWaiterList(_WaiterList):
 
     def __init__(self, sig):
@@ -100,6 +119,8 @@ def Signal(val=None, delay=None):
         if delay < 0:
             raise TypeError("Signal: delay should be >= 0")
         return _DelayedSignal(val, delay)
+    elif isinstance(val, xbv):
+        return _XSignal(val)
     else:
         return _Signal(val)
 
@@ -120,7 +141,7 @@ class _Signal(object):
                  '_setNextVal', '_copyVal2Next', '_printVcd',
                  '_driven', '_read', '_name', '_used', '_inList',
                  '_waiter', 'toVHDL', 'toVerilog', '_slicesigs',
-                 '_numeric'
+                 '_numeric', '_subs', '_shadows', '_history'
                  )
 
     def __init__(self, val=None):
@@ -161,6 +182,7 @@ class _Signal(object):
             self._type = type(val)
             if isinstance(val, EnumItemType):
                 self._setNextVal = self._setNextNonmutable
+                self._printVcd = self._printVcdEnum
             else:
                 self._setNextVal = self._setNextMutable
             if hasattr(val, '_nrbits'):
@@ -171,6 +193,9 @@ class _Signal(object):
         self._code = ""
         self._slicesigs = []
         self._tracing = 0
+        self._subs = None
+        self._shadows = None
+        self._history = None
         _signals.append(self)
 
     def _clear(self):
@@ -183,6 +208,9 @@ class _Signal(object):
         self._read = False  # dont clear self._used
         self._inList = False
         self._numeric = True
+        self._subs = None
+        if self._history is not None:
+            self._history.clear()
         for s in self._slicesigs:
             s._clear()
 
@@ -197,6 +225,13 @@ class _Signal(object):
             elif not next and val:
                 waiters.extend(self._negedgeWaiters[:])
                 del self._negedgeWaiters[:]
+            subs = self._subs
+            if subs is not None:
+                waiters.extend(subs.event)
+                if not val and next:
+                    waiters.extend(subs.posedge)
+                elif not next and val:
+                    waiters.extend(subs.negedge)
             if next is None:
                 self._val = None
             elif isinstance(val, intbv):
@@ -207,10 +242,43 @@ class _Signal(object):
                 self._val = deepcopy(next)
             if self._tracing:
                 self._printVcd()
+            if self._shadows is not None:
+                for s in self._shadows:
+                    s._propagate(self)
             return waiters
         else:
             return []
 
+    def _addShadow(self, s):
+        """ Add a shadow signal that follows the value of this signal.
+
+        On each change, its _propagate method is called with this signal.
+        It sets its next value and adds itself to the signals to update in
+        the same delta cycle, so there is no separate process.
+        """
+        if self._shadows is None:
+            self._shadows = []
+        self._shadows.append(s)
+
+    def _changed(self):
+        """ Return True if the next value differs from the current one. """
+        return self._val != self._next
+
+    def _subscribe(self, waiter, trigger):
+        """ Subscribe a waiter persistently to a trigger of this signal.
+
+        trigger -- the posedge or negedge waiter list, or the signal itself
+                   for any event
+        """
+        if self._subs is None:
+            self._subs = _Subscribers()
+        if trigger is self._posedgeWaiters:
+            self._subs.posedge.append(waiter)
+        elif trigger is self._negedgeWaiters:
+            self._subs.negedge.append(waiter)
+        else:
+            self._subs.event.append(waiter)
+
     # support for the 'val' attribute
     @property
     def val(self):
@@ -241,6 +309,52 @@ class _Signal(object):
     def negedge(self):
         return self._negedgeWaiters
 
+    # value history and monitors, for testbench checks
+    def history(self, depth, edge=None):
+        """ Keep the past values of the signal, to be read with past.
+
+        depth -- the number of past values to keep
+        edge -- optional edge of a clock, e.g. clk.posedge: keep the values
+                at each edge instead of the values after each change
+        """
+        if not isinstance(depth, int) or depth < 1:
+            raise ValueError("history depth should be a positive integer")
+        if edge is not None and not isinstance(edge, (_PosedgeWaiterList,
+                                                      _NegedgeWaiterList)):
+            raise TypeError("history edge should be a posedge or negedge")
+        h = self._history
+        if h is not None:
+            h.src._shadows.remove(h)
+        self._history = h = _History(self, depth, edge)
+        h.src._addShadow(h)
+
+    def on_change(self, callback, when=None):
+        """ Call a function on each change of the value of the signal.
+
+        callback -- function called with the signal as argument, when
+                    the new value is committed
+        when -- optional condition on the new value: a function of the
+                value, or a value to compare with
+
+        Return the monitor, that has a remove method.
+        """
+        m = _Monitor(self, callback, when)
+        self._addShadow(m)
+        return m
+
+    def past(self, n=1):
+        """ Return the value n changes or clock edges ago.
+
+        past(0) is the current value, or the value at the last clock edge.
+        """
+        h = self._history
+        if h is None:
+            raise ValueError("past requires a history, see Signal.history")
+        if not isinstance(n, int) or not 0 <= n < len(h.values):
+            raise ValueError("past: %s is not in the history range [0, %s]"
+                             % (n, len(h.values) - 1))
+        return h.values[-1 - n]
+
     # support for the 'min' and 'max' attribute
     @property
     def max(self):
@@ -316,6 +430,9 @@ class _Signal(object):
     def _printVcdStr(self):
         print("s%s %s" % (str(self._val), self._code), file=sim._tf)
 
+    def _printVcdEnum(self):
+        print(self._val._vcd, self._code, file=sim._tf)
+
     def _printVcdHex(self):
         if self._val is None:
             print("sz %s" % self._code, file=sim._tf)
@@ -585,9 +702,90 @@ class _Signal(object):
         self.toVerilog = toVerilog
 
 
+def _level(val, xmask):
+    """ Return the edge level of a four-state value: 0, 1 or None for X. """
+    if val & ~xmask:
+        return 1
+    if xmask:
+        return None
+    return 0
+
+
+class _XSignal(_Signal):
+
+    """ Signal with a four-state xbv value.
+
+    The value is compared and copied including its unknown bits, and an
+    edge is detected on a change between 0, 1 and X, as in Verilog.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, val=None):
+        _Signal.__init__(self, val)
+        self._setNextVal = self._setNextXbv
+        if self._nrbits:
+            self._printVcd = self._printVcdXbv
+
+    def _update(self):
+        val, next = self._val, self._next
+        if val._val != next._val or val._xmask != next._xmask:
+            waiters = self._eventWaiters[:]
+            del self._eventWaiters[:]
+            old = _level(val._val, val._xmask)
+            new = _level(next._val, next._xmask)
+            posedge = old != new and old != 1 and new != 0
+            negedge = old != new and old != 0 and new != 1
+            if posedge:
+                waiters.extend(self._posedgeWaiters[:])
+                del self._posedgeWaiters[:]
+            elif negedge:
+                waiters.extend(self._negedgeWaiters[:])
+                del self._negedgeWaiters[:]
+            subs = self._subs
+            if subs is not None:
+                waiters.extend(subs.event)
+                if posedge:
+                    waiters.extend(subs.posedge)
+                elif negedge:
+                    waiters.extend(subs.negedge)
+            val._val = next._val
+            val._xmask = next._xmask
+            if self._tracing:
+                self._printVcd()
+            if self._shadows is not None:
+                for s in self._shadows:
+                    s._propagate(self)
+            return waiters
+        else:
+            return []
+
+    def _changed(self):
+        return not self._val.same(self._next)
+
+    def _setNextXbv(self, val):
+        # None drives all bits to Z, as for other signals
+        if val is None:
+            val = xmask = (1 << self._nrbits) - 1 if self._nrbits else -1
+        elif isinstance(val, (int, intbv)):
+            val, xmask = _split(val)
+            if xmask and self._nrbits:
+                xmask &= (1 << self._nrbits) - 1
+        else:
+            raise TypeError("Expected int or intbv, got %s" % type(val))
+        next = self._next
+        next._val = val
+        next._xmask = xmask
+        next._handleBounds()
+
+    def _printVcdXbv(self):
+        print("b%s %s" % (self._val._bits(self._nrbits), self._code),
+              file=sim._tf)
+
+
 class _DelayedSignal(_Signal):
 
-    __slots__ = ('_nextZ', '_delay', '_timeStamp',
+    __slots__ = ('_nextZ', '_delay', '_wrap',
                  )
 
     def __init__(self, val=None, delay=1):
@@ -600,19 +798,24 @@ class _DelayedSignal(_Signal):
         _Signal.__init__(self, val)
         self._nextZ = val
         self._delay = delay
-        self._timeStamp = 0
+        self._wrap = _SignalWrap(self)
+
+    def _clear(self):
+        _Signal._clear(self)
+        self._nextZ = deepcopy(self._init)
+        self._wrap = _SignalWrap(self)
 
     def _update(self):
+        # only a change of the next value starts a new transaction, that
+        # replaces the pending one
         if self._next != self._nextZ:
-            self._timeStamp = sim._time
-        self._nextZ = self._next
-        t = sim._time + self._delay
-        _schedule((t, _SignalWrap(self, self._next, self._timeStamp)))
+            self._nextZ = copy(self._next)
+            self._wrap.schedule(self._nextZ, sim._time + self._delay)
         return []
 
-    def _apply(self, next, timeStamp):
+    def _apply(self, next):
         val = self._val
-        if timeStamp == self._timeStamp and val != next:
+        if val != next:
             waiters = self._eventWaiters[:]
             del self._eventWaiters[:]
             if not val and next:
@@ -621,9 +824,19 @@ class _DelayedSignal(_Signal):
             elif not next and val:
                 waiters.extend(self._negedgeWaiters[:])
                 del self._negedgeWaiters[:]
+            subs = self._subs
+            if subs is not None:
+                waiters.extend(subs.event)
+                if not val and next:
+                    waiters.extend(subs.posedge)
+                elif not next and val:
+                    waiters.extend(subs.negedge)
             self._val = copy(next)
             if self._tracing:
                 self._printVcd()
+            if self._shadows is not None:
+                for s in self._shadows:
+                    s._propagate(self)
             return waiters
         else:
             return []
@@ -640,13 +853,117 @@ class _DelayedSignal(_Signal):
 
 class _SignalWrap(object):
 
-    def __init__(self, sig, next, timeStamp):
+    """ The pending transaction of a delayed signal.
+
+    There is at most one pending transaction per signal, and it is in
+    the future events at most once: when a new transaction replaces it,
+    the queued event moves itself to the new time when it comes up.
+    """
+
+    __slots__ = ('sig', 'next', 'time', 'queued')
+
+    def __init__(self, sig):
         self.sig = sig
+        self.next = None
+        self.time = None    # time of the pending transaction
+        self.queued = None  # latest time of a queued event
+
+    def schedule(self, next, t):
         self.next = next
-        self.timeStamp = timeStamp
+        self.time = t
+        queued = self.queued
+        if queued is None or t < queued:
+            # the delay may have been reduced
+            _schedule((t, self))
+            if queued is None:
+                self.queued = t
 
     def apply(self):
-        return self.sig._apply(self.next, self.timeStamp)
+        t = sim._time
+        if t == self.queued:
+            self.queued = None
+        if self.time is None:
+            return []
+        if t < self.time:
+            if self.queued is None:
+                _schedule((self.time, self))
+                self.queued = self.time
+            return []
+        self.time = None
+        return self.sig._apply(self.next)
+
+
+def _frozen(val):
+    """ Return a copy of a value that may change in place. """
+    if isinstance(val, intbv):
+        return copy(val)
+    return val
+
+
+class _History(object):
+
+    """ Ring buffer of the past values of a signal.
+
+    It follows the signal itself, or the clock signal of an edge, as a
+    shadow, so signals without a history don't pay for it.
+    """
+
+    __slots__ = ('sig', 'src', 'posedge', 'values')
+
+    def __init__(self, sig, depth, edge=None):
+        self.sig = sig
+        if edge is None:
+            self.src = sig
+            self.posedge = None
+        else:
+            self.src = edge.sig
+            self.posedge = isinstance(edge, _PosedgeWaiterList)
+        self.values = deque(maxlen=depth + 1)
+        self.clear()
+
+    def clear(self):
+        val = _frozen(self.sig._val)
+        self.values.extend(repeat(val, self.values.maxlen))
+
+    def _propagate(self, src):
+        posedge = self.posedge
+        if posedge is not None and bool(src._val) != posedge:
+            return
+        self.values.append(_frozen(self.sig._val))
+
+
+class _Monitor(object):
+
+    """ A function called on the value changes of a signal.
+
+    It follows the signal as a shadow, so signals without monitors are
+    not slowed down.
+    """
+
+    __slots__ = ('sig', 'callback', 'when')
+
+    def __init__(self, sig, callback, when=None):
+        if not callable(callback):
+            raise TypeError("on_change callback should be callable")
+        self.sig = sig
+        self.callback = callback
+        if when is not None and not callable(when):
+            value = when
+
+            def when(val):
+                return val == value
+        self.when = when
+
+    def remove(self):
+        """ Stop calling the function. """
+        shadows = self.sig._shadows
+        if shadows is not None and self in shadows:
+            shadows.remove(self)
+
+    def _propagate(self, sig):
+        when = self.when
+        if when is None or when(sig._val):
+            self.callback(sig)
 
 
 class Constant(_Signal):
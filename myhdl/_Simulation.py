@@ -26,12 +26,15 @@ from myhdl import StopSimulation, _SuspendSimulation
 from myhdl import _simulator, SimulationError
 from myhdl._Cosimulation import Cosimulation
 from myhdl._simulator import _signals, _siglist, _futureEvents
+from myhdl._Signal import _Signal
 from myhdl._Waiter import _Waiter
 from myhdl._Waiter import _inferWaiter
 from myhdl._Waiter import _SignalTupleWaiter
 from myhdl._util import _printExcInfo
 from myhdl._instance import _Instantiator
+from myhdl._always import _Always
 from myhdl._block import _Block
+from myhdl._quiescence import _fastForward
 
 schedule = _futureEvents.append
 
@@ -43,6 +46,9 @@ class _error:
 _error.ArgType = "Inappriopriate argument type"
 _error.MultipleCosim = "Only a single cosimulator argument allowed"
 _error.DuplicatedArg = "Duplicated argument"
+_error.StepClock = "step clock argument should be a Signal"
+_error.StepCount = "step count should be at least 1"
+_error.TimeInPast = "advance_to time is in the past"
 
 # flatten Block objects out
 
@@ -69,24 +75,44 @@ class Simulation(object):
 
     Methods:
     run -- run a simulation for some duration
+    step -- run a simulation for a number of clock cycles
+    advance_to -- run a simulation up to some time
+    watch -- call a function or break on the value changes of a signal
 
     """
     _no_of_instances = 0
 
-    def __init__(self, *args):
+    def __init__(self, *args, fsm_dispatch=False, specialize=False):
         """ Construct a simulation object.
 
         *args -- list of arguments. Each argument is a generator or
                  a nested sequence of generators.
+        fsm_dispatch -- run enum state decoding chains in always blocks
+                        as table lookups (default: off)
+        specialize -- run always blocks as specialised code that accesses
+                      signal values directly (default: off)
 
         """
         _simulator._time = 0
         arglist = _flatten(*args)
-        self._waiters, self._cosims = _makeWaiters(arglist)
+        for arg in arglist:
+            if isinstance(arg, _Always):
+                arg._optimize(fsm_dispatch=fsm_dispatch,
+                              specialize=specialize)
+        self._waiters, self._cosims, procs = _makeWaiters(arglist)
+        # fast-forwarding of quiescent clock cycles, if opted in
+        self._fastForward = None
+        if not self._cosims:
+            self._fastForward = _fastForward(procs)
         if Simulation._no_of_instances > 0:
             raise SimulationError(_error.MultipleSim)
         Simulation._no_of_instances += 1
         self._finished = False
+        self._monitors = []
+        self._stop = _Waiter(None)
+        self._stop.hasRun = 1
+        self._kernel = None
+        self._exc = []
         del _futureEvents[:]
         del _siglist[:]
 
@@ -100,6 +126,8 @@ class Simulation(object):
         if _simulator._tracing:
             _simulator._tracing = 0
             _simulator._tf.close()
+        for m in self._monitors:
+            m.remove()
         # clean up for potential new run with same signals
         for s in _signals:
             s._clear()
@@ -109,6 +137,28 @@ class Simulation(object):
     def quit(self):
         self._finalize()
 
+    def watch(self, sig, callback=None, when=None):
+        """ Watch the value changes of a signal during this simulation.
+
+        sig -- the signal to watch
+        callback -- function called with the signal on each change; by
+                    default, the simulation is suspended at the end of
+                    the time step, as with a duration in run
+        when -- optional condition on the new value: a function of the
+                value, or a value to compare with
+
+        Return the monitor, that has a remove method.
+        """
+        if callback is None:
+            def callback(sig):
+                if not self._exc:
+                    self._exc.append(_SuspendSimulation(
+                        "Watched signal %s changed to %s at time %s"
+                        % (sig._name or repr(sig), sig._val, _simulator._time)))
+        m = sig.on_change(callback, when)
+        self._monitors.append(m)
+        return m
+
     def run(self, duration=None, quiet=0):
         """ Run the simulation for some duration.
 
@@ -116,129 +166,239 @@ class Simulation(object):
         quiet -- don't print StopSimulation messages (default: off)
 
         """
+        maxTime = suspend = None
+        if duration and not self._finished:
+            stop = _Waiter(None)
+            stop.hasRun = 1
+            maxTime = _simulator._time + duration
+            schedule((maxTime, stop))
+            suspend = _SuspendSimulation("Simulated %s timesteps" % duration)
+        return self._run(maxTime, quiet, suspend)
+
+    def step(self, n=1, clock=None, quiet=0):
+        """ Run the simulation for a number of clock cycles.
+
+        n -- number of rising edges of the clock (default: 1)
+        clock -- the clock signal
+        quiet -- don't print StopSimulation messages (default: off)
 
+        The simulation returns at the end of the time step of the last
+        edge, when the signals have settled. Signals that are driven
+        before the next call change in a new delta cycle at that time.
+        Return 1 while the simulation can continue, 0 when it is finished.
+        """
+        if not isinstance(clock, _Signal):
+            raise SimulationError(_error.StepClock, repr(clock))
+        if n < 1:
+            raise SimulationError(_error.StepCount, repr(n))
+        return self._run(None, quiet, clock=clock, edges=n)
+
+    def advance_to(self, t, quiet=0):
+        """ Run the simulation up to and including time t.
+
+        t -- the absolute simulation time to advance to
+        quiet -- don't print StopSimulation messages (default: off)
+
+        Return 1 while the simulation can continue, 0 when it is finished.
+        """
+        if t < _simulator._time:
+            raise SimulationError(_error.TimeInPast,
+                                  "%s < %s" % (t, _simulator._time))
+        if self._cosims and not self._finished:
+            # the cosimulator follows each time step of the simulator
+            schedule((t, self._stop))
+        return self._run(t, quiet)
+
+    def _run(self, maxTime, quiet, suspend=None, clock=None, edges=0):
+        """ Run the kernel and handle the ways it can return. """
         # If the simulation is already finished, raise StopSimulation immediately
         # From this point it will propagate to the caller, that can catch it.
         if self._finished:
             raise StopSimulation("Simulation has already finished")
+        tracing = _simulator._tracing
+        kernel = self._kernel
+        try:
+            if kernel is None:
+                kernel = self._kernel = self._advance()
+                next(kernel)
+            kernel.send((maxTime, clock, edges))
+            if suspend is not None:
+                raise suspend
+
+        except _SuspendSimulation as e:
+            if e is not suspend:
+                # raised in the kernel, that has ended
+                self._kernel = None
+            if not quiet:
+                _printExcInfo()
+            if tracing:
+                _simulator._tf.flush()
+            return 1
+
+        except StopSimulation:
+            self._kernel = None
+            if not quiet:
+                _printExcInfo()
+            self._finalize()
+            self._finished = True
+            return 0
+
+        except Exception as e:
+            self._kernel = None
+            if tracing:
+                _simulator._tf.flush()
+            # if the exception came from a yield, make sure we can resume
+            exc = self._exc
+            if exc and e is exc[0]:
+                pass  # don't finalize
+            else:
+                self._finalize()
+            # now reraise the exepction
+            raise
+
+        if tracing:
+            _simulator._tf.flush()
+        return 1
+
+    def _advance(self):
+        """ The simulation kernel, as a generator.
+
+        The limits of a run are sent to it as a tuple:
+        maxTime -- stop at the end of this time step (None: never)
+        clock -- stop at the end of the time step of a rising edge of
+                 this signal ...
+        edges -- ... when it is the last of this number of rising edges
+
+        The generator yields when a limit is reached, and keeps its state
+        for the next run, so that short runs have no setup. Anything else,
+        like the end of the simulation, is raised and ends the generator.
+        The clock is sampled at the end of the time steps, so it is not
+        fast-forwarded.
+        """
         waiters = self._waiters
-        maxTime = None
-        if duration:
-            stop = _Waiter(None)
-            stop.hasRun = 1
-            maxTime = _simulator._time + duration
-            schedule((maxTime, stop))
         cosims = self._cosims
-        t = _simulator._time
+        ff = self._fastForward
         actives = {}
         tracing = _simulator._tracing
         tracefile = _simulator._tf
-        exc = []
+        exc = self._exc = []
         _pop = waiters.pop
         _append = waiters.append
         _extend = waiters.extend
+        stop = True
 
         while 1:
-            try:
-
-                for s in _siglist:
-                    _extend(s._update())
-                del _siglist[:]
-
-                while waiters:
-                    waiter = _pop()
-                    try:
-                        waiter.next(waiters, actives, exc)
-                    except StopIteration:
-                        continue
+            if stop:
+                maxTime, clock, edges = yield
+                t = _simulator._time
+                if clock is not None:
+                    level = clock._val
+                stop = False
+
+            _simulator._delta += 1
+
+            if ff is not None:
+                ff.check(_siglist)
+            for s in _siglist:
+                _extend(s._update())
+            del _siglist[:]
+
+            while waiters:
+                waiter = _pop()
+                try:
+                    waiter.next(waiters, actives, exc)
+                except StopIteration:
+                    continue
 
-                if cosims:
-                    any_cosim_changes = False
-                    for cosim in cosims:
-                        any_cosim_changes = \
-                            any_cosim_changes or cosim._hasChange
+            if cosims:
+                any_cosim_changes = False
+                for cosim in cosims:
+                    any_cosim_changes = \
+                        any_cosim_changes or cosim._hasChange
+                for cosim in cosims:
+                    cosim._get()
+                if _siglist or any_cosim_changes:
+                    # It should be safe to _put a cosim with no changes
+                    # because _put with the same values should be
+                    # idempotent. We need to _put them all here because
+                    # otherwise we can desync _get/_put.
                     for cosim in cosims:
-                        cosim._get()
-                    if _siglist or any_cosim_changes:
-                        # It should be safe to _put a cosim with no changes
-                        # because _put with the same values should be
-                        # idempotent. We need to _put them all here because
-                        # otherwise we can desync _get/_put.
-                        for cosim in cosims:
-                            cosim._put(t)
-                        continue
-                elif _siglist:
+                        cosim._put(t)
                     continue
+            elif _siglist:
+                continue
+
+            if actives:
+                for wl in actives.values():
+                    wl.purge()
+                actives = {}
+
+            # at this point it is safe to potentially suspend a simulation
+            if exc:
+                raise exc[0]
+            if clock is not None and clock._val != level:
+                level = clock._val
+                if level:
+                    edges -= 1
+                    if edges <= 0:
+                        stop = True
+                        continue
 
-                if actives:
-                    for wl in actives.values():
-                        wl.purge()
-                    actives = {}
-
-                # at this point it is safe to potentially suspend a simulation
-                if exc:
-                    raise exc[0]
-
-                # future events
-                if _futureEvents:
-                    if t == maxTime:
-                        raise _SuspendSimulation(
-                            "Simulated %s timesteps" % duration)
-                    _futureEvents.sort(key=itemgetter(0))
-                    t = _simulator._time = _futureEvents[0][0]
+            # future events
+            if _futureEvents:
+                if t == maxTime:
+                    stop = True
+                    continue
+                if ff is not None and clock is None:
+                    ff.advance(maxTime)
+                _futureEvents.sort(key=itemgetter(0))
+                if maxTime is not None and _futureEvents[0][0] > maxTime:
+                    t = _simulator._time = maxTime
                     if tracing:
                         print("#%s" % t, file=tracefile)
-                    if cosims:
-                        for cosim in cosims:
-                            cosim._put(t)
-                    while _futureEvents:
-                        newt, event = _futureEvents[0]
-                        if newt == t:
-                            if isinstance(event, _Waiter):
-                                _append(event)
-                            else:
-                                _extend(event.apply())
-                            del _futureEvents[0]
-                        else:
-                            break
-                else:
-                    raise StopSimulation("No more events")
-
-            except _SuspendSimulation:
-                if not quiet:
-                    _printExcInfo()
+                    stop = True
+                    continue
+                t = _simulator._time = _futureEvents[0][0]
                 if tracing:
-                    tracefile.flush()
-                return 1
-
-            except StopSimulation:
-                if not quiet:
-                    _printExcInfo()
-                self._finalize()
-                self._finished = True
-                return 0
-
-            except Exception as e:
+                    print("#%s" % t, file=tracefile)
+                if cosims:
+                    for cosim in cosims:
+                        cosim._put(t)
+                while _futureEvents:
+                    newt, event = _futureEvents[0]
+                    if newt == t:
+                        if isinstance(event, _Waiter):
+                            _append(event)
+                        else:
+                            _extend(event.apply())
+                            if ff is not None:
+                                ff.quiet = False
+                        del _futureEvents[0]
+                    else:
+                        break
+            elif maxTime is not None and t != maxTime:
+                t = _simulator._time = maxTime
                 if tracing:
-                    tracefile.flush()
-                # if the exception came from a yield, make sure we can resume
-                if exc and e is exc[0]:
-                    pass  # don't finalize
-                else:
-                    self._finalize()
-                # now reraise the exepction
-                raise
+                    print("#%s" % t, file=tracefile)
+                stop = True
+            else:
+                raise StopSimulation("No more events")
 
 
 def _makeWaiters(arglist):
     waiters = []
     ids = set()
     cosims = []
+    procs = []
     for arg in arglist:
         if isinstance(arg, GeneratorType):
             waiters.append(_inferWaiter(arg))
+        elif isinstance(arg, _Always):
+            waiters.append(arg._simwaiter())
+            procs.append((arg, waiters[-1]))
         elif isinstance(arg, _Instantiator):
             waiters.append(arg.waiter)
+            procs.append((arg, waiters[-1]))
         elif isinstance(arg, Cosimulation):
             cosims.append(arg)
             waiters.append(_SignalTupleWaiter(arg._waiter()))
@@ -255,4 +415,4 @@ def _makeWaiters(arglist):
     for sig in _signals:
         if hasattr(sig, '_waiter'):
             waiters.append(sig._waiter)
-    return waiters, cosims
+    return waiters, cosims, procs
@@ -27,7 +27,7 @@ import inspect
 from myhdl._util import _dedent
 from myhdl._delay import delay
 from myhdl._join import join
-from myhdl._Signal import _Signal, _WaiterList, posedge, negedge
+from myhdl._Signal import _Signal, _WaiterList, _DelayedSignal, posedge, negedge
 from myhdl import _simulator
 from myhdl._simulator import _futureEvents
 
@@ -190,6 +190,81 @@ class _SignalTupleWaiter(_Waiter):
             actives[id(wl)] = wl
 
 
+def _triggerSig(trigger):
+    if isinstance(trigger, _WaiterList):
+        return trigger.sig
+    return trigger
+
+
+class _CallbackWaiter(_Waiter):
+
+    """ Waiter that calls a function each time it is triggered.
+
+    It is subscribed persistently to its trigger by a _SubscribeWaiter,
+    so there is no generator to resume and nothing to re-register.
+    """
+
+    __slots__ = ('func', 'hasRun')
+
+    def __init__(self, func):
+        self.func = func
+        self.hasRun = 0
+
+    def next(self, waiters, actives, exc):
+        self.func()
+
+
+class _MultiCallbackWaiter(_CallbackWaiter):
+
+    """ Callback waiter that may be triggered more than once per delta cycle.
+
+    This is the case with several triggers, or with a delayed signal. The
+    function is called only once per delta cycle.
+    """
+
+    __slots__ = ('func', 'delta', 'hasRun')
+
+    def __init__(self, func):
+        self.func = func
+        self.delta = -1
+        self.hasRun = 0
+
+    def next(self, waiters, actives, exc):
+        delta = _simulator._delta
+        if self.delta != delta:
+            self.delta = delta
+            self.func()
+
+
+class _SubscribeWaiter(_Waiter):
+
+    """ Waiter that subscribes a callback to signals and edges.
+
+    initial -- call the function once after subscribing
+    multi -- the function may be triggered more than once per delta cycle
+             by other subscriptions
+    """
+
+    __slots__ = ('waiter', 'senslist', 'initial', 'hasRun')
+
+    def __init__(self, func, senslist, initial=False, multi=False):
+        w = _CallbackWaiter
+        if multi or len(senslist) > 1 or \
+                isinstance(_triggerSig(senslist[0]), _DelayedSignal):
+            w = _MultiCallbackWaiter
+        self.waiter = w(func)
+        self.senslist = senslist
+        self.initial = initial
+        self.hasRun = 0
+
+    def next(self, waiters, actives, exc):
+        waiter = self.waiter
+        for trigger in self.senslist:
+            _triggerSig(trigger)._subscribe(waiter, trigger)
+        if self.initial:
+            waiter.func()
+
+
 #_kind = enum("SIGNAL_TUPLE", "EDGE_TUPLE", "SIGNAL", "EDGE", "DELAY", "UNDEFINED")
 class _kind(object):
     SIGNAL_TUPLE = 1
@@ -34,6 +34,7 @@
     join -- callable to join clauses in a yield statement
     intbv -- mutable integer class with bit vector facilities
     modbv -- modular bit vector class
+    xbv -- four-state bit vector class with X and Z bits
     downrange -- function that returns a downward range
     bin -- returns a binary string representation.
            The optional width specifies the desired string
@@ -46,9 +47,11 @@
     always_seq --
     ResetSignal --
     enum -- function that returns an enumeration type
+    packedstruct -- function that returns a packed struct (bit field) type
     traceSignals -- function that enables signal tracing in a VCD file
     toVerilog -- function that converts a design to Verilog
     toVHDL -- function that converts a design to VHDL
+    toPython -- function that converts a design to a cycle-based Python model
     OpenPort -- 
     Constant -- 
     HdlClass -- Abstract Base Class to build Class based structural designs
@@ -113,6 +116,10 @@ class SimulationError(Error):
     pass
 
 
+class PropertyError(Error):
+    pass
+
+
 class TraceSignalsError(Error):
     pass
 
@@ -129,6 +136,10 @@ class ToVHDLError(ConversionError):
     pass
 
 
+class ToPythonError(ConversionError):
+    pass
+
+
 class ConversionWarning(UserWarning):
     pass
 
@@ -151,6 +162,7 @@ from ._bin import bin
 from ._concat import concat
 from ._intbv import intbv
 from ._modbv import modbv
+from ._xbv import xbv
 from ._join import join
 from ._Signal import posedge, negedge, Signal, SignalType, Constant
 from ._ShadowSignal import ConcatSignal
@@ -164,15 +176,20 @@ from ._always_comb import always_comb
 from ._always_seq import always_seq, ResetSignal
 from ._always import always
 from ._instance import instance
+from ._assertions import assertions
 from ._block import block
 from ._enum import enum, EnumType, EnumItemType
+from ._packedstruct import packedstruct, PackedStructType
 from ._traceSignals import traceSignals
+from ._coverage import toggleCoverage
+from ._coverage import codeCoverage
 from ._openport import OpenPort
 from ._hdlclass import HdlClass# , hdlinstances
 
 from myhdl import conversion
 from .conversion import toVerilog
 from .conversion import toVHDL
+from .conversion import toPython
 
 from ._tristate import Tristate
 
@@ -180,6 +197,7 @@ __all__ = ["bin",
            "concat",
            "intbv",
            "modbv",
+           "xbv",
            "join",
            "posedge",
            "negedge",
@@ -196,6 +214,7 @@ __all__ = ["bin",
            "Simulation",
            "instances",
            "instance",
+           "assertions",
            "block",
            "always_comb",
            "always_seq",
@@ -204,9 +223,14 @@ __all__ = ["bin",
            "enum",
            "EnumType",
            "EnumItemType",
+           "packedstruct",
+           "PackedStructType",
            "traceSignals",
+           "toggleCoverage",
+           "codeCoverage",
            "toVerilog",
            "toVHDL",
+           "toPython",
            "conversion",
            "Tristate",
            "OpenPort",
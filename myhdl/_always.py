@@ -26,8 +26,10 @@ from myhdl._delay import delay
 from myhdl._Signal import _Signal
 from myhdl._Signal import _WaiterList
 from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter, \
-    _DelayWaiter, _EdgeWaiter, _EdgeTupleWaiter
+    _DelayWaiter, _EdgeWaiter, _EdgeTupleWaiter, _SubscribeWaiter
 from myhdl._instance import _Instantiator, _getCallInfo
+from myhdl._fsmdispatch import _fsmDispatch
+from myhdl._specialize import _specialize
 
 
 class _error:
@@ -85,8 +87,13 @@ def always(*args):
 
 class _Always(_Instantiator):
 
+    # run the function once at the start of a simulation
+    _initial = False
+
     def __init__(self, func, senslist, callinfo, sigdict=None):
         self.func = func
+        # the function that is run in simulation, see _optimize
+        self._simfunc = func
         self.senslist = tuple(senslist)
         super(_Always, self).__init__(self.genfunc, callinfo=callinfo)
         # update sigdict with decorator signal arguments
@@ -123,11 +130,36 @@ class _Always(_Instantiator):
                 w = _EdgeTupleWaiter
         return w
 
+    def _optimize(self, fsm_dispatch=False, specialize=False):
+        """ Set up an optimized version of func for simulation. """
+        func = self.func
+        if specialize:
+            func = _specialize(func, fsm_dispatch=fsm_dispatch)
+        elif fsm_dispatch:
+            func = _fsmDispatch(func)
+        self._simfunc = func
+
+    def _callback(self):
+        """ Return the function to call on each activation. """
+        return self._simfunc
+
+    def _simwaiter(self):
+        """ Return the waiter to use in a simulation.
+
+        Signal and edge sensitivities are handled by a callback, without
+        a generator. Delays use the generator based waiter.
+        """
+        for s in self.senslist:
+            if isinstance(s, delay):
+                return self.waiter
+        return _SubscribeWaiter(self._callback(), self.senslist,
+                                initial=self._initial)
+
     def genfunc(self):
         senslist = self.senslist
         if len(senslist) == 1:
             senslist = senslist[0]
-        func = self.func
+        func = self._simfunc
         while 1:
             yield senslist
             func()
@@ -18,6 +18,8 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 """ Module with the always_comb function. """
+import ast
+import sys
 from types import FunctionType
 
 from myhdl import AlwaysCombError
@@ -25,6 +27,7 @@ from myhdl._Signal import _Signal, _isListOfSigs, Constant
 from myhdl._util import _isGenFunc
 from myhdl._instance import _getCallInfo
 from myhdl._always import _Always
+from myhdl._Waiter import _SubscribeWaiter
 
 
 class _error:
@@ -53,6 +56,8 @@ def always_comb(func):
 
 class _AlwaysComb(_Always):
 
+    _initial = True
+
     def __init__(self, func, callinfo):
         senslist = []
         super(_AlwaysComb, self).__init__(func, senslist, callinfo=callinfo)
@@ -60,22 +65,162 @@ class _AlwaysComb(_Always):
         if self.embedded_func:
             raise AlwaysCombError(_error.EmbeddedFunction)
 
+        # the simulation is only sensitive to the memory elements that
+        # are addressed, see _simwaiter
+        simsenslist = []
+        self._memreads = []
+        reads = None
         for n in self.inputs:
             s = self.symdict[n]
             if isinstance(s, _Signal) and not isinstance(s, Constant):
                 senslist.append(s)
+                simsenslist.append(s)
             elif _isListOfSigs(s) and not isinstance(s[0], Constant):
                 senslist.extend(s)
+                if reads is None:
+                    reads = _indexedReads(self.ast, self.symdict)
+                if n in reads and n not in self.outputs:
+                    for index, indexsigs in reads[n]:
+                        self._memreads.append((s, index, indexsigs))
+                else:
+                    simsenslist.extend(s)
         self.senslist = tuple(senslist)
         if len(self.senslist) == 0:
             raise AlwaysCombError(_error.EmptySensitivityList)
+        self._simsenslist = tuple(simsenslist)
+
+    def _simwaiter(self):
+        """ Return the waiter to use in a simulation.
+
+        A memory that is only read as mem[index] makes the function
+        sensitive to the addressed element, instead of to all elements.
+        The callback moves that sensitivity when the index changes.
+        """
+        if not self._memreads:
+            return super(_AlwaysComb, self)._simwaiter()
+        reads = [_MemRead(*r) for r in self._memreads]
+        func = self._simfunc
+
+        def callback():
+            for r in reads:
+                r.update(waiter)
+            func()
+
+        senslist = self._simsenslist
+        for r in reads:
+            if not r.indexsigs:
+                # a constant index
+                senslist += (r.mem[r.index()],)
+        # the addressed elements are subscribed on top of the senslist
+        w = _SubscribeWaiter(callback, senslist, initial=True, multi=True)
+        waiter = w.waiter
+        return w
 
     def genfunc(self):
         senslist = self.senslist
         if len(senslist) == 1:
             senslist = senslist[0]
-        func = self.func
+        func = self._simfunc
         while 1:
             func()
             yield senslist
 
+
+
+class _MemRead(object):
+
+    """ Sensitivity to the element of a memory that an index selects. """
+
+    __slots__ = ('mem', 'index', 'indexsigs', 'sig')
+
+    def __init__(self, mem, index, indexsigs):
+        self.mem = mem
+        self.index = index
+        self.indexsigs = indexsigs
+        self.sig = None
+
+    def update(self, waiter):
+        if not self.indexsigs:
+            return
+        try:
+            sig = self.mem[int(self.index())]
+        except (IndexError, TypeError, ValueError):
+            # the function itself will report a bad index
+            sig = None
+        if sig is not self.sig:
+            if self.sig is not None:
+                self.sig._subs.event.remove(waiter)
+            if sig is not None:
+                sig._subscribe(waiter, sig)
+            self.sig = sig
+
+
+# node types in an index expression that can be evaluated on its own;
+# slices are only allowed in a subscript within the index, a sliced
+# memory is a list
+_indexNodes = (ast.Name, ast.Constant, ast.Subscript, ast.BinOp,
+               ast.UnaryOp, ast.operator, ast.unaryop, ast.expr_context)
+if sys.version_info < (3, 9, 0):
+    _indexNodes += (ast.Index,)
+
+
+def _indexedReads(tree, symdict):
+    """ Find the memories that are only read with a signal index.
+
+    Return a dict that maps the name of each such memory to a list of
+    (index, indexsigs) pairs: index is a function that evaluates the index
+    expression, indexsigs tells whether it depends on signals.
+    """
+    parents = {}
+    for node in ast.walk(tree):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+    reads = {}
+    bad = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Name) or not _isListOfSigs(
+                symdict.get(node.id)):
+            continue
+        n = node.id
+        sub = parents.get(node)
+        index = None
+        if isinstance(sub, ast.Subscript) and sub.value is node and \
+                not (isinstance(parents.get(sub), ast.Attribute) and
+                     parents[sub].attr == 'next'):
+            index = _indexFunc(sub.slice, symdict)
+        if index is None:
+            bad.add(n)
+        else:
+            reads.setdefault(n, []).append(index)
+    for n in bad:
+        reads.pop(n, None)
+    return reads
+
+
+def _indexFunc(expr, symdict):
+    """ Return an (index, indexsigs) pair for an index expression, or None.
+    """
+    if sys.version_info < (3, 9, 0) and isinstance(expr, ast.Index):
+        expr = expr.value
+    indexsigs = False
+    names = {}
+    slices = set(id(node.slice) for node in ast.walk(expr)
+                 if isinstance(node, ast.Subscript))
+    for node in ast.walk(expr):
+        if isinstance(node, ast.Slice) and id(node) in slices:
+            continue
+        if not isinstance(node, _indexNodes):
+            return None
+        if isinstance(node, ast.Name):
+            obj = symdict.get(node.id)
+            if isinstance(obj, _Signal):
+                indexsigs = True
+            elif not isinstance(obj, int):
+                return None
+            names[node.id] = obj
+    args = ast.arguments(posonlyargs=[], args=[], vararg=None, kwonlyargs=[],
+                         kw_defaults=[], kwarg=None, defaults=[])
+    tree = ast.Expression(body=ast.Lambda(args=args, body=expr))
+    code = compile(ast.fix_missing_locations(tree), '<index>', 'eval')
+    index = eval(code, names)
+    return index, indexsigs
@@ -20,11 +20,14 @@
 """ Module with the always_seq decorator. """
 from types import FunctionType
 
-from myhdl import AlwaysError, intbv
+from myhdl import AlwaysError, intbv, modbv, xbv, concat
+from myhdl._misc import downrange
 from myhdl._util import _isGenFunc
 from myhdl._Signal import _Signal, _WaiterList, _isListOfSigs
+from myhdl._simulator import _siglist
 from myhdl._always import _Always, _get_sigdict
 from myhdl._instance import _getCallInfo
+from myhdl._visitors import _PurityVisitor
 
 # evacuate this later
 AlwaysSeqError = AlwaysError
@@ -38,6 +41,11 @@ _error.ArgType = "decorated object should be a classic (non-generator) function"
 _error.NrOfArgs = "decorated function should not have arguments"
 _error.SigAugAssign = "signal assignment does not support augmented assignment"
 _error.EmbeddedFunction = "embedded functions in always_seq function not supported"
+_error.NotPure = "gated always_seq function should be a pure function of signals"
+
+# functions without side effects that a gated function may call
+_pureFuncs = (bool, int, len, abs, min, max, range, all, any,
+              intbv, modbv, xbv, concat, downrange)
 
 
 class ResetSignal(_Signal):
@@ -53,7 +61,7 @@ class ResetSignal(_Signal):
         self.isasync = isasync
 
 
-def always_seq(edge, reset):
+def always_seq(edge, reset, gated=False):
     callinfo = _getCallInfo()
     sigargs = []
     if not isinstance(edge, _WaiterList):
@@ -76,15 +84,33 @@ def always_seq(edge, reset):
             raise AlwaysSeqError(_error.ArgType)
         if func.__code__.co_argcount > 0:
             raise AlwaysSeqError(_error.NrOfArgs)
-        return _AlwaysSeq(func, edge, reset, callinfo=callinfo, sigdict=sigdict)
+        return _AlwaysSeq(func, edge, reset, callinfo=callinfo,
+                          sigdict=sigdict, gated=gated)
     return _always_seq_decorator
 
 
+class _InputChange(object):
+
+    """ Shadow of the input signals of a gated block: records a change. """
+
+    __slots__ = ('changed',)
+
+    def __init__(self):
+        self.changed = True
+
+    def _propagate(self, sig):
+        self.changed = True
+
+
 class _AlwaysSeq(_Always):
 
-    def __init__(self, func, edge, reset, callinfo, sigdict):
+    # may be skipped in quiescent clock cycles, see _quiescence
+    _quiescent = False
+
+    def __init__(self, func, edge, reset, callinfo, sigdict, gated=False):
         senslist = [edge]
         self.reset = reset
+        self.gated = gated
         if reset is not None:
             self.genfunc = self.genfunc_reset
             active = self.reset.active
@@ -119,9 +145,66 @@ class _AlwaysSeq(_Always):
                 for e in reg:
                     sigregs.append(e)
 
-    def reset_sigs(self):
+        if gated:
+            self._verifyPure()
+            # a shadow of the inputs, so that a change is seen in the delta
+            # cycle of the update, before any process runs
+            self._inputChange = _InputChange()
+            for s in self._watched():
+                s._addShadow(self._inputChange)
+
+    def _verifyPure(self):
+        """ Verify that the function only depends on its input signals.
+
+        Then it can be skipped as long as those signals do not change.
+        Variables keep state between calls, so they are not allowed.
+        """
+        if self.varregs:
+            raise AlwaysSeqError(_error.NotPure,
+                                 [n for n, _, _ in self.varregs])
+        v = _PurityVisitor(self.symdict, _pureFuncs)
+        v.visit(self.ast)
+        if v.impure:
+            raise AlwaysSeqError(_error.NotPure, v.impure)
+
+    def _watched(self):
+        """ Return the signals that the function reads. """
+        sigs = []
+        for n in self.inputs:
+            if n in self.sigdict:
+                sigs.append(self.sigdict[n])
+            elif n in self.losdict:
+                sigs.extend(self.losdict[n])
+        return sigs
+
+    def _resetPlan(self):
+        """ Return a function that assigns the initial values of sigregs.
+
+        The signals are sorted by the way their next value is set, so that
+        it can be set directly, without the checks of the next attribute.
+        """
+        intbvs, immutables, others = [], [], []
         for s in self.sigregs:
-            s.next = s._init
+            setter = getattr(s._setNextVal, '__func__', None)
+            if setter is _Signal._setNextIntbv:
+                intbvs.append((s, s._init._val))
+            elif setter in (_Signal._setNextBool, _Signal._setNextInt,
+                            _Signal._setNextNonmutable):
+                immutables.append((s, s._init))
+            else:
+                others.append(s)
+        sigs = self.sigregs
+
+        def reset_sigs():
+            for s, init in intbvs:
+                s._next._val = init
+            for s, init in immutables:
+                s._next = init
+            for s in others:
+                s.next = s._init
+            _siglist.extend(sigs)
+
+        return reset_sigs
 
     def reset_vars(self):
         for v in self.varregs:
@@ -129,16 +212,60 @@ class _AlwaysSeq(_Always):
             _, reg, init = v
             reg._val = init
 
+    def _callback(self):
+        func = self._simfunc
+        if self.gated:
+            func = self._gate(func)
+            change = self._inputChange
+        if self.reset is None:
+            return func
+        reset = self.reset
+        active = reset.active
+        reset_sigs = self._resetPlan()
+        reset_vars = self.reset_vars
+
+        if self.gated:
+            def callback():
+                if reset._val == active:
+                    reset_sigs()
+                    # run the function on the first edge after reset
+                    change.changed = True
+                else:
+                    func()
+            return callback
+
+        def callback():
+            if reset._val == active:
+                reset_sigs()
+                reset_vars()
+            else:
+                func()
+        return callback
+
+    def _gate(self, func):
+        """ Return a function that only calls func after an input change. """
+        change = self._inputChange
+        change.changed = True
+
+        def gated():
+            if change.changed:
+                change.changed = False
+                func()
+
+        return gated
+
     def genfunc_reset(self):
         senslist = self.senslist
         if len(senslist) == 1:
             senslist = senslist[0]
-        reset_sigs = self.reset_sigs
+        reset = self.reset
+        active = reset.active
+        reset_sigs = self._resetPlan()
         reset_vars = self.reset_vars
-        func = self.func
+        func = self._simfunc
         while 1:
             yield senslist
-            if self.reset == self.reset.active:
+            if reset._val == active:
                 reset_sigs()
                 reset_vars()
             else:
@@ -148,7 +275,7 @@ class _AlwaysSeq(_Always):
         senslist = self.senslist
         assert len(senslist) == 1
         senslist = senslist[0]
-        func = self.func
+        func = self._simfunc
         while 1:
             yield senslist
             func()
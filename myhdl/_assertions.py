@@ -0,0 +1,287 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2008 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with clocked temporal assertions.
+
+A set of properties is checked on the edges of a clock. Each property
+is compiled into a small state machine, and all properties of a set are
+evaluated in a single callback that is subscribed to the clock edge, so
+there is no generator process per property. The callback runs in the
+delta cycle after the clock edge, before the signals that change on the
+edge are updated, so the properties see the values at the edge.
+"""
+from myhdl import PropertyError
+from myhdl import _simulator
+from myhdl._Signal import _Signal, _PosedgeWaiterList, _NegedgeWaiterList
+from myhdl._always_seq import ResetSignal
+from myhdl._instance import _Instantiator, _getCallInfo
+from myhdl._Waiter import _SubscribeWaiter
+
+
+class _error:
+    pass
+_error.EdgeType = "first argument should be an edge"
+_error.ResetType = "reset argument should be a ResetSignal"
+_error.ExprType = "property expression should be a Signal or a callable"
+_error.Window = "window should be a natural integer"
+_error.DuplicateName = "duplicate property name"
+
+
+def _expr(e):
+    """ Return a function for a property expression. """
+    if isinstance(e, _Signal):
+        return e.__bool__
+    if not callable(e):
+        raise PropertyError(_error.ExprType, repr(e))
+    return e
+
+
+def _window(n, low):
+    if not isinstance(n, int) or n < low:
+        raise PropertyError(_error.Window, repr(n))
+    return n
+
+
+class _Invariant(object):
+
+    """ expr holds at each edge """
+
+    __slots__ = ('name', 'expr')
+
+    def __init__(self, name, expr):
+        self.name = name
+        self.expr = expr
+
+    def clear(self):
+        pass
+
+    def check(self):
+        return bool(self.expr())
+
+
+class _Implies(object):
+
+    """ antecedent |-> ##delay consequent
+
+    Bit i of pending is an attempt that started i edges ago.
+    """
+
+    __slots__ = ('name', 'antecedent', 'consequent', 'due', 'pending')
+
+    def __init__(self, name, antecedent, consequent, delay):
+        self.name = name
+        self.antecedent = antecedent
+        self.consequent = consequent
+        self.due = 1 << delay
+        self.pending = 0
+
+    def clear(self):
+        self.pending = 0
+
+    def check(self):
+        pending = self.pending
+        if self.antecedent():
+            pending |= 1
+        if pending & self.due:
+            pending ^= self.due
+            if not self.consequent():
+                self.pending = pending << 1
+                return False
+        self.pending = pending << 1
+        return True
+
+
+class _Within(object):
+
+    """ antecedent |-> ##[1:window] consequent
+
+    Bit i of pending is an attempt that started i edges ago. A consequent
+    satisfies all the attempts that are pending at that edge.
+    """
+
+    __slots__ = ('name', 'antecedent', 'consequent', 'expired', 'pending')
+
+    def __init__(self, name, antecedent, consequent, window):
+        self.name = name
+        self.antecedent = antecedent
+        self.consequent = consequent
+        self.expired = 1 << window
+        self.pending = 0
+
+    def clear(self):
+        self.pending = 0
+
+    def check(self):
+        pending = self.pending
+        ok = True
+        if pending:
+            if self.consequent():
+                pending = 0
+            elif pending & self.expired:
+                pending ^= self.expired
+                ok = False
+        if self.antecedent():
+            pending |= 1
+        self.pending = pending << 1
+        return ok
+
+
+class _Exclusive(object):
+
+    """ start |=> not start until end
+
+    A sequence that starts with start and stops with end does not
+    overlap with the next one.
+    """
+
+    __slots__ = ('name', 'start', 'end', 'busy')
+
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.busy = False
+
+    def clear(self):
+        self.busy = False
+
+    def check(self):
+        start = self.start()
+        if self.busy:
+            if self.end():
+                self.busy = bool(start)
+                return True
+            return not start
+        self.busy = bool(start)
+        return True
+
+
+class _Assertions(_Instantiator):
+
+    """ A set of properties checked on a clock edge. """
+
+    def __init__(self, edge, reset, fatal, name, callinfo):
+        self.callinfo = callinfo
+        self.callername = callinfo.name
+        self.modctxt = callinfo.modctxt
+        self.symdict = {}
+        self.sigdict = {}
+        self.losdict = {}
+        self.inputs = self.outputs = self.inouts = set()
+        self.embedded_func = None
+        self.edge = edge
+        self.reset = reset
+        self.fatal = fatal
+        self._name = name
+        # the names of the enclosing blocks, filled in by the blocks
+        self.path = []
+        self.props = []
+        self.failures = []
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def waiter(self):
+        return _SubscribeWaiter(self._callback(), [self.edge])
+
+    def _add(self, prop):
+        for p in self.props:
+            if p.name == prop.name:
+                raise PropertyError(_error.DuplicateName, prop.name)
+        self.props.append(prop)
+        return prop
+
+    def _callback(self):
+        props = self.props
+        reset = self.reset
+        for p in props:
+            p.clear()
+        del self.failures[:]
+
+        def check():
+            if reset is not None and reset._val == reset.active:
+                for p in props:
+                    p.clear()
+                return
+            for p in props:
+                if not p.check():
+                    self._fail(p)
+
+        return check
+
+    def _fail(self, prop):
+        path = '.'.join(self.path + [self.name, prop.name])
+        t = _simulator._time
+        self.failures.append((t, path))
+        if self.fatal:
+            raise AssertionError("property %s failed at time %s" % (path, t))
+
+    # the property language
+
+    def always(self, expr, name=None):
+        """ expr holds at each edge. """
+        return self._add(_Invariant(self._propName(name), _expr(expr)))
+
+    def never(self, expr, name=None):
+        """ expr does not hold at any edge. """
+        f = _expr(expr)
+        return self._add(_Invariant(self._propName(name), lambda: not f()))
+
+    def implies(self, antecedent, consequent, delay=0, name=None):
+        """ consequent holds delay edges after each edge where antecedent
+        holds. """
+        return self._add(_Implies(self._propName(name), _expr(antecedent),
+                                  _expr(consequent), _window(delay, 0)))
+
+    def within(self, antecedent, consequent, window, name=None):
+        """ consequent holds within 1 to window edges after each edge where
+        antecedent holds. """
+        return self._add(_Within(self._propName(name), _expr(antecedent),
+                                 _expr(consequent), _window(window, 1)))
+
+    def exclusive(self, start, end, name=None):
+        """ start does not hold again until end holds after an edge where
+        start holds. """
+        return self._add(_Exclusive(self._propName(name), _expr(start),
+                                    _expr(end)))
+
+    def _propName(self, name):
+        if name is None:
+            name = "p%d" % len(self.props)
+        return name
+
+
+def assertions(edge, reset=None, fatal=True, name='assertions'):
+    """ Return a set of properties checked on a clock edge.
+
+    edge -- the clock edge, e.g. clk.posedge
+    reset -- optional ResetSignal: the properties are not checked while
+             it is active, and pending checks are dropped
+    fatal -- raise an AssertionError on a failure; otherwise the failures
+             are only recorded in the failures attribute
+    name -- the name of the set in failure reports
+    """
+    callinfo = _getCallInfo()
+    if not isinstance(edge, (_PosedgeWaiterList, _NegedgeWaiterList)):
+        raise PropertyError(_error.EdgeType)
+    if reset is not None and not isinstance(reset, ResetSignal):
+        raise PropertyError(_error.ResetType)
+    return _Assertions(edge, reset, fatal, name, callinfo)
@@ -26,6 +26,8 @@ import functools
 import myhdl
 from myhdl import BlockError, BlockInstanceError, Cosimulation
 from myhdl._instance import _Instantiator
+from myhdl._always_seq import _AlwaysSeq
+from myhdl._assertions import _Assertions
 from myhdl._util import _flatten
 from myhdl._extractHierarchy import (_makeMemInfo,
                                      _UserVerilogCode, _UserVhdlCode,
@@ -121,10 +123,11 @@ def _uniqueify_name(proposed_name):
 
 class _bound_function_wrapper(object):
 
-    def __init__(self, bound_func, srcfile, srcline, skipname):
+    def __init__(self, bound_func, srcfile, srcline, skipname, quiescent=False):
         self.srcfile = srcfile
         self.srcline = srcline
         self.skipname = skipname
+        self.quiescent = quiescent
         self.bound_func = bound_func
         functools.update_wrapper(self, bound_func)
         self.calls = 0
@@ -182,7 +185,8 @@ class block_decorator(object):
 
         if bound_key not in self.bound_functions:
             bound_func = self.func.__get__(instance, owner)
-            function_wrapper = _bound_function_wrapper(bound_func, self.srcfile, self.srcline, self.skipname)
+            function_wrapper = _bound_function_wrapper(bound_func, self.srcfile, self.srcline, self.skipname,
+                                                       getattr(self, 'quiescent', False))
             self.bound_functions[bound_key] = function_wrapper
 
             proposed_inst_name = owner.__name__ + '0'
@@ -266,7 +270,14 @@ class _Block(object):
         if hasattr(deco, 'vhdl_instance'):
             self.vhdl_code = _UserVhdlInstance(deco.vhdl_instance, self.symdict, func.__name__,
                                                func, srcfile, srcline)
-        self._config_sim = {'trace': False}
+        self._config_sim = {'trace': False, 'fsm_dispatch': False,
+                            'specialize': False}
+        if getattr(deco, 'quiescent', False):
+            self._setQuiescent()
+        # assertions report failures with their hierarchical path
+        if name is not None:
+            for inst in self._assertions():
+                inst.path.insert(0, name)
 
     def _verifySubs(self):
         for inst in self.subs:
@@ -276,6 +287,26 @@ class _Block(object):
                 if not inst.modctxt:
                     raise BlockError(_error.InstanceError % (self.name, inst.callername))
 
+    def _setQuiescent(self):
+        """ Mark the always_seq blocks in the hierarchy as skippable.
+
+        The simulator may skip them in clock cycles in which they do not
+        change any signal, see _quiescence.
+        """
+        for inst in self.subs:
+            if isinstance(inst, _Block):
+                inst._setQuiescent()
+            elif isinstance(inst, _AlwaysSeq):
+                inst._quiescent = True
+
+    def _assertions(self):
+        """ Return the assertion sets in the hierarchy. """
+        for inst in self.subs:
+            if isinstance(inst, _Block):
+                yield from inst._assertions()
+            elif isinstance(inst, _Assertions):
+                yield inst
+
     def _updateNamespaces(self):
         # dicts to keep track of objects used in Instantiator objects
         usedsigdict = {}
@@ -355,7 +386,8 @@ class _Block(object):
         """Converts this BlockInstance to another HDL
 
         Args:
-            hdl (Optional[str]): Target HDL. Defaults to Verilog
+            hdl (Optional[str]): Target HDL. Defaults to Verilog. 'Python'
+                writes a cycle-based Python model of the design instead.
 
             path (Optional[str]): Destination folder. Defaults to current
                 working dir.
@@ -378,6 +410,13 @@ class _Block(object):
                 testbench should be created. Defaults to True.
 
             timescale(Optional[str]): Verilog only. Defaults to '1ns/10ps'
+
+            lanes(Optional[int]): Python only. Writes a lane-parallel model
+                on NumPy arrays with this number of lanes.
+
+            bitslice(Optional[bool]): Python only. Writes a model of a
+                design of bool signals with the lanes in the bits of
+                integers.
         """
 
         self._clear()
@@ -386,6 +425,8 @@ class _Block(object):
             converter = myhdl.conversion._toVHDL.toVHDL
         elif hdl.lower() == 'verilog':
             converter = myhdl.conversion._toVerilog.toVerilog
+        elif hdl.lower() == 'python':
+            converter = myhdl.conversion._toPython.toPython
         else:
             raise BlockInstanceError('unknown hdl %s' % hdl)
 
@@ -403,8 +444,11 @@ class _Block(object):
             setattr(converter, k, v)
         return converter(self)
 
-    def config_sim(self, trace=False, **kwargs):
+    def config_sim(self, trace=False, fsm_dispatch=False, specialize=False,
+                   **kwargs):
         self._config_sim['trace'] = trace
+        self._config_sim['fsm_dispatch'] = fsm_dispatch
+        self._config_sim['specialize'] = specialize
         if trace:
             for k, v in kwargs.items():
                 setattr(myhdl.traceSignals, k, v)
@@ -415,7 +459,9 @@ class _Block(object):
             sim = self
             # if self._config_sim['trace']:
             #    sim = myhdl.traceSignals(self)
-            self.sim = myhdl._Simulation.Simulation(sim)
+            self.sim = myhdl._Simulation.Simulation(
+                sim, fsm_dispatch=self._config_sim['fsm_dispatch'],
+                specialize=self._config_sim['specialize'])
         self.sim.run(duration, quiet)
 
     def quit_sim(self):
@@ -0,0 +1,466 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2008 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with toggle, line and branch coverage.
+
+A toggle collector follows each bit-oriented signal of a design as a
+shadow. On each change, the XOR of the old and the new value gives the
+bits that toggled: they are accumulated in a rise and a fall mask for
+coverage, and counted for the switching activity.
+
+A code collector uses sys.monitoring (Python 3.12 and later) on the
+code objects of the processes of a design only, so the simulator itself
+runs at full speed. Each process gets its own copy of its code object,
+which attributes the coverage to block instances, and each location is
+disabled after its first hit.
+"""
+import dis
+import sys
+import time
+from types import FunctionType
+
+from myhdl import _simulator, __version__
+from myhdl._intbv import intbv
+from myhdl._block import _Block
+from myhdl._always import _Always
+from myhdl._instance import _Instantiator
+from myhdl._getHierarchy import _getHierarchy
+
+
+class _error:
+    pass
+_error.ArgType = "coverage argument should be a block instance"
+_error.NoMonitoring = "code coverage requires sys.monitoring (Python 3.12 or later)"
+_error.NoToolId = "no free sys.monitoring tool id for code coverage"
+
+
+class _Toggle(object):
+
+    """ The toggle and activity counts of a signal. """
+
+    __slots__ = ('sig', 'mask', 'last', 'rise', 'fall', 'toggles',
+                 'high', 'since')
+
+    def __init__(self, sig):
+        self.sig = sig
+        self.mask = (1 << sig._nrbits) - 1
+        self.last = self._value(sig._val)
+        self.rise = self.fall = 0
+        self.toggles = 0
+        # time at 1 of a 1-bit signal
+        self.high = 0
+        self.since = 0
+
+    def _value(self, val):
+        if val is None:
+            return 0
+        if isinstance(val, intbv):
+            val = val._val
+        return int(val) & self.mask
+
+    def _propagate(self, sig):
+        val = sig._val
+        if val is None:
+            return
+        if isinstance(val, intbv):
+            val = val._val & self.mask
+        else:
+            val = int(val) & self.mask
+        last = self.last
+        diff = last ^ val
+        self.rise |= diff & val
+        self.fall |= diff & last
+        self.toggles += bin(diff).count('1')
+        if self.mask == 1:
+            t = _simulator._time
+            if last:
+                self.high += t - self.since
+            self.since = t
+        self.last = val
+
+    def covered(self):
+        """ Return the number of bits that rose and fell. """
+        return bin(self.rise & self.fall).count('1')
+
+    def times(self, duration):
+        """ Return the times at 0 and at 1 of a 1-bit signal. """
+        high = self.high
+        if self.last:
+            high += duration - self.since
+        return duration - high, high
+
+
+class _ToggleCoverage(object):
+
+    """ Toggle coverage and switching activity of the signals of a design.
+
+    Methods:
+    report -- return a coverage report per hierarchy level
+    saif -- write the switching activity in SAIF format
+    remove -- stop collecting
+    """
+
+    def __init__(self, name, top):
+        self.name = name
+        # (path, signal names and toggles) per instance, in hierarchy order
+        self.instances = []
+        self.toggles = []
+        seen = set()
+        path = []
+        for inst in _getHierarchy(name, top).hierarchy:
+            del path[inst.level - 1:]
+            path.append(inst.name)
+            sigs = []
+            for n, s in sorted(inst.sigdict.items()):
+                sigs.append((n, s))
+            for n, m in sorted(inst.memdict.items()):
+                for i, s in enumerate(m.mem):
+                    sigs.append(("%s[%s]" % (n, i), s))
+            nets = []
+            for n, s in sigs:
+                if id(s) in seen or not s._nrbits or \
+                        s._type not in (bool, intbv):
+                    continue
+                seen.add(id(s))
+                t = _Toggle(s)
+                s._addShadow(t)
+                self.toggles.append(t)
+                nets.append((n, t))
+            self.instances.append((tuple(path), nets))
+
+    def remove(self):
+        """ Stop collecting. """
+        for t in self.toggles:
+            shadows = t.sig._shadows
+            if t in shadows:
+                shadows.remove(t)
+
+    def report(self):
+        """ Return the toggle coverage per hierarchy level as a string. """
+        lines = []
+        total = covered = 0
+        for path, nets in self.instances:
+            if not nets:
+                continue
+            lines.append('.'.join(path))
+            for n, t in nets:
+                nrbits = t.sig._nrbits
+                c = t.covered()
+                total += nrbits
+                covered += c
+                lines.append("    %-24s %4d/%-4d bits toggled  %d toggles"
+                             % (n, c, nrbits, t.toggles))
+        if total:
+            lines.append("toggle coverage: %d/%d bits (%.1f%%)"
+                         % (covered, total, 100.0 * covered / total))
+        return '\n'.join(lines) + '\n'
+
+    def saif(self, filename, timescale='1ns'):
+        """ Write the switching activity to a SAIF file.
+
+        1-bit signals have their times at 0 and at 1 and their toggle
+        count; vectors have the total toggle count of their bits.
+        """
+        duration = _simulator._time
+        value, unit = timescale[:-2], timescale[-2:]
+        with open(filename, 'w') as f:
+            print('(SAIFILE', file=f)
+            print('(SAIFVERSION "2.0")', file=f)
+            print('(DIRECTION "backward")', file=f)
+            print('(DESIGN "%s")' % self.name, file=f)
+            print('(DATE "%s UTC")' % time.asctime(time.gmtime()), file=f)
+            print('(VENDOR "MyHDL")', file=f)
+            print('(PROGRAM_NAME "myhdl")', file=f)
+            print('(VERSION "%s")' % __version__, file=f)
+            print('(DIVIDER . )', file=f)
+            print('(TIMESCALE %s %s)' % (value, unit), file=f)
+            print('(DURATION %s)' % duration, file=f)
+            depth = 0
+            for path, nets in self.instances:
+                while depth >= len(path):
+                    depth -= 1
+                    print('  ' * depth + ')', file=f)
+                indent = '  ' * depth
+                print('%s(INSTANCE %s' % (indent, path[-1]), file=f)
+                depth += 1
+                if nets:
+                    print('%s  (NET' % indent, file=f)
+                    for n, t in nets:
+                        if t.mask == 1:
+                            t0, t1 = t.times(duration)
+                            print('%s    (%s (T0 %d) (T1 %d) (TX 0) (TC %d))'
+                                  % (indent, n, t0, t1, t.toggles), file=f)
+                        else:
+                            print('%s    (%s (TC %d))' % (indent, n, t.toggles),
+                                  file=f)
+                    print('%s  )' % indent, file=f)
+            while depth > 0:
+                depth -= 1
+                print('  ' * depth + ')', file=f)
+            print(')', file=f)
+
+
+def toggleCoverage(top, name=None):
+    """ Collect toggle coverage and switching activity of a design.
+
+    top -- the block instance of the design
+    name -- name of the top level (default: the name of the block function)
+
+    The collector starts at once, so it should be created before the
+    simulation is run.
+    """
+    if not isinstance(top, _Block):
+        raise TypeError(_error.ArgType)
+    if name is None:
+        name = top.func.__name__
+    return _ToggleCoverage(name, top)
+
+
+def _copyFunc(func):
+    """ Return a copy of func with its own code object. """
+    f = FunctionType(func.__code__.replace(), func.__globals__,
+                     func.__name__, func.__defaults__, func.__closure__)
+    f.__kwdefaults__ = func.__kwdefaults__
+    f.__qualname__ = func.__qualname__
+    f.__module__ = func.__module__
+    f.__doc__ = func.__doc__
+    f.__dict__.update(func.__dict__)
+    return f
+
+
+class _Process(object):
+
+    """ The line and branch coverage of a process. """
+
+    __slots__ = ('name', 'code', 'lines', 'hits', 'branches', 'taken')
+
+    def __init__(self, name, code):
+        self.name = name
+        self.setCode(code)
+
+    def setCode(self, code):
+        """ Set the code object of the process, and clear the hits. """
+        self.code = code
+        # the executable lines and the offsets of the conditional branches;
+        # the function prologue up to the first RESUME runs on the call
+        self.lines = set()
+        self.branches = set()
+        started = False
+        for instr in dis.get_instructions(code):
+            if not started:
+                started = instr.opname == 'RESUME'
+                continue
+            if instr.positions.lineno is not None:
+                self.lines.add(instr.positions.lineno)
+            if instr.opname.startswith('POP_JUMP_') or \
+                    instr.opname == 'FOR_ITER':
+                self.branches.add(instr.offset)
+        self.hits = set()
+        # the destinations taken per branch offset
+        self.taken = {}
+
+    def missing(self):
+        """ Return the lines that were not executed. """
+        return sorted(self.lines - self.hits)
+
+    def counts(self):
+        """ Return the hit and total counts of lines and branch outcomes. """
+        lines = len(self.hits & self.lines)
+        branches = sum(min(len(d), 2) for d in self.taken.values())
+        nrbranches = 2 * len(self.branches | set(self.taken))
+        return lines, len(self.lines), branches, nrbranches
+
+
+class _CodeCoverage(object):
+
+    """ Line and branch coverage of the processes of a design.
+
+    Methods:
+    report -- return a coverage report per block instance
+    remove -- stop collecting
+    """
+
+    def __init__(self, name, top):
+        self.name = name
+        # (path, processes) per instance, in hierarchy order
+        self.instances = []
+        self._procs = {}
+        self._toolid = None
+        # the always blocks with a hooked _optimize
+        self._optimized = []
+        seen = set()
+        path = []
+        for inst in _getHierarchy(name, top).hierarchy:
+            del path[inst.level - 1:]
+            path.append(inst.name)
+            procs = []
+            for n, obj in inst.subs:
+                if id(obj) in seen:
+                    continue
+                seen.add(id(obj))
+                if isinstance(obj, _Always):
+                    if not isinstance(obj.func, FunctionType):
+                        continue
+                    func = obj.func = obj._simfunc = _copyFunc(obj.func)
+                elif isinstance(obj, _Instantiator) and \
+                        isinstance(getattr(obj, 'genfunc', None), FunctionType):
+                    func = obj.genfunc = _copyFunc(obj.genfunc)
+                    obj.gen = func()
+                else:
+                    continue
+                p = _Process(n, func.__code__)
+                self._procs[id(p.code)] = p
+                procs.append(p)
+                if isinstance(obj, _Always):
+                    obj._optimize = self._optimizer(obj, p)
+                    self._optimized.append(obj)
+            self.instances.append((tuple(path), procs))
+        self._start()
+
+    def _start(self):
+        mon = sys.monitoring
+        for toolid in (mon.COVERAGE_ID, 3, 4):
+            if mon.get_tool(toolid) is None:
+                break
+        else:
+            raise RuntimeError(_error.NoToolId)
+        mon.use_tool_id(toolid, 'myhdl')
+        self._toolid = toolid
+        procs = self._procs
+        disable = mon.DISABLE
+
+        def line(code, lineno):
+            procs[id(code)].hits.add(lineno)
+            return disable
+
+        def branch(code, offset, dest):
+            taken = procs[id(code)].taken.setdefault(offset, set())
+            taken.add(dest)
+            # both outcomes share the location
+            if len(taken) == 2:
+                return disable
+
+        def branchSide(code, offset, dest):
+            procs[id(code)].taken.setdefault(offset, set()).add(dest)
+            return disable
+
+        events = mon.events
+        self._callbacks = [(events.LINE, line)]
+        if hasattr(events, 'BRANCH_LEFT'):
+            self._callbacks.append((events.BRANCH_LEFT, branchSide))
+            self._callbacks.append((events.BRANCH_RIGHT, branchSide))
+        else:
+            self._callbacks.append((events.BRANCH, branch))
+        eventset = 0
+        for event, callback in self._callbacks:
+            mon.register_callback(toolid, event, callback)
+            eventset |= event
+        self._eventset = eventset
+        for p in procs.values():
+            mon.set_local_events(toolid, p.code, eventset)
+
+    def _optimizer(self, obj, p):
+        """ Return an _optimize method for an always block.
+
+        Simulation may replace the function of the block by an optimized
+        version with its own code, which is then monitored instead.
+        """
+        optimize = obj._optimize
+
+        def _optimize(fsm_dispatch=False, specialize=False):
+            optimize(fsm_dispatch=fsm_dispatch, specialize=specialize)
+            if obj._simfunc is not obj.func:
+                # specializations are shared by instances
+                obj._simfunc = _copyFunc(obj._simfunc)
+            code = obj._simfunc.__code__
+            if code is not p.code:
+                self._retarget(p, code)
+
+        return _optimize
+
+    def _retarget(self, p, code):
+        """ Monitor another code object for a process. """
+        del self._procs[id(p.code)]
+        if self._toolid is not None:
+            sys.monitoring.set_local_events(self._toolid, p.code, 0)
+        p.setCode(code)
+        self._procs[id(code)] = p
+        if self._toolid is not None:
+            sys.monitoring.set_local_events(self._toolid, code,
+                                            self._eventset)
+
+    def remove(self):
+        """ Stop collecting. """
+        for obj in self._optimized:
+            obj.__dict__.pop('_optimize', None)
+        del self._optimized[:]
+        if self._toolid is None:
+            return
+        mon = sys.monitoring
+        for p in self._procs.values():
+            mon.set_local_events(self._toolid, p.code, 0)
+        for event, callback in self._callbacks:
+            mon.register_callback(self._toolid, event, None)
+        mon.free_tool_id(self._toolid)
+        self._toolid = None
+
+    def report(self):
+        """ Return the line and branch coverage per block instance as a
+        string. """
+        out = []
+        totals = [0, 0, 0, 0]
+        for path, procs in self.instances:
+            if not procs:
+                continue
+            out.append('.'.join(path))
+            for p in procs:
+                counts = p.counts()
+                totals = [t + c for t, c in zip(totals, counts)]
+                s = "    %-24s lines %d/%d  branches %d/%d" % ((p.name,) + counts)
+                missing = p.missing()
+                if missing:
+                    s += "  missing %s" % ', '.join(str(n) for n in missing)
+                out.append(s)
+        lines, nrlines, branches, nrbranches = totals
+        if nrlines:
+            out.append("line coverage: %d/%d lines (%.1f%%)"
+                       % (lines, nrlines, 100.0 * lines / nrlines))
+        if nrbranches:
+            out.append("branch coverage: %d/%d branches (%.1f%%)"
+                       % (branches, nrbranches, 100.0 * branches / nrbranches))
+        return '\n'.join(out) + '\n'
+
+
+def codeCoverage(top, name=None):
+    """ Collect line and branch coverage of the processes of a design.
+
+    top -- the block instance of the design
+    name -- name of the top level (default: the name of the block function)
+
+    The collector starts at once, so it should be created before the
+    simulation is run. It requires sys.monitoring, available as of
+    Python 3.12.
+    """
+    if not isinstance(top, _Block):
+        raise TypeError(_error.ArgType)
+    if not hasattr(sys, 'monitoring'):
+        raise RuntimeError(_error.NoMonitoring)
+    if name is None:
+        name = top.func.__name__
+    return _CodeCoverage(name, top)
@@ -23,15 +23,32 @@ _errmsg = "arg of delay constructor should be a natural integer"
 
 class delay(object):
 
-    """ Class to model delay in yield statements. """
+    """ Class to model delay in yield statements.
 
-    def __init__(self, val):
+    Delay objects are immutable, so they are interned: delay(n) returns
+    the same object for the same n, and a loop that waits on a delay
+    doesn't allocate a new one on each iteration.
+    """
+
+    __slots__ = ('_time',)
+
+    _cache = {}
+    _cacheSize = 4096
+
+    def __new__(cls, val):
         """ Return a delay instance.
 
         Required parameters:
         val -- a natural integer representing the desired delay
 
         """
+        d = cls._cache.get(val)
+        if d is not None and type(val) is int:
+            return d
         if not isinstance(val, int) or val < 0:
             raise TypeError(_errmsg)
-        self._time = val
+        d = object.__new__(cls)
+        d._time = val
+        if type(val) is int and len(cls._cache) < cls._cacheSize:
+            cls._cache[val] = d
+        return d
@@ -33,6 +33,8 @@ class EnumType(object):
 
 class EnumItemType(object):
 
+    __slots__ = ()
+
     def __init__(self):
         raise TypeError("class EnumItemType is only intended for type checking on subclasses")
 
@@ -72,16 +74,25 @@ def enum(*names, **kwargs):
 
     class EnumItem(EnumItemType):
 
+        # _val is the code as a bit string, as used by the converters
+        # _intval is the same code as an integer, and _vcd the
+        # precomputed VCD value string
+        __slots__ = ('_index', '_name', '_val', '_intval', '_nrbits',
+                     '_nritems', '_type', '_hash', '_vcd')
+
         def __init__(self, index, name, val, type):
             self._index = index
             self._name = name
             self._val = val
+            self._intval = int(val, 2)
             self._nrbits = type._nrbits
             self._nritems = type._nritems
             self._type = type
+            self._hash = hash((type, index))
+            self._vcd = "s" + name
 
         def __hash__(self):
-            return hash((self._type, self._index))
+            return self._hash
 
         def __repr__(self):
             return "'{}'".format(self._name)
@@ -92,10 +103,10 @@ def enum(*names, **kwargs):
             return self._name
 
         def __int__(self):
-            return int(self._val, 2)
+            return self._intval
 
         def __hex__(self):
-            return hex(int(self._val, 2))
+            return hex(self._intval)
 
         def _toVerilog(self, dontcare=False):
             val = self._val
@@ -120,17 +131,28 @@ def enum(*names, **kwargs):
 
         __le__ = __ge__ = __lt__ = __gt__ = _notImplementedCompare
 
+        # items are singletons: comparison is an identity check, and the
+        # type check is only needed when the identity check fails
+
         def __eq__(self, other):
+            if other is self:
+                return True
+            if type(other) is EnumItem:
+                return False
             if isinstance(other, _Signal):
                 other = other._val
-            if not isinstance(other, EnumItemType) or type(self) is not type(other):
+            if type(other) is not EnumItem:
                 raise TypeError("Type mismatch in enum item comparison")
             return self is other
 
         def __ne__(self, other):
+            if other is self:
+                return False
+            if type(other) is EnumItem:
+                return True
             if isinstance(other, _Signal):
                 other = other._val
-            if not isinstance(other, EnumItemType) or type(self) is not type(other):
+            if type(other) is not EnumItem:
                 raise TypeError("Type mismatch in enum item comparison")
             return self is not other
 
@@ -0,0 +1,257 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Dispatch-table execution of enum-driven state machines.
+
+An always block that decodes a state signal with a chain like
+
+    if state == t_state.A:
+        ...
+    elif state == t_state.B:
+        ...
+    else:
+        ...
+
+evaluates one comparison per branch until it finds a match. This module
+rewrites such chains for simulation: each branch body becomes a function,
+and the chain becomes a single lookup in a dict indexed by the current
+state value. The transformation is only applied when it preserves the
+semantics of the original code.
+
+"""
+import ast
+import builtins
+import sys
+
+from myhdl._Signal import _Signal
+from myhdl._enum import EnumType, EnumItemType
+from myhdl._util import _funcDefAST, _makeFuncDef, _compileFuncs
+
+# minimum number of distinct states in a chain to make dispatch worthwhile
+_minStates = 2
+
+
+class _Resolver(object):
+
+    """ Resolve names in a function body to the objects they refer to. """
+
+    def __init__(self, func):
+        code = func.__code__
+        self.locals = set(code.co_varnames)
+        self.cells = dict(zip(code.co_freevars, func.__closure__ or ()))
+        self.globals = func.__globals__
+
+    def obj(self, node):
+        if isinstance(node, ast.Name):
+            n = node.id
+            if n in self.locals:
+                return None
+            if n in self.cells:
+                try:
+                    return self.cells[n].cell_contents
+                except ValueError:  # empty cell
+                    return None
+            if n in self.globals:
+                return self.globals[n]
+            return getattr(builtins, n, None)
+        elif isinstance(node, ast.Attribute):
+            base = self.obj(node.value)
+            if isinstance(base, EnumType):
+                return getattr(base, node.attr, None)
+        return None
+
+
+def _matchTest(test, resolver):
+    """ Match 'sig == item' or 'item == sig' on an enum signal.
+
+    Return the (signal name, item) pair or None.
+    """
+    if not isinstance(test, ast.Compare) or len(test.ops) != 1 or \
+            not isinstance(test.ops[0], ast.Eq):
+        return None
+    for signode, itemnode in ((test.left, test.comparators[0]),
+                              (test.comparators[0], test.left)):
+        if not isinstance(signode, ast.Name):
+            continue
+        sig = resolver.obj(signode)
+        if not isinstance(sig, _Signal) or \
+                not isinstance(sig._val, EnumItemType):
+            continue
+        item = resolver.obj(itemnode)
+        if isinstance(item, EnumItemType) and type(item) is type(sig._val):
+            return signode.id, item
+    return None
+
+
+def _matchChain(node, resolver):
+    """ Return (signal name, enum type, branches, default) or None. """
+    signame = None
+    branches = []
+    default = []
+    while True:
+        m = _matchTest(node.test, resolver)
+        if m is None or (signame is not None and m[0] != signame):
+            if not branches:
+                return None
+            # the rest of the chain becomes the default branch
+            default = [node]
+            break
+        signame, item = m
+        branches.append((item, node.body))
+        orelse = node.orelse
+        if len(orelse) == 1 and isinstance(orelse[0], ast.If):
+            node = orelse[0]
+        else:
+            default = orelse
+            break
+    items = set(id(item) for item, _ in branches)
+    if len(items) < _minStates:
+        return None
+    enumtype = branches[0][0]._type
+    return signame, enumtype, branches, default
+
+
+def _hasEscape(body):
+    """ Check for control flow that would escape from a branch body. """
+    def check(node, inloop):
+        if isinstance(node, ast.Return):
+            return True
+        if isinstance(node, (ast.Break, ast.Continue)) and not inloop:
+            return True
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef,
+                             ast.ClassDef, ast.Lambda)):
+            return False
+        loop = inloop or isinstance(node, (ast.For, ast.While))
+        for child in ast.iter_child_nodes(node):
+            if check(child, loop):
+                return True
+        return False
+    return any(check(stmt, False) for stmt in body)
+
+
+def _names(node):
+    names = {}
+    for n in ast.walk(node):
+        if isinstance(n, ast.Name):
+            names[n.id] = names.get(n.id, 0) + 1
+    return names
+
+
+class _ChainTransformer(ast.NodeTransformer):
+
+    def __init__(self, fdef, resolver):
+        self.resolver = resolver
+        self.allnames = _names(fdef)
+        self.toplevel = True
+        self.chains = []
+
+    def visit_FunctionDef(self, node):
+        if not self.toplevel:
+            return node  # don't look into embedded functions
+        self.toplevel = False
+        self.generic_visit(node)
+        return node
+
+    def visit_ClassDef(self, node):
+        return node
+
+    def visit_If(self, node):
+        chain = _matchChain(node, self.resolver)
+        if chain is None or not self.movable(node, chain):
+            self.generic_visit(node)
+            return node
+        signame, enumtype, branches, default = chain
+        # nested chains, e.g. for substates
+        for _, body in branches:
+            body[:] = [self.visit(stmt) for stmt in body]
+        default[:] = [self.visit(stmt) for stmt in default]
+        k = len(self.chains)
+        dname = '_myhdl_dispatch%d' % k
+        funcs = []
+        for i, (item, body) in enumerate(branches):
+            funcs.append((item, _makeFuncDef('_myhdl_state%d_%d' % (k, i), body)))
+        defaultdef = _makeFuncDef('_myhdl_default%d' % k,
+                                  default or [ast.Pass()])
+        self.chains.append((dname, enumtype, funcs, defaultdef))
+        # dname[sig._val]()
+        key = ast.Attribute(value=ast.Name(id=signame, ctx=ast.Load()),
+                            attr='_val', ctx=ast.Load())
+        if sys.version_info < (3, 9, 0):
+            key = ast.Index(key)
+        call = ast.Call(
+            func=ast.Subscript(value=ast.Name(id=dname, ctx=ast.Load()),
+                               slice=key, ctx=ast.Load()),
+            args=[], keywords=[])
+        new = ast.Expr(value=call)
+        return ast.copy_location(new, node)
+
+    def movable(self, node, chain):
+        """ Check that the branch bodies can be moved into functions. """
+        _, _, branches, default = chain
+        bodies = [body for _, body in branches] + [default]
+        if any(_hasEscape(body) for body in bodies):
+            return False
+        # locals used in the chain should not be used elsewhere
+        chainnames = _names(node)
+        for n, count in chainnames.items():
+            if n in self.resolver.locals and self.allnames[n] != count:
+                return False
+        return True
+
+
+def _fsmDispatch(func, rewrite=None):
+    """ Return a version of func with enum dispatch chains, or func itself.
+
+    The new function shares the globals and closure cells of func.
+    rewrite is an optional further transformer for the generated function
+    definitions, with a cellvals dict of the free variables it introduces.
+    """
+    fdef = _funcDefAST(func)
+    for node in ast.walk(fdef):
+        if isinstance(node, (ast.Global, ast.Nonlocal)):
+            return func
+    resolver = _Resolver(func)
+    v = _ChainTransformer(fdef, resolver)
+    v.visit(fdef)
+    if not v.chains:
+        return func
+    fdefs = [fdef]
+    for _, _, funcs, defaultdef in v.chains:
+        fdefs.extend(f for _, f in funcs)
+        fdefs.append(defaultdef)
+    # the dispatch tables are filled in after compilation
+    tables = dict((dname, {}) for dname, _, _, _ in v.chains)
+    cellvals = dict(tables)
+    if rewrite is not None:
+        for f in fdefs:
+            rewrite.visit(f)
+        cellvals.update(rewrite.cellvals)
+    newfuncs = _compileFuncs(func, fdefs, cellvals)
+    for dname, enumtype, funcs, defaultdef in v.chains:
+        table = tables[dname]
+        default = newfuncs[defaultdef.name]
+        for name in enumtype._names:
+            table[getattr(enumtype, name)] = default
+        # the first matching branch wins, as in the original chain
+        for item, f in reversed(funcs):
+            table[item] = newfuncs[f.name]
+    newfunc = newfuncs[fdef.name]
+    newfunc.__qualname__ = func.__qualname__
+    newfunc.__wrapped__ = func
+    return newfunc
@@ -19,28 +19,68 @@
 
 """ Module with the intbv class """
 import builtins
+from functools import lru_cache
 
 from myhdl._bin import bin
 
 
+@lru_cache(maxsize=1024)
+def _calcNrbits(min, max):
+    """ Return the bit width required by the [min, max) range.
+
+    The result only depends on the bounds, so it is cached: a design
+    uses a limited set of ranges, and bin() is comparatively expensive.
+    """
+    if min >= 0:
+        return len(bin(max - 1))
+    elif max <= 1:
+        return len(bin(min))
+    else:
+        # make sure there is a leading zero bit in positive numbers
+        return builtins.max(len(bin(max - 1)) + 1, len(bin(min)))
+
+
+@lru_cache(maxsize=1024)
+def _sliceMasks(i, j):
+    """ Return the (max, mask) pair of the [i:j] slice. """
+    lim = 1 << (i - j)
+    return lim, (lim - 1) << j
+
+
+_new = object.__new__
+
+
+def _newintbv(cls, val, min, max, nrbits):
+    """ Fast internal constructor.
+
+    Builds an instance of cls from an int value and already derived
+    attributes, bypassing the min/max/_nrbits derivation and the bounds
+    check. Only to be used when the caller guarantees consistency.
+    """
+    obj = _new(cls)
+    obj._val = val
+    obj._min = min
+    obj._max = max
+    obj._nrbits = nrbits
+    return obj
+
+
 class intbv(object):
-    # __slots__ = ('_val', '_min', '_max', '_nrbits', '_handleBounds')
+    __slots__ = ('_val', '_min', '_max', '_nrbits')
 
     def __init__(self, val=0, min=None, max=None, _nrbits=0):
         if _nrbits:
             self._min = 0
-            self._max = 2 ** _nrbits
+            self._max = 1 << _nrbits
         else:
             self._min = min
             self._max = max
             if max is not None and min is not None:
-                if min >= 0:
-                    _nrbits = len(bin(max - 1))
-                elif max <= 1:
-                    _nrbits = len(bin(min))
-                else:
-                    # make sure there is a leading zero bit in positive numbers
-                    _nrbits = builtins.max(len(bin(max - 1)) + 1, len(bin(min)))
+                try:
+                    _nrbits = _calcNrbits(min, max)
+                except TypeError:
+                    # unhashable bounds, e.g. intbv objects
+                    _nrbits = _calcNrbits.__wrapped__(min, max)
         if isinstance(val, int):
             self._val = val
         elif isinstance(val, str):
@@ -90,24 +130,20 @@ class intbv(object):
 
     # copy methods
     def __copy__(self):
-        c = type(self)(self._val)
-        c._min = self._min
-        c._max = self._max
-        c._nrbits = self._nrbits
-        return c
+        return _newintbv(type(self), self._val, self._min, self._max,
+                         self._nrbits)
 
     def __deepcopy__(self, visit):
-        c = type(self)(self._val)
-        c._min = self._min
-        c._max = self._max
-        c._nrbits = self._nrbits
-        return c
+        return _newintbv(type(self), self._val, self._min, self._max,
+                         self._nrbits)
 
     # iterator method
     def __iter__(self):
         if not self._nrbits:
             raise TypeError("Cannot iterate over unsized intbv")
-        return iter([self[i] for i in range(self._nrbits - 1, -1, -1)])
+        val = self._val
+        return iter([bool((val >> i) & 0x1)
+                     for i in range(self._nrbits - 1, -1, -1)])
 
     # logical testing
     def __bool__(self):
@@ -131,13 +167,13 @@ class intbv(object):
                 raise ValueError("intbv[i:j] requires j >= 0\n"
                                  "            j == %s" % j)
             if i is None:  # default
-                return intbv(self._val >> j)
+                return _newintbv(intbv, self._val >> j, None, None, 0)
             i = int(i)
             if i <= j:
                 raise ValueError("intbv[i:j] requires i > j\n"
                                  "            i, j == %s, %s" % (i, j))
-            res = intbv((self._val & (1 << i) - 1) >> j, _nrbits=i - j)
-            return res
+            lim, mask = _sliceMasks(i, j)
+            return _newintbv(intbv, (self._val & mask) >> j, 0, lim, i - j)
         else:
             i = int(key)
             res = bool((self._val >> i) & 0x1)
@@ -163,11 +199,10 @@ class intbv(object):
             if i <= j:
                 raise ValueError("intbv[i:j] = v requires i > j\n"
                                  "            i, j, v == %s, %s, %s" % (i, j, val))
-            lim = (1 << (i - j))
+            lim, mask = _sliceMasks(i, j)
             if val >= lim or val < -lim:
                 raise ValueError("intbv[i:j] = v abs(v) too large\n"
                                  "            i, j, v == %s, %s, %s" % (i, j, val))
-            mask = (lim - 1) << j
             self._val &= ~mask
             self._val |= (val << j)
             self._handleBounds()
@@ -183,6 +218,22 @@ class intbv(object):
 
             self._handleBounds()
 
+    def view(self, i, j=0):
+        """ Return a zero-copy view on the [i:j] slice.
+
+        The view does not hold a value of its own: reading it extracts
+        the slice from the current parent value, and assigning to it
+        writes through to the parent.
+        """
+        i, j = int(i), int(j)
+        if j < 0:
+            raise ValueError("intbv.view(i, j) requires j >= 0\n"
+                             "            j == %s" % j)
+        if i <= j:
+            raise ValueError("intbv.view(i, j) requires i > j\n"
+                             "            i, j == %s, %s" % (i, j))
+        return _IntbvSlice(self, i, j)
+
     # integer-like methods
 
     def __add__(self, other):
@@ -252,7 +303,7 @@ class intbv(object):
 
     def __lshift__(self, other):
         if isinstance(other, intbv):
-            return intbv(int(self._val) << other._val)
+            return _newintbv(intbv, self._val << other._val, None, None, 0)
         else:
             return intbv(int(self._val) << other)
 
@@ -261,7 +312,7 @@ class intbv(object):
 
     def __rshift__(self, other):
         if isinstance(other, intbv):
-            return intbv(self._val >> other._val)
+            return _newintbv(intbv, self._val >> other._val, None, None, 0)
         else:
             return intbv(self._val >> other)
 
@@ -270,7 +321,7 @@ class intbv(object):
 
     def __and__(self, other):
         if isinstance(other, intbv):
-            return intbv(self._val & other._val)
+            return _newintbv(intbv, self._val & other._val, None, None, 0)
         else:
             return intbv(self._val & other)
 
@@ -279,7 +330,7 @@ class intbv(object):
 
     def __or__(self, other):
         if isinstance(other, intbv):
-            return intbv(self._val | other._val)
+            return _newintbv(intbv, self._val | other._val, None, None, 0)
         else:
             return intbv(self._val | other)
 
@@ -288,7 +339,7 @@ class intbv(object):
 
     def __xor__(self, other):
         if isinstance(other, intbv):
-            return intbv(self._val ^ other._val)
+            return _newintbv(intbv, self._val ^ other._val, None, None, 0)
         else:
             return intbv(self._val ^ other)
 
@@ -405,9 +456,10 @@ class intbv(object):
 
     def __invert__(self):
         if self._nrbits and self._min >= 0:
-            return intbv(~self._val & (1 << self._nrbits) - 1)
+            return _newintbv(intbv, ~self._val & (1 << self._nrbits) - 1,
+                             None, None, 0)
         else:
-            return intbv(~self._val)
+            return _newintbv(intbv, ~self._val, None, None, 0)
 
     def __int__(self):
         return int(self._val)
@@ -537,6 +589,10 @@ class intbv(object):
             if sign:
                 retVal -= 1 << msb
 
+            # the result is within range by construction
+            M = 1 << msb
+            return _newintbv(intbv, retVal, -M, M, self._nrbits)
+
         else:  # value is returned just as is
             retVal = self._val
 
@@ -544,7 +600,7 @@ class intbv(object):
             M = 2 ** (self._nrbits - 1)
             return intbv(retVal, min=-M, max=M)
         else:
-            return intbv(retVal)
+            return _newintbv(intbv, retVal, None, None, 0)
 
     def unsigned(self):
         ''' Return new intbv with the values interpreted as unsigned
@@ -558,7 +614,70 @@ class intbv(object):
         else:  # value is returned just as is
             retVal = self._val
 
-        if self._nrbits:
-            return intbv(retVal)[self._nrbits:]
+        nrbits = self._nrbits
+        if nrbits:
+            return _newintbv(intbv, retVal & (1 << nrbits) - 1,
+                             0, 1 << nrbits, nrbits)
         else:
-            return intbv(retVal)
+            return _newintbv(intbv, retVal, None, None, 0)
+
+
+class _IntbvSlice(intbv):
+
+    """ Zero-copy view on a slice of a parent intbv.
+
+    The _val attribute is a property that reads from and writes to the
+    parent, so all intbv methods operate on the live slice value.
+    """
+
+    __slots__ = ('_parent', '_shift', '_mask', '_pending')
+
+    def __init__(self, parent, i, j):
+        lim, mask = _sliceMasks(i, j)
+        self._parent = parent
+        self._shift = j
+        self._mask = mask
+        self._pending = None
+        self._min = 0
+        self._max = lim
+        self._nrbits = i - j
+
+    @property
+    def _val(self):
+        val = self._pending
+        if val is None:
+            val = (self._parent._val & self._mask) >> self._shift
+        return val
+
+    @_val.setter
+    def _val(self, val):
+        # in-place updates may write intermediate values: hold them
+        # until _handleBounds, that checks and writes the final one
+        self._pending = val
+
+    def _handleBounds(self):
+        val = self._pending
+        if val is None:
+            return
+        self._pending = None
+        if val >= self._max:
+            raise ValueError("intbv value %s >= maximum %s" %
+                             (val, self._max))
+        if val < 0:
+            raise ValueError("intbv value %s < minimum 0" % val)
+        parent = self._parent
+        parent._val = parent._val & ~self._mask | val << self._shift
+        parent._handleBounds()
+
+    # copies are snapshots of the current value
+    def __copy__(self):
+        return _newintbv(intbv, self._val, self._min, self._max,
+                         self._nrbits)
+
+    def __deepcopy__(self, visit):
+        return _newintbv(intbv, self._val, self._min, self._max,
+                         self._nrbits)
+
+    def __repr__(self):
+        return "%r.view(%s, %s)" % (self._parent,
+                                    self._shift + self._nrbits, self._shift)
@@ -18,7 +18,7 @@
 #  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
 
 """ Module with the modbv class """
-from ._intbv import intbv
+from ._intbv import intbv, _newintbv
 
 
 class modbv(intbv):
@@ -46,13 +46,14 @@ class modbv(intbv):
                 raise ValueError("modbv[i:j] requires j >= 0\n"
                                  "            j == %s" % j)
             if i is None:  # default
-                return modbv(self._val >> j)
+                return _newintbv(modbv, self._val >> j, None, None, 0)
             i = int(i)
             if i <= j:
                 raise ValueError("modbv[i:j] requires i > j\n"
                                  "            i, j == %s, %s" % (i, j))
-            res = modbv((self._val & (1 << i) - 1) >> j, _nrbits=i - j)
-            return res
+            w = i - j
+            return _newintbv(modbv, (self._val & (1 << i) - 1) >> j,
+                             0, 1 << w, w)
         else:
             i = int(key)
             res = bool((self._val >> i) & 0x1)
@@ -0,0 +1,121 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module that implements packed structs.
+
+A packed struct is an intbv with named bit fields. It can be used as the
+value of a Signal, so that a bus header is a single signal instead of
+one signal per field.
+
+"""
+from myhdl._intbv import intbv, _newintbv
+from myhdl._Signal import _Signal
+
+
+class PackedStructType(intbv):
+
+    """ Base class of the types returned by packedstruct.
+
+    _fields maps each field name to its (hi, lo) slice bounds.
+    """
+
+    __slots__ = []
+    _fields = {}
+
+    def __init__(self, val=0, **fields):
+        intbv.__init__(self, val, _nrbits=self._width)
+        for name, v in fields.items():
+            if name not in self._fields:
+                raise AttributeError("%s has no field %r" %
+                                     (type(self).__name__, name))
+            setattr(self, name, v)
+
+    def _fieldValues(self):
+        return [(name, getattr(self, name)) for name in self._fields]
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__,
+                           ", ".join("%s=%s" % (n, int(v))
+                                     for n, v in self._fieldValues()))
+
+
+def _makeField(hi, lo):
+    w = hi - lo
+    lim = 1 << w
+    mask = (lim - 1) << lo
+    nmask = ~mask
+
+    if w == 1:
+        def fget(self):
+            return bool(self._val & mask)
+    else:
+        def fget(self):
+            return _newintbv(intbv, (self._val & mask) >> lo, 0, lim, w)
+
+    def fset(self, val):
+        if isinstance(val, (intbv, _Signal)):
+            val = int(val)
+        if val >= lim or val < -lim:
+            raise ValueError("field value %s too large for %s bits" %
+                             (val, w))
+        self._val = self._val & nmask | (val << lo) & mask
+
+    return property(fget, fset)
+
+
+def packedstruct(*fields, **kwargs):
+    """ Return a new packed struct type.
+
+    fields -- (name, width) pairs, from the msb down to the lsb
+    name -- optional type name (default: 'PackedStruct')
+
+    """
+    typename = kwargs.pop('name', 'PackedStruct')
+    if kwargs:
+        raise TypeError("packedstruct: unexpected keyword arguments %s" %
+                        ", ".join(kwargs))
+    if not fields:
+        raise ValueError("packedstruct requires at least one field")
+    widths = []
+    for f in fields:
+        if not isinstance(f, tuple) or len(f) != 2:
+            raise TypeError("packedstruct fields should be (name, width) pairs")
+        name, w = f
+        if not isinstance(name, str) or not name.isidentifier():
+            raise TypeError("packedstruct field name should be an identifier, "
+                            "got %r" % (name,))
+        if name.startswith('_') or hasattr(_Signal, name) or \
+                hasattr(PackedStructType, name):
+            raise ValueError("packedstruct field name %r is reserved" % name)
+        if not isinstance(w, int) or w <= 0:
+            raise ValueError("packedstruct field %s: width should be a "
+                             "positive integer, got %r" % (name, w))
+        widths.append((name, w))
+
+    width = sum(w for _, w in widths)
+    namespace = {'__slots__': [], '_width': width, '_fields': {}}
+    hi = width
+    for name, w in widths:
+        if name in namespace:
+            raise ValueError("packedstruct field names should be unique")
+        lo = hi - w
+        namespace['_fields'][name] = (hi, lo)
+        namespace[name] = _makeField(hi, lo)
+        hi = lo
+    return type(typename, (PackedStructType,), namespace)
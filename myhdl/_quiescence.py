@@ -0,0 +1,268 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2008 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the fast-forwarding of quiescent clock cycles.
+
+A design is quiescent when a clock edge triggers its always_seq blocks,
+and no signal other than a clock changes. As long as nothing else
+happens, the following clock edges will not change anything either, so
+the simulator can skip them and advance the clocks to the next event
+that is scheduled by another process.
+
+Only always_seq blocks in a block decorated with @block(quiescent=True)
+may be skipped: they should not keep state outside of signals.
+"""
+import ast
+import heapq
+from itertools import repeat
+
+from myhdl import _simulator
+from myhdl._simulator import _futureEvents
+from myhdl._Signal import _Signal, _DelayedSignal
+from myhdl._delay import delay
+from myhdl._always import _Always
+from myhdl._always_seq import _AlwaysSeq
+from myhdl._instance import _Instantiator
+from myhdl._Waiter import _DelayWaiter, _SubscribeWaiter
+
+
+class _Clock(object):
+
+    """ A clock generator that toggles a bool signal with a fixed period. """
+
+    __slots__ = ('sig', 'period', 'waiter', 'toggles')
+
+    def __init__(self, sig, period, waiter):
+        self.sig = sig
+        self.period = period
+        self.waiter = waiter
+        self.toggles = 0
+
+
+def _body(inst):
+    """ Return the statements of the function of an instance. """
+    tree = inst.ast
+    body = tree.body[0].body
+    if body and isinstance(body[0], ast.Expr) and \
+            isinstance(body[0].value, ast.Constant) and \
+            isinstance(body[0].value.value, str):
+        body = body[1:]
+    return body
+
+
+def _toggled(node, symdict):
+    """ Return the signal that a 'sig.next = not sig' statement toggles. """
+    if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+        return None
+    target, value = node.targets[0], node.value
+    if not (isinstance(target, ast.Attribute) and target.attr == 'next' and
+            isinstance(target.value, ast.Name)):
+        return None
+    if not (isinstance(value, ast.UnaryOp) and isinstance(value.op, ast.Not)
+            and isinstance(value.operand, ast.Name)):
+        return None
+    if value.operand.id != target.value.id:
+        return None
+    sig = symdict.get(target.value.id)
+    if isinstance(sig, _Signal) and not isinstance(sig, _DelayedSignal) \
+            and isinstance(sig._val, bool):
+        return sig
+    return None
+
+
+def _delayOf(node, symdict):
+    """ Return the time of a 'yield delay(t)' statement. """
+    if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Yield)):
+        return None
+    call = node.value.value
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and
+            symdict.get(call.func.id) is delay and len(call.args) == 1):
+        return None
+    arg = call.args[0]
+    if isinstance(arg, ast.Constant):
+        t = arg.value
+    elif isinstance(arg, ast.Name):
+        t = symdict.get(arg.id)
+    else:
+        return None
+    if isinstance(t, int) and t > 0:
+        return t
+    return None
+
+
+def _clockOf(inst, waiter):
+    """ Return a _Clock if an instance is a plain clock generator.
+
+    Two forms are recognized: an always block on a delay that toggles a
+    bool signal, and an instance that does the same in a while loop.
+    """
+    if not isinstance(waiter, _DelayWaiter):
+        return None
+    symdict = inst.symdict
+    try:
+        body = _body(inst)
+    except (OSError, TypeError):
+        return None
+    if isinstance(inst, _Always):
+        senslist = inst.senslist
+        if len(senslist) != 1 or not isinstance(senslist[0], delay) or \
+                len(body) != 1:
+            return None
+        sig = _toggled(body[0], symdict)
+        if sig is None or senslist[0]._time <= 0:
+            return None
+        return _Clock(sig, senslist[0]._time, waiter)
+    if len(body) != 1 or not isinstance(body[0], ast.While):
+        return None
+    loop = body[0]
+    if loop.orelse or not (isinstance(loop.test, ast.Constant) and
+                           loop.test.value):
+        return None
+    if len(loop.body) != 2:
+        return None
+    for d, s in (loop.body, reversed(loop.body)):
+        period, sig = _delayOf(d, symdict), _toggled(s, symdict)
+        if period is not None and sig is not None:
+            return _Clock(sig, period, waiter)
+    return None
+
+
+def _fastForward(procs):
+    """ Return a _FastForward for a list of (instance, waiter) pairs.
+
+    Return None if there are no quiescent always_seq blocks.
+    """
+    callbacks = []
+    clocks = []
+    for inst, waiter in procs:
+        if isinstance(inst, _AlwaysSeq):
+            if inst._quiescent and not inst.varregs and \
+                    isinstance(waiter, _SubscribeWaiter):
+                callbacks.append(waiter.waiter)
+        elif isinstance(inst, _Instantiator):
+            clock = _clockOf(inst, waiter)
+            if clock is not None:
+                clocks.append(clock)
+    if not callbacks or not clocks:
+        return None
+    return _FastForward(clocks, callbacks)
+
+
+class _FastForward(object):
+
+    """ Skip clock cycles in which the design is quiescent.
+
+    The simulator reports signal updates with check, and the end of a
+    time step with advance.
+    """
+
+    def __init__(self, clocks, callbacks):
+        self.clocks = dict((id(c.sig), c) for c in clocks)
+        self.waiters = dict((id(c.waiter), c) for c in clocks)
+        self.callbacks = set(id(w) for w in callbacks)
+        self.quiet = True
+        self.skipped = 0
+
+    def check(self, siglist):
+        """ Check the signal updates of a delta cycle. """
+        if not self.quiet:
+            return
+        clocks = self.clocks
+        for s in siglist:
+            c = clocks.get(id(s))
+            if c is None:
+                if s._changed():
+                    self.quiet = False
+                    return
+            elif s._changed():
+                c.toggles += 1
+
+    def advance(self, limit=None):
+        """ Fast-forward the clocks at the end of a quiescent time step.
+
+        limit -- optional time that is not skipped past
+        """
+        clocks = self.clocks.values()
+        if not self.quiet:
+            self.quiet = True
+            for c in clocks:
+                c.toggles = 0
+            return
+        # both edges of each clock should have passed without changes
+        for c in clocks:
+            if c.toggles < 2:
+                return
+            if not self._skippable(c.sig):
+                return
+        pending = {}
+        end = None
+        for i, (t, event) in enumerate(_futureEvents):
+            c = self.waiters.get(id(event))
+            if c is not None:
+                pending[id(c.sig)] = i
+            elif end is None or t < end:
+                end = t
+        if limit is not None and (end is None or limit < end):
+            end = limit
+        if end is None or len(pending) != len(self.clocks):
+            return
+        if _simulator._tracing:
+            self._trace(end, pending)
+        for c in clocks:
+            i = pending[id(c.sig)]
+            t = _futureEvents[i][0]
+            if t >= end:
+                continue
+            n = (end - t + c.period - 1) // c.period
+            if not _simulator._tracing and n & 1:
+                c.sig._val = c.sig._next = not c.sig._val
+            _futureEvents[i] = (t + n * c.period, c.waiter)
+            self.skipped += n
+
+    def _skippable(self, sig):
+        """ Return True if only quiescent blocks wait on a clock. """
+        if sig._eventWaiters or sig._posedgeWaiters or sig._negedgeWaiters:
+            return False
+        if sig._shadows is not None:
+            return False
+        subs = sig._subs
+        if subs is not None:
+            callbacks = self.callbacks
+            for waiters in (subs.event, subs.posedge, subs.negedge):
+                for w in waiters:
+                    if id(w) not in callbacks:
+                        return False
+        return True
+
+    def _trace(self, end, pending):
+        """ Toggle the clocks one by one, to write them to the VCD file. """
+        tf = _simulator._tf
+        toggles = []
+        for k, c in self.clocks.items():
+            t = _futureEvents[pending[k]][0]
+            toggles.append(zip(range(t, end, c.period), repeat(k)))
+        last = None
+        for t, k in heapq.merge(*toggles):
+            if t != last:
+                print("#%s" % t, file=tf)
+                last = t
+            sig = self.clocks[k].sig
+            sig._val = sig._next = not sig._val
+            if sig._tracing:
+                sig._printVcd()
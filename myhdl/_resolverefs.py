@@ -1,10 +1,12 @@
 import ast
 import itertools
+import sys
 from types import FunctionType
 
 from myhdl._util import _flatten
 from myhdl._enum import EnumType
 from myhdl._Signal import SignalType
+from myhdl._packedstruct import PackedStructType
 
 
 class Data():
@@ -41,6 +43,10 @@ class _AttrRefTransformer(ast.NodeTransformer):
     def visit_Attribute(self, node):
         self.generic_visit(node)
 
+        field = self._fieldToSlice(node)
+        if field is not None:
+            return field
+
         reserved = ('next', 'posedge', 'negedge', 'max', 'min', 'val', 'signed',
                     'verilog_code', 'vhdl_code')
         if node.attr in reserved:
@@ -75,6 +81,34 @@ class _AttrRefTransformer(ast.NodeTransformer):
         new_node = ast.Name(id=new_name, ctx=node.value.ctx)
         return ast.copy_location(new_node, node)
 
+    def _fieldToSlice(self, node):
+        """ Rewrite a packed struct field reference into a slice.
+
+        Handles s.field and s.next.field, where s is a Signal with a packed
+        struct value or a packed struct object.
+        """
+        base = node.value
+        if isinstance(base, ast.Attribute) and base.attr == 'next':
+            base = base.value
+        if not isinstance(base, ast.Name) or base.id not in self.data.symdict:
+            return None
+        obj = self.data.symdict[base.id]
+        if isinstance(obj, SignalType):
+            obj = obj._val
+        if not isinstance(obj, PackedStructType) or node.attr not in obj._fields:
+            return None
+        hi, lo = obj._fields[node.attr]
+        if hi - lo == 1:
+            index = ast.Constant(lo)
+            if sys.version_info < (3, 9, 0):
+                index = ast.Index(index)
+        else:
+            index = ast.Slice(lower=ast.Constant(hi), upper=ast.Constant(lo),
+                              step=None)
+        new_node = ast.Subscript(value=node.value, slice=index, ctx=node.ctx)
+        ast.copy_location(new_node, node)
+        return ast.fix_missing_locations(new_node)
+
     def visit_FunctionDef(self, node):
         nodes = _flatten(node.body, node.args)
         for n in nodes:
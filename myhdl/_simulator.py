@@ -30,6 +30,7 @@ _blocks = []
 _siglist = []
 _futureEvents = []
 _time = 0
+_delta = 0  # counts delta cycles, see _CallbackWaiter
 _tracing = 0
 _tf = None
 
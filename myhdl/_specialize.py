@@ -0,0 +1,357 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Specialised simulation code for always blocks.
+
+In the body of an always block, every signal read goes through the
+operator forwarding methods of _Signal, and every signal assignment
+through the 'next' property. This module rewrites the body into a
+function that accesses the signal state directly:
+
+    sig                  ->  sig._val        (where only its value is used)
+    sig                  ->  sig._val._val   (intbv operand of arithmetic)
+    sig.next = expr      ->  sig._setNextVal(expr); _myhdl_append(sig)
+    sig.next[i] = expr   ->  _myhdl_append(sig); sig._next[i] = expr
+
+where _myhdl_append appends to the list of signals to update. Names are
+classified by the objects they refer to in the function's closure and
+globals, and the compiled code is cached per code object and
+classification, so that instances of the same block share it.
+
+"""
+import ast
+import sys
+
+from myhdl._simulator import _siglist
+from myhdl._Signal import _Signal, _isListOfSigs
+from myhdl._enum import EnumType
+from myhdl._intbv import intbv
+from myhdl._modbv import modbv
+from myhdl._concat import concat
+from myhdl._util import _funcDefAST, _compileFactory, _bindFuncs
+from myhdl._fsmdispatch import _Resolver, _fsmDispatch
+
+# calls that return a plain value, not a signal
+_valueFuncs = (int, bool, intbv, modbv, concat)
+
+# comparison operators that only use the values of their operands
+_valueCmpOps = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+
+# intbv operators that return an int, so that intbv operands can be
+# replaced by their int value
+_intOps = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+           ast.Pow)
+
+# name kinds, an 'i' prefix marks intbv values
+_sigKinds = ('sig', 'isig', 'rosig', 'irosig')
+_writableKinds = ('sig', 'isig')
+_losKinds = ('los', 'ilos')
+_intKinds = ('isig', 'irosig', 'ilos')
+
+_specCache = {}
+
+# the intbv methods that the raw int rewrite bypasses
+_rawMethods = ('__bool__', '__int__', '__index__', '__getitem__',
+               '__setitem__', '__eq__', '__ne__', '__lt__', '__le__',
+               '__gt__', '__ge__', '__add__', '__radd__', '__sub__',
+               '__rsub__', '__mul__', '__rmul__', '__truediv__',
+               '__floordiv__', '__mod__', '__pow__', '__and__', '__or__',
+               '__xor__', '__invert__', '__neg__', '__lshift__',
+               '__rshift__')
+
+# intbv types by whether their values can be accessed as a raw int
+_rawTypes = {intbv: True, modbv: True}
+
+
+def _isRawInt(val):
+    """ Return True for an intbv value that can be accessed as a raw int.
+
+    Subclasses that override the operators, like xbv with its X and Z
+    bits, keep their operators.
+    """
+    t = type(val)
+    raw = _rawTypes.get(t)
+    if raw is None:
+        raw = _rawTypes[t] = isinstance(val, intbv) and \
+            all(getattr(t, n) is getattr(intbv, n) for n in _rawMethods)
+    return raw
+
+
+def _kind(obj):
+    if isinstance(obj, _Signal):
+        # signals with a custom 'next' property are only read directly
+        kind = 'sig' if type(obj).next is _Signal.next else 'rosig'
+        if _isRawInt(obj._val):
+            kind = 'i' + kind
+        return kind
+    if _isListOfSigs(obj):
+        if all(_isRawInt(s._val) for s in obj):
+            return 'ilos'
+        return 'los'
+    if isinstance(obj, EnumType):
+        return 'enum'
+    if any(obj is f for f in _valueFuncs):
+        return 'func'
+    return 'obj'
+
+
+def _nameKinds(func, resolver):
+    """ Classify the non-local names of func by the objects they refer to. """
+    code = func.__code__
+    kinds = {}
+    for n in code.co_freevars + code.co_names:
+        if n in resolver.locals or n in kinds:
+            continue
+        kinds[n] = _kind(resolver.obj(ast.Name(id=n, ctx=ast.Load())))
+    return kinds
+
+
+class _SignalRewriter(ast.NodeTransformer):
+
+    """ Rewrite signal accesses in a function body to direct accesses. """
+
+    cellvals = {'_myhdl_append': _siglist.append}
+
+    def __init__(self, kinds):
+        self.kinds = kinds
+        self.toplevel = True
+        self.changed = False
+
+    def kind(self, node):
+        if isinstance(node, ast.Name):
+            return self.kinds.get(node.id)
+        return None
+
+    def attr(self, node, attr):
+        self.changed = True
+        return ast.copy_location(
+            ast.Attribute(value=node, attr=attr, ctx=ast.Load()), node)
+
+    def append(self, node):
+        self.changed = True
+        call = ast.Call(func=ast.Name(id='_myhdl_append', ctx=ast.Load()),
+                        args=[ast.Name(id=node.id, ctx=ast.Load())],
+                        keywords=[])
+        return ast.copy_location(ast.Expr(value=call), node)
+
+    def value(self, node, raw=False):
+        """ Rewrite an expression of which only the value is used.
+
+        With raw, intbv values may be replaced by their int value.
+        """
+        kind = self.kind(node)
+        if kind in _sigKinds:
+            node = self.attr(node, '_val')
+        elif isinstance(node, ast.Subscript) and \
+                self.kind(node.value) in _losKinds:
+            kind = self.kind(node.value)
+            node.slice = self.index(node.slice)
+            node = self.attr(node, '_val')
+        elif isinstance(node, ast.BoolOp):
+            node.values = [self.value(v, raw) for v in node.values]
+            return node
+        elif isinstance(node, ast.IfExp):
+            node.test = self.value(node.test, True)
+            node.body = self.value(node.body, raw)
+            node.orelse = self.value(node.orelse, raw)
+            return node
+        else:
+            return self.visit(node)
+        if raw and kind in _intKinds:
+            node = self.attr(node, '_val')
+        return node
+
+    def index(self, node):
+        # indices and slice bounds are converted to int anyway
+        if sys.version_info < (3, 9, 0) and isinstance(node, ast.Index):
+            node.value = self.index(node.value)
+            return node
+        if isinstance(node, ast.Slice):
+            for f in ('lower', 'upper', 'step'):
+                v = getattr(node, f)
+                if v is not None:
+                    setattr(node, f, self.value(v, True))
+            return node
+        return self.value(node, True)
+
+    def isvalue(self, node):
+        """ Check that an expression can not evaluate to a signal. """
+        if isinstance(node, (ast.Constant, ast.BinOp, ast.UnaryOp,
+                             ast.Compare, ast.JoinedStr)):
+            return True
+        if isinstance(node, ast.Attribute):
+            return node.attr == '_val' or self.kind(node.value) == 'enum'
+        if isinstance(node, ast.Name):
+            return self.kind(node) in ('obj', 'enum', 'func')
+        if isinstance(node, ast.Subscript):
+            return isinstance(node.value, ast.Attribute) and \
+                node.value.attr == '_val'
+        if isinstance(node, ast.Call):
+            return self.kind(node.func) == 'func'
+        if isinstance(node, ast.BoolOp):
+            return all(self.isvalue(v) for v in node.values)
+        if isinstance(node, ast.IfExp):
+            return self.isvalue(node.body) and self.isvalue(node.orelse)
+        return False
+
+    # embedded scopes have their own names and are left alone
+    def visit_FunctionDef(self, node):
+        if not self.toplevel:
+            return node
+        self.toplevel = False
+        self.generic_visit(node)
+        self.toplevel = True
+        return node
+
+    def skip(self, node):
+        return node
+
+    visit_AsyncFunctionDef = visit_ClassDef = visit_Lambda = skip
+    visit_ListComp = visit_SetComp = visit_DictComp = skip
+    visit_GeneratorExp = skip
+
+    def issig(self, node):
+        """ Check that an expression refers to a signal. """
+        if self.kind(node) in _sigKinds:
+            return True
+        return isinstance(node, ast.Subscript) and \
+            self.kind(node.value) in _losKinds
+
+    def visit_Assign(self, node):
+        if len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Attribute) and target.attr == 'next' \
+                    and self.issig(target.value):
+                # the next setter only uses the value of a signal, and
+                # intbv signals take an int as well
+                kind = self.kind(target.value)
+                if isinstance(target.value, ast.Subscript):
+                    kind = self.kind(target.value.value)
+                node.value = self.value(node.value, kind in ('isig', 'ilos'))
+                if kind in _writableKinds and self.isvalue(node.value):
+                    sig = target.value
+                    call = ast.Call(func=self.attr(sig, '_setNextVal'),
+                                    args=[node.value], keywords=[])
+                    setnext = ast.copy_location(ast.Expr(value=call), node)
+                    return [setnext, self.append(sig)]
+                target.value = self.visit(target.value)
+                return node
+            if isinstance(target, ast.Subscript) and \
+                    isinstance(target.value, ast.Attribute) and \
+                    target.value.attr == 'next' and \
+                    self.kind(target.value.value) in _writableKinds:
+                sig = target.value.value
+                node.value = self.value(node.value)
+                target.slice = self.index(target.slice)
+                target.value = self.attr(sig, '_next')
+                return [self.append(sig), node]
+        self.generic_visit(node)
+        return node
+
+    def visit_Subscript(self, node):
+        if isinstance(node.ctx, ast.Load) and \
+                self.kind(node.value) in _sigKinds:
+            node.value = self.attr(node.value, '_val')
+            node.slice = self.index(node.slice)
+            return node
+        if self.kind(node.value) in _losKinds:
+            node.slice = self.index(node.slice)
+            return node
+        self.generic_visit(node)
+        return node
+
+    def visit_BinOp(self, node):
+        raw = isinstance(node.op, _intOps)
+        node.left = self.value(node.left, raw)
+        node.right = self.value(node.right, raw)
+        return node
+
+    def visit_UnaryOp(self, node):
+        node.operand = self.value(node.operand)
+        return node
+
+    def visit_Compare(self, node):
+        if not all(isinstance(op, _valueCmpOps) for op in node.ops):
+            self.generic_visit(node)
+            return node
+        node.left = self.value(node.left, True)
+        node.comparators = [self.value(c, True) for c in node.comparators]
+        return node
+
+    def visit_If(self, node):
+        node.test = self.value(node.test, True)
+        node.body = self.visitList(node.body)
+        node.orelse = self.visitList(node.orelse)
+        return node
+
+    visit_While = visit_If
+
+    def visit_IfExp(self, node):
+        node.test = self.value(node.test, True)
+        node.body = self.visit(node.body)
+        node.orelse = self.visit(node.orelse)
+        return node
+
+    def visit_Assert(self, node):
+        node.test = self.value(node.test, True)
+        return node
+
+    def visitList(self, stmts):
+        res = []
+        for stmt in stmts:
+            new = self.visit(stmt)
+            if isinstance(new, list):
+                res.extend(new)
+            else:
+                res.append(new)
+        return res
+
+
+def _specialize(func, fsm_dispatch=False):
+    """ Return a specialised version of func for simulation, or func itself.
+
+    The new function shares the globals and closure cells of func.
+    With fsm_dispatch, enum dispatch chains are also set up, see
+    _fsmDispatch.
+    """
+    resolver = _Resolver(func)
+    kinds = _nameKinds(func, resolver)
+    if fsm_dispatch:
+        newfunc = _fsmDispatch(func, rewrite=_SignalRewriter(kinds))
+        if newfunc is not func:
+            return newfunc
+    key = (func.__code__, tuple(sorted(kinds.items())))
+    if key not in _specCache:
+        factorycode = None
+        fdef = _funcDefAST(func)
+        if not any(isinstance(node, (ast.Global, ast.Nonlocal))
+                   for node in ast.walk(fdef)):
+            v = _SignalRewriter(kinds)
+            v.visit(fdef)
+            if v.changed:
+                factorycode = _compileFactory(func, [fdef], v.cellvals)
+        _specCache[key] = factorycode
+    factorycode = _specCache[key]
+    if factorycode is None:
+        return func
+    newfunc = _bindFuncs(func, factorycode,
+                         _SignalRewriter.cellvals)[func.__name__]
+    newfunc.__qualname__ = func.__qualname__
+    newfunc.__wrapped__ = func
+    return newfunc
@@ -22,8 +22,10 @@
 """
 import __future__
 import ast
+import copy
 import sys
 import inspect
+import types
 
 from tokenize import generate_tokens, untokenize, INDENT
 from io import StringIO
@@ -93,6 +95,94 @@ def _makeAST(f):
     return tree
 
 
+_astCache = {}
+
+
+def _funcDefAST(f):
+    """ Return a fresh copy of the FunctionDef node of a function.
+
+    Parsing the source is expensive, and instances of the same block
+    share the same code object, so the pristine tree is cached per code
+    object. Line numbers refer to the source file.
+    """
+    code = f.__code__
+    if code not in _astCache:
+        tree = _makeAST(f)
+        ast.increment_lineno(tree, tree.lineoffset)
+        fdef = tree.body[0]
+        fdef.decorator_list = []
+        fdef.sourcefile = tree.sourcefile
+        _astCache[code] = fdef
+    fdef = _astCache[code]
+    node = copy.deepcopy(fdef)
+    node.sourcefile = fdef.sourcefile
+    return node
+
+
+def _makeFuncDef(name, body):
+    """ Return a FunctionDef node without arguments. """
+    node = ast.parse("def %s():\n    pass" % name).body[0]
+    node.body = body
+    return node
+
+
+def _compileFactory(f, fdefs, cellnames=()):
+    """ Compile function definitions in the context of function f.
+
+    fdefs is a list of FunctionDef nodes, typically a transformed version of
+    f's own definition and some helpers. cellnames are additional free
+    variable names. The definitions are wrapped in a factory function that
+    declares the free variables as its locals, so that they compile as
+    free variables. Returns the code object of the factory, which does not
+    depend on the closure of f and can be reused by instances that share
+    f's code object.
+    """
+    freevars = list(f.__code__.co_freevars)
+    freevars.extend(n for n in cellnames if n not in freevars)
+    factory = _makeFuncDef('_myhdl_factory', [])
+    for n in freevars:
+        factory.body.append(ast.Assign(targets=[ast.Name(id=n, ctx=ast.Store())],
+                                       value=ast.Constant(None)))
+    factory.body.extend(fdefs)
+    mod = ast.Module(body=[factory], type_ignores=[])
+    ast.fix_missing_locations(mod)
+    filename = getattr(fdefs[0], 'sourcefile', '<myhdl>')
+    modcode = compile(mod, filename, 'exec', dont_inherit=True)
+    return [c for c in modcode.co_consts if isinstance(c, types.CodeType)][0]
+
+
+def _bindFuncs(f, factorycode, cellvals=None):
+    """ Create the functions compiled in factorycode.
+
+    The functions share f's globals and closure cells, so they see the same
+    objects as f itself. cellvals maps additional free variable names to
+    their values. Returns a dict that maps names to the new function objects.
+    """
+    code = f.__code__
+    cells = dict(zip(code.co_freevars, f.__closure__ or ()))
+    if cellvals:
+        for n, v in cellvals.items():
+            cells[n] = types.CellType(v)
+    funcs = {}
+    for c in factorycode.co_consts:
+        if isinstance(c, types.CodeType):
+            closure = tuple(cells[n] for n in c.co_freevars) or None
+            funcs[c.co_name] = types.FunctionType(c, f.__globals__, c.co_name,
+                                                  None, closure)
+    return funcs
+
+
+def _compileFuncs(f, fdefs, cellvals=None):
+    """ Compile function definitions in the context of function f.
+
+    Returns a dict that maps names to the new function objects, see
+    _compileFactory and _bindFuncs.
+    """
+    cellvals = cellvals or {}
+    factorycode = _compileFactory(f, fdefs, cellvals)
+    return _bindFuncs(f, factorycode, cellvals)
+
+
 def _genfunc(gen):
     from myhdl._always_comb import _AlwaysComb
     from myhdl._always_seq import _AlwaysSeq
@@ -1,6 +1,7 @@
 #pylint: disable=invalid-name
 
 import ast
+import builtins
 
 from myhdl._intbv import intbv
 from myhdl._Signal import _Signal, _isListOfSigs
@@ -100,3 +101,53 @@ class _SigNameVisitor(ast.NodeVisitor):
         self.context = 'pass'
         self.generic_visit(node)
         self.context == 'input'
+
+
+class _PurityVisitor(ast.NodeVisitor):
+
+    """ Find the constructs that keep a function from being pure.
+
+    A pure function only reads signals and constants, and only calls a
+    set of known functions without side effects. The offending
+    constructs are collected in the impure list.
+    """
+
+    methods = ('signed', 'unsigned')
+
+    def __init__(self, symdict, funcs):
+        self.symdict = symdict
+        self.funcs = funcs
+        self.impure = []
+
+    def visit_FunctionDef(self, node):
+        # skip the decorators
+        for n in node.body:
+            self.visit(n)
+
+    def visit_Global(self, node):
+        self.impure.append("global %s" % ", ".join(node.names))
+
+    visit_Nonlocal = visit_Global
+
+    def visit_Call(self, node):
+        f = node.func
+        if isinstance(f, ast.Name):
+            obj = self.symdict.get(f.id, getattr(builtins, f.id, None))
+            if not any(obj is g for g in self.funcs):
+                self.impure.append("call to %s" % f.id)
+        elif not (isinstance(f, ast.Attribute) and f.attr in self.methods):
+            self.impure.append("call to %s" % self._callName(f))
+        self.generic_visit(node)
+
+    @staticmethod
+    def _callName(f):
+        """ Return the name or attribute chain of a called expression. """
+        names = []
+        while isinstance(f, ast.Attribute):
+            names.append(f.attr)
+            f = f.value
+        if isinstance(f, ast.Name):
+            names.append(f.id)
+        else:
+            names.append('(...)')
+        return '.'.join(reversed(names))
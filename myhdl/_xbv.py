@@ -0,0 +1,508 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the xbv class
+
+An xbv is an intbv with four-state bits. Besides the value, it holds a
+mask of the unknown bits: an unknown bit is X when its value bit is 0,
+and Z when it is 1. Operators propagate unknown bits as X.
+"""
+import builtins
+import operator
+
+from myhdl._intbv import intbv, _newintbv
+
+
+def _newxbv(val, xmask, min=None, max=None, nrbits=0):
+    obj = _newintbv(xbv, val, min, max, nrbits)
+    obj._xmask = xmask
+    return obj
+
+
+def _unknown():
+    """ Return an unsized value with all bits unknown. """
+    return _newxbv(0, -1)
+
+
+def _unknownBit():
+    return _newxbv(0, 1, 0, 2, 1)
+
+
+def _split(other):
+    """ Return the value and the unknown mask of an operand. """
+    if isinstance(other, int):
+        return other, 0
+    if isinstance(other, xbv):
+        return other._val, other._xmask
+    if isinstance(other, intbv):
+        return other._val, 0
+    if other is None:
+        return 0, -1
+    # a signal
+    return _split(other._val)
+
+
+def _fromBits(s):
+    """ Return the value and the unknown mask of a string of bits. """
+    s = s.replace('_', '')
+    val = xmask = 0
+    for c in s:
+        val <<= 1
+        xmask <<= 1
+        if c in 'xX':
+            xmask |= 1
+        elif c in 'zZ':
+            val |= 1
+            xmask |= 1
+        elif c == '1':
+            val |= 1
+        elif c != '0':
+            raise ValueError("xbv: invalid bit %r in %r" % (c, s))
+    return val, xmask
+
+
+def _fromHex(s):
+    """ Return the value and the unknown mask of a hex string with x and z.
+
+    Lower case x and z digits are fully unknown; upper case ones, which
+    simulators use for partially unknown digits, are taken as all X.
+    """
+    val = xmask = 0
+    for c in s:
+        val <<= 4
+        xmask <<= 4
+        if c in 'xX':
+            xmask |= 0xf
+        elif c == 'z':
+            val |= 0xf
+            xmask |= 0xf
+        elif c == 'Z':
+            xmask |= 0xf
+        else:
+            val |= int(c, 16)
+    return val, xmask
+
+
+def _toHex(val, xmask, nrbits):
+    """ Return a hex string of nrbits bits with x and z digits. """
+    digits = []
+    for i in range((nrbits + 3) // 4 - 1, -1, -1):
+        d, m = val >> 4 * i & 0xf, xmask >> 4 * i & 0xf
+        if not m:
+            digits.append('%x' % d)
+        elif m == 0xf and d == 0:
+            digits.append('x')
+        elif m == 0xf and d == 0xf:
+            digits.append('z')
+        else:
+            digits.append('X')
+    return ''.join(digits) or '0'
+
+
+class xbv(intbv):
+
+    """ Four-state bit vector: an intbv that can hold X and Z bits. """
+
+    __slots__ = ('_xmask',)
+
+    def __init__(self, val=0, min=None, max=None, _nrbits=0):
+        xmask = 0
+        if val is None:
+            val, xmask = 0, -1
+        elif isinstance(val, str):
+            bits = val.replace('_', '')
+            val, xmask = _fromBits(bits)
+            _nrbits = len(bits)
+        elif isinstance(val, xbv):
+            xmask = val._xmask
+        self._xmask = xmask
+        intbv.__init__(self, val, min, max, _nrbits)
+        if xmask and self._nrbits:
+            self._xmask &= (1 << self._nrbits) - 1
+
+    def _handleBounds(self):
+        # the value of unknown bits is not checked
+        if not self._xmask:
+            intbv._handleBounds(self)
+
+    def isknown(self):
+        """ Return True if all bits are known, i.e. not X or Z. """
+        return not self._xmask
+
+    def same(self, other):
+        """ Return True if other has the same bits, including X and Z. """
+        val, xmask = _split(other)
+        return self._val == val and self._xmask == xmask
+
+    __hash__ = intbv.__hash__
+
+    # copy methods
+    def __copy__(self):
+        return _newxbv(self._val, self._xmask, self._min, self._max,
+                       self._nrbits)
+
+    def __deepcopy__(self, visit):
+        return _newxbv(self._val, self._xmask, self._min, self._max,
+                       self._nrbits)
+
+    def __iter__(self):
+        if not self._nrbits:
+            raise TypeError("Cannot iterate over unsized xbv")
+        return iter([self[i] for i in range(self._nrbits - 1, -1, -1)])
+
+    # an unknown value is false, as in an HDL condition
+    def __bool__(self):
+        return bool(self._val & ~self._xmask)
+
+    __nonzero__ = __bool__
+
+    # indexing and slicing methods
+
+    def __getitem__(self, key):
+        res = intbv.__getitem__(self, key)
+        xmask = self._xmask
+        if isinstance(key, slice):
+            j = int(key.stop or 0)
+            if key.start is None:
+                xmask >>= j
+            else:
+                xmask = (xmask & (1 << int(key.start)) - 1) >> j
+            return _newxbv(res._val, xmask, res._min, res._max, res._nrbits)
+        i = int(key)
+        if xmask >> i & 1:
+            return _newxbv(self._val >> i & 1, 1, 0, 2, 1)
+        return res
+
+    def __setitem__(self, key, val):
+        val, vx = _split(val)
+        if isinstance(key, slice):
+            j = int(key.stop or 0)
+            if key.start is None:
+                mask = -1 << j
+            else:
+                mask = (1 << int(key.start)) - (1 << j)
+        else:
+            j = int(key)
+            mask = 1 << j
+        # set the mask first, as it determines whether bounds are checked
+        self._xmask = self._xmask & ~mask | (vx << j) & mask
+        if vx:
+            self._val = self._val & ~mask | (val << j) & mask
+            self._handleBounds()
+        else:
+            intbv.__setitem__(self, key, val)
+
+    # arithmetic: a result with any unknown bit is fully unknown
+
+    def _arith(self, other, op):
+        val, xmask = _split(other)
+        if self._xmask or xmask:
+            return _unknown()
+        return op(self._val, val)
+
+    def _rarith(self, other, op):
+        val, xmask = _split(other)
+        if self._xmask or xmask:
+            return _unknown()
+        return op(val, self._val)
+
+    def __add__(self, other):
+        return self._arith(other, operator.add)
+
+    def __radd__(self, other):
+        return self._rarith(other, operator.add)
+
+    def __sub__(self, other):
+        return self._arith(other, operator.sub)
+
+    def __rsub__(self, other):
+        return self._rarith(other, operator.sub)
+
+    def __mul__(self, other):
+        return self._arith(other, operator.mul)
+
+    def __rmul__(self, other):
+        return self._rarith(other, operator.mul)
+
+    def __truediv__(self, other):
+        return self._arith(other, operator.truediv)
+
+    def __rtruediv__(self, other):
+        return self._rarith(other, operator.truediv)
+
+    def __floordiv__(self, other):
+        return self._arith(other, operator.floordiv)
+
+    def __rfloordiv__(self, other):
+        return self._rarith(other, operator.floordiv)
+
+    def __mod__(self, other):
+        return self._arith(other, operator.mod)
+
+    def __rmod__(self, other):
+        return self._rarith(other, operator.mod)
+
+    def __pow__(self, other):
+        return self._arith(other, operator.pow)
+
+    def __rpow__(self, other):
+        return self._rarith(other, operator.pow)
+
+    def __neg__(self):
+        if self._xmask:
+            return _unknown()
+        return -self._val
+
+    def __pos__(self):
+        if self._xmask:
+            return _unknown()
+        return self._val
+
+    def __abs__(self):
+        if self._xmask:
+            return _unknown()
+        return abs(self._val)
+
+    # shifts move the unknown bits along, unless the amount is unknown
+
+    def __lshift__(self, other):
+        val, xmask = _split(other)
+        if xmask:
+            return _unknown()
+        if self._xmask:
+            return _newxbv(self._val << val, self._xmask << val)
+        return intbv.__lshift__(self, val)
+
+    def __rlshift__(self, other):
+        if self._xmask:
+            return _unknown()
+        return other << self._val
+
+    def __rshift__(self, other):
+        val, xmask = _split(other)
+        if xmask:
+            return _unknown()
+        if self._xmask:
+            return _newxbv(self._val >> val, self._xmask >> val)
+        return intbv.__rshift__(self, val)
+
+    def __rrshift__(self, other):
+        if self._xmask:
+            return _unknown()
+        return other >> self._val
+
+    # bitwise operators are evaluated per bit
+
+    def __and__(self, other):
+        a, ax = self._val, self._xmask
+        b, bx = _split(other)
+        if not (ax or bx):
+            return _newintbv(intbv, a & b, None, None, 0)
+        # a known 0 in either operand gives a known 0
+        xmask = (ax | bx) & (a | ax) & (b | bx)
+        return _newxbv(a & b & ~xmask, xmask)
+
+    __rand__ = __and__
+
+    def __or__(self, other):
+        a, ax = self._val, self._xmask
+        b, bx = _split(other)
+        if not (ax or bx):
+            return _newintbv(intbv, a | b, None, None, 0)
+        # a known 1 in either operand gives a known 1
+        xmask = (ax | bx) & ~(a & ~ax) & ~(b & ~bx)
+        return _newxbv((a | b) & ~xmask, xmask)
+
+    __ror__ = __or__
+
+    def __xor__(self, other):
+        a, ax = self._val, self._xmask
+        b, bx = _split(other)
+        if not (ax or bx):
+            return _newintbv(intbv, a ^ b, None, None, 0)
+        xmask = ax | bx
+        return _newxbv((a ^ b) & ~xmask, xmask)
+
+    __rxor__ = __xor__
+
+    def __invert__(self):
+        xmask = self._xmask
+        if not xmask:
+            return intbv.__invert__(self)
+        val = ~self._val & ~xmask
+        if self._nrbits and self._min >= 0:
+            val &= (1 << self._nrbits) - 1
+        return _newxbv(val, xmask)
+
+    # augmented assignment keeps the object and its bit width
+
+    def _iop(self, res):
+        val, xmask = _split(res)
+        if xmask:
+            if self._nrbits:
+                xmask &= (1 << self._nrbits) - 1
+            self._xmask = xmask
+            self._val = val & ~xmask
+        else:
+            self._xmask = 0
+            self._val = val
+            self._handleBounds()
+        return self
+
+    def __iadd__(self, other):
+        return self._iop(self + other)
+
+    def __isub__(self, other):
+        return self._iop(self - other)
+
+    def __imul__(self, other):
+        return self._iop(self * other)
+
+    def __ifloordiv__(self, other):
+        return self._iop(self // other)
+
+    def __imod__(self, other):
+        return self._iop(self % other)
+
+    def __ipow__(self, other, modulo=None):
+        return self._iop(self ** other)
+
+    def __iand__(self, other):
+        return self._iop(self & other)
+
+    def __ior__(self, other):
+        return self._iop(self | other)
+
+    def __ixor__(self, other):
+        return self._iop(self ^ other)
+
+    def __ilshift__(self, other):
+        return self._iop(self << other)
+
+    def __irshift__(self, other):
+        return self._iop(self >> other)
+
+    # conversion to an integer fails on unknown bits
+
+    def _known(self):
+        if self._xmask:
+            raise ValueError("xbv value %s has unknown bits" % self)
+        return self._val
+
+    def __int__(self):
+        return int(self._known())
+
+    def __index__(self):
+        return int(self._known())
+
+    def __float__(self):
+        return float(self._known())
+
+    # comparisons with unknown bits that matter give an unknown bit,
+    # which is false in a condition
+
+    def __eq__(self, other):
+        val, xmask = _split(other)
+        xmask |= self._xmask
+        if not xmask:
+            return self._val == val
+        if (self._val ^ val) & ~xmask:
+            return False
+        return _unknownBit()
+
+    def __ne__(self, other):
+        val, xmask = _split(other)
+        xmask |= self._xmask
+        if not xmask:
+            return self._val != val
+        if (self._val ^ val) & ~xmask:
+            return True
+        return _unknownBit()
+
+    def _compare(self, other, op):
+        val, xmask = _split(other)
+        if self._xmask or xmask:
+            return _unknownBit()
+        return op(self._val, val)
+
+    def __lt__(self, other):
+        return self._compare(other, operator.lt)
+
+    def __le__(self, other):
+        return self._compare(other, operator.le)
+
+    def __gt__(self, other):
+        return self._compare(other, operator.gt)
+
+    def __ge__(self, other):
+        return self._compare(other, operator.ge)
+
+    # representation
+
+    def _bits(self, nrbits):
+        """ Return the nrbits lowest bits as a string of 0, 1, x and z. """
+        val, xmask = self._val, self._xmask
+        bits = []
+        for i in range(nrbits - 1, -1, -1):
+            v = val >> i & 1
+            if xmask >> i & 1:
+                bits.append('z' if v else 'x')
+            else:
+                bits.append('1' if v else '0')
+        return ''.join(bits)
+
+    def __str__(self):
+        if not self._xmask:
+            return intbv.__str__(self)
+        if self._nrbits:
+            return self._bits(self._nrbits)
+        if self._xmask < 0:
+            return 'x'
+        return self._bits(builtins.max(self._val.bit_length(),
+                                       self._xmask.bit_length()))
+
+    def __repr__(self):
+        if not self._xmask:
+            return "xbv(" + repr(self._val) + ")"
+        if self._xmask < 0:
+            return "xbv(None)"
+        return "xbv('%s')" % self
+
+    def signed(self):
+        res = intbv.signed(self)
+        xmask = self._xmask
+        if not xmask:
+            return res
+        nrbits = self._nrbits
+        if nrbits and xmask >> (nrbits - 1) & 1:
+            # an unknown sign bit extends to the bits above it
+            xmask |= -1 << nrbits
+        return _newxbv(res._val & ~xmask, xmask, res._min, res._max,
+                       res._nrbits)
+
+    def unsigned(self):
+        res = intbv.unsigned(self)
+        xmask = self._xmask
+        if not xmask:
+            return res
+        if res._nrbits:
+            xmask &= (1 << res._nrbits) - 1
+        return _newxbv(res._val & ~xmask, xmask, res._min, res._max,
+                       res._nrbits)
+
@@ -1,10 +1,12 @@
 from ._verify import verify, analyze, registerSimulator
 from ._toVerilog import toVerilog
 from ._toVHDL import toVHDL
+from ._toPython import toPython
 
 __all__ = ["verify",
            "analyze",
            "registerSimulator",
            "toVerilog",
-           "toVHDL"
+           "toVHDL",
+           "toPython"
            ]
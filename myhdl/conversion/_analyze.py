@@ -339,7 +339,7 @@ class _FirstPassVisitor(ast.NodeVisitor, _ConversionMixin):
 
 
 def getNrBits(obj):
-    if hasattr(obj, '_nrbits'):
+    if isinstance(obj, (intbv, _Signal, EnumItemType)):
         return obj._nrbits
     return None
 
@@ -0,0 +1,1691 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" myhdl toPython conversion module.
+
+A design is converted to a Python module with a single class that models
+it at the level of clock cycles. The model holds every signal as a plain
+integer; its methods load the signals into local variables and run the
+processes as straight-line code: the combinational processes in the
+order of their dependencies, and the sequential processes per clock edge.
+
+With the lanes attribute set, the model is lane-parallel instead: every
+signal holds a NumPy array with a value per lane, and the processes run
+on whole arrays. Control flow that depends on signal values is turned
+into masks that select the lanes an assignment applies to. With the
+bitslice attribute set, a design of bool signals is modeled with the
+lanes in the bits of an integer, and bitwise operators work on all of
+them at once.
+
+"""
+import sys
+import os
+import re
+import ast
+import keyword
+import time
+import string
+
+import myhdl
+from myhdl import *
+from myhdl import ToPythonError
+from myhdl._block import _Block
+from myhdl._enum import EnumItemType
+from myhdl._extractHierarchy import _isMem, _getMemInfo
+from myhdl._getHierarchy import _getHierarchy
+from myhdl._instance import _Instantiator
+from myhdl._assertions import _Assertions
+from myhdl._Signal import _Signal, _WaiterList, _PosedgeWaiterList
+from myhdl._ShadowSignal import (_SliceSignal, ConcatSignal,
+                                 _TristateSignal, _TristateDriver)
+from myhdl._util import _isTupleOfInts
+from myhdl.conversion._misc import (_error, _kind, _ConversionMixin,
+                                    _genUniqueSuffix)
+from myhdl.conversion._analyze import _analyzeSigs, _analyzeGens, _Rom
+from myhdl.conversion._toVerilog import _annotateTypes
+
+
+def _checkArgs(arglist):
+    for arg in arglist:
+        if not isinstance(arg, _Instantiator):
+            raise ToPythonError(_error.ArgType, arg)
+
+
+def _flatten(*args):
+    arglist = []
+    for arg in args:
+        if isinstance(arg, _Block):
+            if arg.verilog_code is not None or arg.vhdl_code is not None:
+                raise ToPythonError(_error.NotSupported,
+                                    "user-defined code in block %s" % arg.name)
+            arg = arg.subs
+        if isinstance(arg, (list, tuple, set)):
+            for item in arg:
+                arglist.extend(_flatten(item))
+        elif isinstance(arg, _Assertions):
+            pass  # simulation only
+        else:
+            arglist.append(arg)
+    return arglist
+
+
+class _ToPythonConvertor(object):
+
+    __slots__ = ("name",
+                 "directory",
+                 "header",
+                 "no_myhdl_header",
+                 "lanes",
+                 "bitslice",
+                 )
+
+    def __init__(self):
+        self.name = None
+        self.directory = None
+        self.header = ''
+        self.no_myhdl_header = False
+        self.lanes = None
+        self.bitslice = False
+
+    def __call__(self, func):
+        if not isinstance(func, _Block):
+            raise ToPythonError(_error.NotSupported,
+                                "conversion of %s, expected a block instance"
+                                % type(func))
+        from myhdl import _traceSignals
+        if _traceSignals._tracing:
+            raise ToPythonError("Cannot use toPython while tracing signals")
+
+        if self.name is None:
+            name = func.func.__name__
+        else:
+            name = str(self.name)
+        h = _getHierarchy(name, func)
+
+        if self.directory is None:
+            directory = ''
+        else:
+            directory = self.directory
+
+        ### initialize properly ###
+        _genUniqueSuffix.reset()
+
+        arglist = _flatten(h.top)
+        _checkArgs(arglist)
+        genlist = _analyzeGens(arglist, h.absnames)
+        siglist, memlist = _analyzeSigs(h.hierarchy)
+        _annotateTypes(genlist)
+
+        # infer interface after signals have been analyzed
+        func._inferInterface()
+        intf = func
+        intf.name = name
+
+        try:
+            model = _Model(intf, siglist, memlist, genlist, self.lanes,
+                           self.bitslice)
+            code = model.write()
+        finally:
+            ### clean-up properly ###
+            self._cleanup(siglist, memlist)
+
+        pyfilename = name + ".py"
+        pypath = os.path.join(directory, pyfilename)
+        with open(pypath, 'w') as pyfile:
+            _writeFileHeader(pyfile, pypath)
+            pyfile.write(code)
+
+        return h.top
+
+    def _cleanup(self, siglist, memlist):
+        # clean up signals
+        for sig in siglist:
+            sig._clear()
+        for mem in memlist:
+            mem.name = None
+            for s in mem.mem:
+                s._clear()
+
+        # clean up attributes
+        self.name = None
+        self.header = ''
+        self.no_myhdl_header = False
+        self.lanes = None
+        self.bitslice = False
+
+
+toPython = _ToPythonConvertor()
+
+myhdl_header = """\
+# File: $filename
+# Generated by MyHDL $version
+# Date: $date
+"""
+
+
+def _writeFileHeader(f, fn):
+    defs = dict(filename=fn,
+                version=myhdl.__version__,
+                date=f"   {time.asctime(time.gmtime())} UTC"
+                )
+    if not toPython.no_myhdl_header:
+        print(string.Template(myhdl_header).substitute(defs), file=f)
+    if toPython.header:
+        print(string.Template(toPython.header).substitute(defs), file=f)
+
+
+# names of the model methods, besides the clock edge methods
+_methodNames = ('eval', 'step')
+
+
+def _pyName(name):
+    name = re.sub(r'\W', '_', name.strip())
+    if not name or name[0].isdigit():
+        name = '_' + name
+    if keyword.iskeyword(name):
+        name += '_'
+    return name
+
+
+# the widest signal in a lane-parallel model, whose lanes hold 64-bit integers
+_maxLaneBits = 62
+
+# the default number of lanes of a bit-sliced model
+_bitsliceLanes = 64
+
+
+def _mask(nrbits):
+    return (1 << nrbits) - 1
+
+
+def _isSigned(obj):
+    return isinstance(obj, (_Signal, intbv)) and \
+        obj._min is not None and obj._min < 0
+
+
+def _initVal(obj):
+    return int(obj)
+
+
+class _Process(object):
+
+    """ Generated code of a process, with the state it reads and writes. """
+
+    def __init__(self, name, lines, reads, writes, events=()):
+        self.name = name
+        self.lines = lines
+        self.reads = reads
+        self.writes = writes
+        self.events = events
+        self.seqsigs = []
+        self.seqmems = []
+
+
+class _Model(object):
+
+    """ Build the model class of a converted design. """
+
+    def __init__(self, intf, siglist, memlist, genlist, lanes=None,
+                 bitslice=False):
+        self.intf = intf
+        self.lanes = lanes
+        self.bitslice = bitslice
+        # lanes in arrays, rather than in the bits of an integer
+        self.arrays = lanes is not None and not bitslice
+        if bitslice:
+            self.visitor = _BitSliceVisitor
+            if lanes is None:
+                self.lanes = _bitsliceLanes
+        elif lanes is not None:
+            self.visitor = _LaneVisitor
+        else:
+            self.visitor = _ConvertVisitor
+        self.names = {}      # id(obj) -> name, for signals and memories
+        self.elements = {}   # id(sig) -> (memory name, index)
+        self.taken = set(_methodNames)
+        self.inits = {}      # state name -> initial value
+        self.roms = {}       # id(tuple) -> (name, tuple)
+        self.shadows = []
+        self.comb = []
+        self.seq = []
+
+        # ports keep their name
+        for portname in intf.argnames:
+            s = intf.argdict[portname]
+            if isinstance(s, _Signal):
+                s._name = portname
+                if portname in self.taken:
+                    raise ToPythonError(_error.NotSupported,
+                                        "port name %s" % portname)
+        for s in siglist:
+            if not s._inList:
+                self.sigName(s)
+        for m in memlist:
+            name = self.newName(m.name)
+            self.names[id(m.mem)] = name
+            self.checkType(m.mem[0], name)
+            self.inits[name] = [_initVal(s._init) for s in m.mem]
+            for i, s in enumerate(m.mem):
+                self.elements[id(s)] = (name, i)
+
+        for index, tree in enumerate(genlist):
+            self.addTree(index, tree)
+        # add the shadow signals that are used, which may use others
+        done = set()
+        while True:
+            used = set(intf.argnames)
+            for p in self.comb + self.seq:
+                used.update(p.reads)
+            todo = [s for s in self.shadows
+                    if id(s) not in done and self.names[id(s)] in used]
+            if not todo:
+                break
+            for s in todo:
+                done.add(id(s))
+                self.addShadow(s)
+
+    def newName(self, name):
+        name = base = _pyName(name)
+        i = 0
+        while name in self.taken or name.startswith('_'):
+            i += 1
+            name = "%s_%s" % (base.lstrip('_') or 'sig', i)
+        self.taken.add(name)
+        return name
+
+    def sigName(self, sig):
+        key = id(sig)
+        if key in self.names:
+            return self.names[key]
+        if isinstance(sig, (_TristateSignal, _TristateDriver)):
+            raise ToPythonError(_error.NotSupported, "tristate signal")
+        if isinstance(sig, _SliceSignal):
+            parent = sig._sig
+            if id(parent) in self.elements:
+                parent = "%s_%s" % self.elements[id(parent)]
+            else:
+                parent = self.sigName(parent)
+            if sig._right is None:
+                name = "%s_%s" % (parent, sig._left)
+            else:
+                name = "%s_%s_%s" % (parent, sig._left, sig._right)
+        else:
+            name = sig._name or 'sig'
+        name = self.names[key] = self.newName(name)
+        self.checkType(sig, name)
+        self.inits[name] = _initVal(sig._init)
+        if isinstance(sig, (_SliceSignal, ConcatSignal)):
+            self.shadows.append(sig)
+        return name
+
+    def sigExpr(self, sig):
+        """ Return the expression and the state name of a signal. """
+        key = id(sig)
+        if key in self.elements:
+            name, i = self.elements[key]
+            if self.arrays:
+                # a copy of the row, as memories are updated in place
+                return "%s[%s].copy()" % (name, i)
+            return "%s[%s]" % (name, i)
+        return self.sigName(sig)
+
+    def sigKey(self, sig):
+        key = id(sig)
+        if key in self.elements:
+            return self.elements[key][0]
+        return self.sigName(sig)
+
+    def checkType(self, obj, name):
+        if isinstance(obj, _Signal):
+            obj = obj._init
+        if self.bitslice:
+            if not isinstance(obj, bool):
+                raise ToPythonError(_error.NotSupported,
+                                    "%s is not a bool in a bit-sliced model"
+                                    % name)
+        elif self.arrays and isinstance(obj, intbv) and \
+                (not obj._nrbits or obj._nrbits > _maxLaneBits):
+            raise ToPythonError(_error.NotSupported,
+                                "%s is wider than %s bits in a lane-parallel "
+                                "model" % (name, _maxLaneBits))
+
+    def memName(self, mem):
+        return self.names[id(_getMemInfo(mem).mem)]
+
+    def romName(self, rom):
+        key = id(rom)
+        if key not in self.roms:
+            self.roms[key] = ("_rom%s" % len(self.roms), rom)
+        return self.roms[key][0]
+
+    def addTree(self, index, tree):
+        kind = tree.kind
+        if kind in (_kind.ALWAYS_COMB, _kind.SIMPLE_ALWAYS_COMB):
+            v = self.visitor(self, tree, index, seq=False)
+            self.comb.append(v.process())
+        elif kind == _kind.ALWAYS_SEQ:
+            events = []
+            reset = tree.reset
+            for e in tree.senslist:
+                if reset is not None and reset.isasync and e.sig is reset:
+                    continue
+                events.append(e)
+            v = self.visitor(self, tree, index, seq=True)
+            self.seq.append(v.process(events))
+            if reset is not None and reset.isasync:
+                # an active asynchronous reset is applied to the registers
+                # before any other combinational logic
+                v = self.visitor(self, tree, index, seq=False)
+                self.comb.append(v.resetProcess())
+        elif kind == _kind.ALWAYS_DECO:
+            senslist = tree.senslist
+            if all(isinstance(e, _WaiterList) for e in senslist):
+                v = self.visitor(self, tree, index, seq=True)
+                self.seq.append(v.process(senslist))
+            elif all(isinstance(e, _Signal) for e in senslist):
+                v = self.visitor(self, tree, index, seq=False)
+                self.comb.append(v.process())
+            else:
+                raise ToPythonError(_error.NotSupported,
+                                    "mixed edge and level sensitivity in %s"
+                                    % tree.name)
+        else:
+            raise ToPythonError(_error.NotSupported,
+                                "generator process %s, use a decorator "
+                                "such as always_seq" % tree.name)
+
+    def addShadow(self, sig):
+        name = self.sigName(sig)
+        reads = set()
+        if isinstance(sig, _SliceSignal):
+            parent = self.sigExpr(sig._sig)
+            reads.add(self.sigKey(sig._sig))
+            if sig._right is None:
+                expr = "%s >> %s & 1" % (parent, sig._left)
+            else:
+                expr = "%s >> %s & %s" % (parent, sig._right,
+                                         _mask(sig._left - sig._right))
+        else:
+            parts = []
+            lo = sig._nrbits
+            for a in sig._args:
+                if isinstance(a, bool):
+                    w, v = 1, int(a)
+                elif isinstance(a, str):
+                    w, v = len(a), int(a, 2)
+                else:
+                    w, v = len(a), None
+                lo -= w
+                if isinstance(a, _Signal):
+                    e = self.sigExpr(a)
+                    reads.add(self.sigKey(a))
+                    if _isSigned(a):
+                        e = "(%s & %s)" % (e, _mask(w))
+                elif v is None:
+                    e = str(int(a) & _mask(w))
+                else:
+                    e = str(v)
+                if lo:
+                    e = "%s << %s" % (e, lo)
+                parts.append(e)
+            expr = " | ".join(parts)
+        lines = ["%s = %s" % (name, expr)]
+        self.comb.append(_Process(name, lines, reads, {name}))
+
+    def sortComb(self):
+        writers = {}
+        for p in self.comb:
+            for w in p.writes:
+                writers.setdefault(w, []).append(p)
+        order = []
+        done = set()
+        busy = set()
+
+        def visit(p):
+            if id(p) in done:
+                return
+            if id(p) in busy:
+                raise ToPythonError("Combinational loop", p.name)
+            busy.add(id(p))
+            for r in sorted(p.reads):
+                for w in writers.get(r, ()):
+                    if w is not p:
+                        visit(w)
+            busy.discard(id(p))
+            done.add(id(p))
+            order.append(p)
+
+        for p in self.comb:
+            visit(p)
+        return order
+
+    def events(self):
+        events = []
+        for p in self.seq:
+            for e in p.events:
+                # note: identity check, waiter lists compare as lists
+                if not any(e is x for x in events):
+                    events.append(e)
+        writes = set()
+        for p in self.comb + self.seq:
+            writes.update(p.writes)
+        names = []
+        for e in events:
+            if id(e.sig) in self.elements:
+                raise ToPythonError(_error.NotSupported,
+                                    "clock in a list of signals")
+            sig = self.sigName(e.sig)
+            if sig in writes:
+                raise ToPythonError(_error.NotSupported,
+                                    "clock %s driven inside the design" % sig)
+            edge = 'posedge' if isinstance(e, _PosedgeWaiterList) else 'negedge'
+            names.append("%s_%s" % (edge, sig))
+        return list(zip(events, names))
+
+    def write(self):
+        intf = self.intf
+        comb = self.sortComb()
+        events = self.events()
+        state = []
+        for name in self.inits:
+            state.append(name)
+        used = set(intf.argnames)
+        for p in comb + self.seq:
+            used.update(p.reads)
+            used.update(p.writes)
+        state = [n for n in state if n in used]
+        for _, name in events:
+            if name in self.taken:
+                raise ToPythonError(_error.NotSupported,
+                                    "signal name %s" % name)
+
+        b = _Buffer()
+        inputs = [n for n in intf.argnames
+                  if isinstance(intf.argdict[n], _Signal)
+                  and not intf.argdict[n]._driven]
+        outputs = [n for n in intf.argnames
+                   if isinstance(intf.argdict[n], _Signal)
+                   and intf.argdict[n]._driven]
+        b.line('""" Cycle-based model of %s.' % intf.name)
+        b.line()
+        b.line("Inputs: %s" % ", ".join(inputs))
+        b.line("Outputs: %s" % ", ".join(outputs))
+        b.line()
+        if self.bitslice:
+            b.line("Signals are attributes that hold integers, with the value of")
+            b.line("lane k in bit k; memories hold a list of them. After setting")
+        elif not self.arrays:
+            b.line("Signals are attributes that hold integers. After setting")
+        else:
+            b.line("Signals are attributes that hold NumPy arrays of integers,")
+            b.line("with a value per lane; memories hold an array per element.")
+            b.line("Inputs can be set to an array or to an integer for all")
+            b.line("lanes. After setting")
+        b.line("inputs, call eval() to settle the combinational logic, or")
+        b.line("a clock edge method to run a clock cycle.")
+        b.line('"""')
+        b.line()
+        if self.arrays:
+            b.line("import numpy as np")
+            b.line()
+            b.line()
+            b.line("def _int(x):")
+            b.line("    return np.asarray(x, dtype=np.int64)")
+            b.line()
+            b.line()
+            b.line("def _full(x, shape):")
+            b.line("    if type(x) is np.ndarray and x.shape == shape:")
+            b.line("        return x")
+            b.line("    return np.full(shape, x, dtype=np.int64)")
+            b.line()
+            if self.roms:
+                b.line()
+            for name, rom in self.roms.values():
+                b.line("%s = np.array(%r, dtype=np.int64)" % (name, rom))
+        else:
+            for name, rom in self.roms.values():
+                b.line("%s = %r" % (name, rom))
+        if self.roms:
+            b.line()
+        b.line()
+        b.line("class %s(object):" % _pyName(intf.name))
+        b.indent()
+        b.line()
+        if self.bitslice:
+            b.line("def __init__(self, lanes=%s):" % int(self.lanes))
+            b.indent()
+            b.line("self._ones = (1 << lanes) - 1")
+            for name in state:
+                init = self.inits[name]
+                if isinstance(init, list):
+                    init = "[%s]" % ", ".join("self._ones" if v else "0"
+                                              for v in init)
+                else:
+                    init = "self._ones" if init else "0"
+                b.line("self.%s = %s" % (name, init))
+        elif not self.arrays:
+            b.line("def __init__(self):")
+            b.indent()
+            for name in state:
+                b.line("self.%s = %r" % (name, self.inits[name]))
+        else:
+            b.line("def __init__(self, lanes=%s):" % int(self.lanes))
+            b.indent()
+            b.line("self._shape = (lanes,)")
+            b.line("self._lane = np.arange(lanes)")
+            for name in state:
+                init = self.inits[name]
+                if isinstance(init, list):
+                    b.line("self.%s = np.array(%r, dtype=np.int64)"
+                           "[:, None].repeat(lanes, 1)" % (name, init))
+                else:
+                    b.line("self.%s = np.full(lanes, %r, dtype=np.int64)"
+                           % (name, init))
+        b.line("self.eval()")
+        b.dedent()
+
+        combreads = set()
+        combwrites = set()
+        for p in comb:
+            combreads.update(p.reads)
+            combwrites.update(p.writes)
+
+        b.line()
+        b.line("def eval(self):")
+        b.indent()
+        b.line('""" Settle the combinational logic. """')
+        self.writeMethod(b, comb, combreads, combwrites, [])
+        b.dedent()
+
+        for e, name in events:
+            procs = [p for p in self.seq if any(e is x for x in p.events)]
+            b.line()
+            b.line("def %s(self):" % name)
+            b.indent()
+            self.writeMethod(b, comb, combreads, combwrites, procs)
+            b.dedent()
+
+        if len(events) == 1:
+            procs = self.seq
+            b.line()
+            b.line("def step(self, n=1):")
+            b.indent()
+            b.line('""" Run n cycles of the clock. """')
+            self.writeMethod(b, comb, combreads, combwrites, procs, loop=True)
+            b.dedent()
+
+        b.dedent()
+        return b.getvalue()
+
+    def writeMethod(self, b, comb, combreads, combwrites, procs, loop=False):
+        reads = set(combreads)
+        writes = set(combwrites)
+        for p in procs:
+            reads.update(p.reads)
+            writes.update(p.writes)
+        used = reads | writes
+        for name in self.inits:
+            if name in used:
+                b.line("%s = self.%s" % (name, name))
+        lanes = self.arrays
+        if lanes and any(isinstance(self.inits[n], list) for n in used
+                         if n in self.inits):
+            b.line("_lane = self._lane")
+        if self.bitslice:
+            b.line("_ones = self._ones")
+        self.writeLines(b, comb)
+        if loop:
+            b.line("for _ in range(n):")
+            b.indent()
+        seqsigs = []
+        seqmems = []
+        for p in procs:
+            seqsigs.extend(s for s in p.seqsigs if s not in seqsigs)
+            seqmems.extend(m for m in p.seqmems if m not in seqmems)
+        for s in seqsigs:
+            b.line("_n_%s = %s" % (s, s))
+        for m in seqmems:
+            b.line("_w_%s = []" % m)
+        self.writeLines(b, procs)
+        for s in seqsigs:
+            b.line("%s = _n_%s" % (s, s))
+        for m in seqmems:
+            if self.bitslice:
+                b.line("for _i, _x, _k in _w_%s:" % m)
+                b.line("    %s[_i] = _x & _k | %s[_i] & ~_k" % (m, m))
+            elif lanes:
+                b.line("for _i, _x, _k in _w_%s:" % m)
+                b.line("    if type(_i) is int:")
+                b.line("        np.copyto(%s[_i], _x, where=_k)" % m)
+                b.line("    else:")
+                b.line("        %s[_i, _lane] = np.where(_k, _x, %s[_i, _lane])"
+                       % (m, m))
+            else:
+                b.line("for _i, _x in _w_%s:" % m)
+                b.line("    %s[_i] = _x" % m)
+        if procs:
+            self.writeLines(b, comb)
+        if loop:
+            b.dedent()
+        for name in self.inits:
+            if name in writes and not isinstance(self.inits[name], list):
+                if lanes:
+                    b.line("self.%s = _full(%s, self._shape)" % (name, name))
+                else:
+                    b.line("self.%s = %s" % (name, name))
+
+    def writeLines(self, b, procs):
+        for p in procs:
+            b.line("# %s" % p.name)
+            for line in p.lines:
+                b.line(line)
+
+
+class _Buffer(object):
+
+    def __init__(self):
+        self.lines = []
+        self.ind = ''
+
+    def line(self, text=''):
+        if text:
+            self.lines.append(self.ind + text)
+        else:
+            self.lines.append('')
+
+    def indent(self):
+        self.ind += ' ' * 4
+
+    def dedent(self):
+        self.ind = self.ind[:-4]
+
+    def getvalue(self):
+        return "\n".join(self.lines) + "\n"
+
+
+opmap = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '//',
+    ast.FloorDiv: '//',
+    ast.Mod: '%',
+    ast.Pow: '**',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+    ast.BitOr: '|',
+    ast.BitAnd: '&',
+    ast.BitXor: '^',
+    ast.Not: 'not ',
+    ast.UAdd: '+',
+    ast.USub: '-',
+    ast.Eq: '==',
+    ast.Gt: '>',
+    ast.GtE: '>=',
+    ast.Lt: '<',
+    ast.LtE: '<=',
+    ast.NotEq: '!=',
+    ast.And: 'and',
+    ast.Or: 'or',
+}
+
+
+def _slice(node):
+    if sys.version_info < (3, 9, 0) and isinstance(node.slice, ast.Index):
+        return node.slice.value
+    return node.slice
+
+
+class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
+
+    """ Convert the body of a process to Python code on integers.
+
+    Expressions are returned as strings, statements are added to a list
+    of lines. Signal writes in sequential processes go to '_n_<name>'
+    variables, and memory writes to '_w_<name>' lists, which are committed
+    after all processes of a clock edge have run.
+    """
+
+    def __init__(self, model, tree, index, seq):
+        self.model = model
+        self.tree = tree
+        self.prefix = '_v%s_' % index
+        self.seq = seq
+        self.lines = []
+        self.ind = ''
+        self.reads = set()
+        self.writes = set()
+        self.seqsigs = []
+        self.seqmems = []
+
+    def raiseError(self, node, kind, msg=""):
+        lineno = self.getLineNo(node)
+        info = "in file %s, line %s:\n    " % \
+            (self.tree.sourcefile, self.tree.lineoffset + lineno)
+        raise ToPythonError(kind, msg, info)
+
+    def makeProcess(self, events=()):
+        p = _Process(self.tree.name, self.lines, self.reads, self.writes,
+                     events)
+        p.seqsigs = self.seqsigs
+        p.seqmems = self.seqmems
+        return p
+
+    def process(self, events=()):
+        body = self.tree.body[0].body
+        reset = getattr(self.tree, 'reset', None)
+        if reset is not None:
+            self.line("if %s:" % self.resetTest(reset))
+            self.indent()
+            self.writeReset()
+            self.dedent()
+            self.line("else:")
+            self.visitBlock(body)
+        else:
+            self.visitList(body)
+            if not self.lines:
+                self.line("pass")
+        return self.makeProcess(events)
+
+    def resetProcess(self):
+        self.line("if %s:" % self.resetTest(self.tree.reset))
+        self.indent()
+        self.writeReset()
+        self.dedent()
+        return self.makeProcess()
+
+    def resetTest(self, reset):
+        r = self.sigRead(reset)
+        if reset.active:
+            return r
+        return "not %s" % r
+
+    def writeReset(self):
+        for s in self.tree.sigregs:
+            self.sigWrite(s, repr(_initVal(s._init)))
+        for n, _, init in self.tree.varregs:
+            self.assign(self.var(n), repr(init))
+
+    # output
+
+    def line(self, text):
+        self.lines.append(self.ind + text)
+
+    def indent(self):
+        self.ind += ' ' * 4
+
+    def dedent(self):
+        self.ind = self.ind[:-4]
+
+    def assign(self, name, expr):
+        self.line("%s = %s" % (name, expr))
+
+    def visitBlock(self, stmts):
+        self.indent()
+        n = len(self.lines)
+        self.visitList(stmts)
+        if len(self.lines) == n:
+            self.line("pass")
+        self.dedent()
+
+    def generic_visit(self, node):
+        self.raiseError(node, _error.NotSupported, type(node).__name__)
+
+    # state access
+
+    def var(self, n):
+        name = self.prefix + n
+        if n in self.tree.nonlocaldict:
+            # intbv's in the closure keep their value between activations
+            if name not in self.model.inits:
+                obj = self.tree.nonlocaldict[n]
+                self.model.checkType(obj, n)
+                self.model.inits[name] = _initVal(obj)
+            self.reads.add(name)
+            self.writes.add(name)
+        return name
+
+    def sigRead(self, sig):
+        self.reads.add(self.model.sigKey(sig))
+        return self.model.sigExpr(sig)
+
+    def sigWrite(self, sig, expr):
+        model = self.model
+        if id(sig) in model.elements:
+            name, i = model.elements[id(sig)]
+            self.memWrite(name, str(i), expr)
+            return
+        name = model.sigName(sig)
+        self.writes.add(name)
+        if self.seq:
+            if name not in self.seqsigs:
+                self.seqsigs.append(name)
+            # the next value starts from the current value
+            self.reads.add(name)
+            name = '_n_' + name
+        self.assign(name, expr)
+
+    def sigTarget(self, sig, node):
+        """ Return the name of the variable that holds the next value. """
+        model = self.model
+        if id(sig) in model.elements:
+            self.raiseError(node, _error.NotSupported,
+                            "partial assignment to a list element")
+        name = model.sigName(sig)
+        self.writes.add(name)
+        self.reads.add(name)
+        if self.seq:
+            if name not in self.seqsigs:
+                self.seqsigs.append(name)
+            return '_n_' + name
+        return name
+
+    def memWrite(self, name, index, expr):
+        self.writes.add(name)
+        if self.seq:
+            if name not in self.seqmems:
+                self.seqmems.append(name)
+            self.line("_w_%s.append((%s, %s))" % (name, index, expr))
+        else:
+            self.line("%s[%s] = %s" % (name, index, expr))
+
+    # type helpers
+
+    def constVal(self, node):
+        if isinstance(node, ast.Constant) and isinstance(node.value, int):
+            return int(node.value)
+        if isinstance(node, ast.Name) and node.id not in self.tree.vardict:
+            obj = self.tree.symdict.get(node.id)
+            if isinstance(obj, int):
+                return int(obj)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            v = self.constVal(node.operand)
+            if v is not None:
+                return -v
+        return None
+
+    def nrbits(self, node):
+        if isinstance(node, ast.Subscript):
+            s = _slice(node)
+            if isinstance(s, ast.Slice):
+                lo = 0
+                if s.upper is not None:
+                    lo = self.getVal(s.upper)
+                if s.lower is None:
+                    return self.nrbits(node.value) - lo
+                return self.getVal(s.lower) - lo
+        obj = self.getObj(node)
+        if isinstance(obj, bool):
+            return 1
+        if isinstance(obj, (_Signal, intbv)) and obj._nrbits:
+            return obj._nrbits
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return len(node.value)
+        self.raiseError(node, _error.NotSupported,
+                        "expression without a known bit width")
+
+    def isUnsigned(self, node):
+        """ Check that an expression has a non-negative value. """
+        if isinstance(node, ast.Subscript):
+            return True
+        obj = self.getObj(node)
+        if isinstance(obj, bool) or \
+                isinstance(obj, _Signal) and obj._type is bool:
+            return True
+        return isinstance(obj, (_Signal, intbv)) and not _isSigned(obj) \
+            and not isinstance(obj, EnumItemType)
+
+    def fit(self, node, obj):
+        """ Return the expression of node, fit to the type of obj. """
+        e = self.visit(node)
+        if isinstance(obj, _Signal):
+            obj = obj._init
+        if not isinstance(obj, (bool, intbv)):
+            return e
+        nrbits = 1 if isinstance(obj, bool) else obj._nrbits
+        if not nrbits:
+            return e
+        v = self.constVal(node)
+        if v is not None:
+            if _isSigned(obj):
+                h = 1 << (nrbits - 1)
+                return repr(((v + h) & _mask(nrbits)) - h)
+            return repr(v & _mask(nrbits))
+        if self.fits(node, nrbits - 1 if _isSigned(obj) else nrbits):
+            return e
+        if _isSigned(obj) and _isSigned(self.getObj(node)) and \
+                isinstance(node, ast.Name) and \
+                self.nrbits(node) <= nrbits:
+            return e
+        return self.wrap(e, obj)
+
+    def wrap(self, e, obj):
+        """ Wrap the value of an expression to the bit width of obj.
+
+        The expression should be an atom or between parentheses.
+        """
+        nrbits = 1 if isinstance(obj, bool) else obj._nrbits
+        if _isSigned(obj):
+            h = 1 << (nrbits - 1)
+            return "(%s + %s & %s) - %s" % (e, h, _mask(nrbits), h)
+        return "%s & %s" % (e, _mask(nrbits))
+
+    def fits(self, node, nrbits):
+        """ Check that an expression fits in nrbits unsigned bits. """
+        if not self.isUnsigned(node):
+            return False
+        try:
+            return self.nrbits(node) <= nrbits
+        except (ToPythonError, TypeError, NameError):
+            return False
+
+    # statements
+
+    def visit_Assign(self, node):
+        target, value = node.targets[0], node.value
+        if isinstance(value, ast.ListComp):
+            self.raiseError(node, _error.NotSupported, "list of signals")
+        if isinstance(target, ast.Attribute):
+            base = target.value
+            if isinstance(base, ast.Subscript):
+                # mem[i].next = v
+                mem = self.getObj(base.value)
+                if not _isMem(mem):
+                    self.raiseError(node, _error.NotSupported,
+                                    "assignment target")
+                index = self.visit(_slice(base))
+                self.memWrite(self.model.memName(mem), index,
+                              self.fit(value, mem[0]))
+            else:
+                sig = self.getObj(base)
+                self.sigWrite(sig, self.fit(value, sig))
+        elif isinstance(target, ast.Subscript):
+            base = target.value
+            if isinstance(base, ast.Attribute) and base.attr == 'next':
+                # sig.next[i] = v
+                sig = self.getObj(base.value)
+                name = self.sigTarget(sig, node)
+                self.partialAssign(name, sig._init, _slice(target), value)
+            elif isinstance(base, ast.Name) and base.id in self.tree.vardict:
+                # var[i] = v
+                obj = self.tree.vardict[base.id]
+                self.partialAssign(self.var(base.id), obj, _slice(target),
+                                   value)
+            else:
+                self.raiseError(node, _error.NotSupported, "assignment target")
+        elif isinstance(target, ast.Name):
+            self.assign(self.var(target.id), self.visit(value))
+        else:
+            self.raiseError(node, _error.NotSupported, "assignment target")
+
+    def partialAssign(self, name, obj, s, value):
+        if isinstance(s, ast.Slice):
+            if s.lower is None and s.upper is None:
+                self.assign(name, self.fit(value, obj))
+                return
+            lo = '0' if s.upper is None else self.visit(s.upper)
+            if s.lower is None:
+                hi = str(obj._nrbits)
+            else:
+                hi = self.visit(s.lower)
+            v = self.visit(value)
+            try:
+                hi, lo = int(hi), int(lo)
+            except ValueError:
+                self.line("_m = (1 << (%s) - (%s)) - 1" % (hi, lo))
+                self.assign(name, "%s & ~(_m << %s) | (%s & _m) << %s"
+                            % (name, lo, v, lo))
+            else:
+                m = _mask(hi - lo)
+                if not self.fits(value, hi - lo):
+                    v = "(%s & %s)" % (v, m)
+                if lo:
+                    v = "%s << %s" % (v, lo)
+                self.assign(name, "%s & %s | %s" % (name, ~(m << lo), v))
+        else:
+            i = self.visit(s)
+            v = self.visit(value)
+            if not self.fits(value, 1):
+                v = "(%s & 1)" % v
+            try:
+                i = int(i)
+            except ValueError:
+                self.assign(name, "%s & ~(1 << %s) | %s << %s"
+                            % (name, i, v, i))
+            else:
+                if i:
+                    v = "%s << %s" % (v, i)
+                self.assign(name, "%s & %s | %s" % (name, ~(1 << i), v))
+        if _isSigned(obj):
+            self.line("%s = %s" % (name, self.wrap(name, obj)))
+
+    def visit_AugAssign(self, node):
+        target = node.target
+        if not isinstance(target, ast.Name) or \
+                target.id not in self.tree.vardict:
+            self.raiseError(node, _error.NotSupported,
+                            "augmented assignment target")
+        obj = self.tree.vardict[target.id]
+        name = self.var(target.id)
+        op = opmap[type(node.op)]
+        value = self.visit(node.value)
+        e = "(%s %s %s)" % (name, op, value)
+        if isinstance(obj, intbv):
+            e = self.wrap(e, obj)
+        self.assign(name, e)
+
+    def visit_Assert(self, node):
+        self.line("assert %s" % self.visit(node.test))
+
+    def visit_Break(self, node):
+        self.line("break")
+
+    def visit_Continue(self, node):
+        self.line("continue")
+
+    def visit_Pass(self, node):
+        self.line("pass")
+
+    def visit_Expr(self, node):
+        expr = node.value
+        # skip docstrings and extra semicolons
+        if isinstance(expr, ast.Constant):
+            return
+        self.line(self.visit(expr))
+
+    def visit_For(self, node):
+        var = self.var(node.target.id)
+        cf = node.iter
+        f = self.getObj(cf.func)
+        args = [self.visit(a) for a in cf.args]
+        if f is range:
+            self.line("for %s in range(%s):" % (var, ", ".join(args)))
+        else: # downrange
+            start, stop, step = (args + ['0', '1'][len(args) - 1:])[:3]
+            self.line("for %s in range(%s - 1, %s - 1, -%s):"
+                      % (var, start, stop, step))
+        self.visitBlock(node.body)
+
+    def visit_If(self, node):
+        if node.ignore:
+            return
+        for i, (test, suite) in enumerate(node.tests):
+            kw = 'if' if i == 0 else 'elif'
+            self.line("%s %s:" % (kw, self.visit(test)))
+            self.visitBlock(suite)
+        if node.else_:
+            self.line("else:")
+            self.visitBlock(node.else_)
+
+    def visit_While(self, node):
+        self.line("while %s:" % self.visit(node.test))
+        self.visitBlock(node.body)
+
+    # expressions
+
+    def visit_Attribute(self, node):
+        obj = self.getObj(node.value)
+        if node.attr in ('val', 'next') and isinstance(obj, _Signal):
+            if node.attr == 'next' and self.seq:
+                return self.sigTarget(obj, node)
+            return self.visit(node.value)
+        if node.attr in ('min', 'max'):
+            return repr(node.obj)
+        if isinstance(node.obj, EnumItemType):
+            return repr(int(node.obj))
+        self.raiseError(node, _error.UnsupportedAttribute, node.attr)
+
+    def visit_BinOp(self, node):
+        if type(node.op) not in opmap:
+            self.raiseError(node, _error.NotSupported, "operator")
+        return "(%s %s %s)" % (self.visit(node.left), opmap[type(node.op)],
+                               self.visit(node.right))
+
+    def visit_BoolOp(self, node):
+        op = " %s " % opmap[type(node.op)]
+        return "(%s)" % op.join(self.visit(v) for v in node.values)
+
+    def visit_UnaryOp(self, node):
+        e = self.visit(node.operand)
+        if isinstance(node.op, ast.Invert):
+            obj = self.getObj(node.operand)
+            if isinstance(obj, bool) or \
+                    isinstance(obj, _Signal) and obj._type is bool:
+                return "(%s ^ 1)" % e
+            if self.isUnsigned(node.operand):
+                return "(~%s & %s)" % (e, _mask(self.nrbits(node.operand)))
+            return "(~%s)" % e
+        return "(%s%s)" % (opmap[type(node.op)], e)
+
+    def visit_Compare(self, node):
+        parts = [self.visit(node.left)]
+        for op, c in zip(node.ops, node.comparators):
+            if type(op) not in opmap:
+                self.raiseError(node, _error.NotSupported, "comparison")
+            parts.append(opmap[type(op)])
+            parts.append(self.visit(c))
+        return "(%s)" % " ".join(parts)
+
+    def visit_IfExp(self, node):
+        return "(%s if %s else %s)" % (self.visit(node.body),
+                                       self.visit(node.test),
+                                       self.visit(node.orelse))
+
+    def visit_Constant(self, node):
+        v = node.value
+        if isinstance(v, bool):
+            return repr(int(v))
+        if isinstance(v, int):
+            return repr(v)
+        if isinstance(v, str) and v and v.count('0') + v.count('1') == len(v):
+            return repr(int(v, 2))
+        self.raiseError(node, _error.NotSupported, "constant %r" % v)
+
+    def visit_Name(self, node):
+        n = node.id
+        tree = self.tree
+        if n in tree.vardict:
+            return self.var(n)
+        if n in tree.sigdict:
+            return self.sigRead(tree.sigdict[n])
+        if n in tree.symdict:
+            obj = tree.symdict[n]
+            if isinstance(obj, (int, EnumItemType)):
+                return repr(int(obj))
+        self.raiseError(node, _error.NotSupported, "reference to %s" % n)
+
+    def visit_Subscript(self, node):
+        s = _slice(node)
+        obj = self.getObj(node.value)
+        if isinstance(s, ast.Slice):
+            return self.accessSlice(node, s)
+        index = self.visit(s)
+        if _isMem(obj):
+            name = self.model.memName(obj)
+            self.reads.add(name)
+            return "%s[%s]" % (name, index)
+        if isinstance(obj, _Rom):
+            return "%s[%s]" % (self.model.romName(obj.rom), index)
+        if isinstance(obj, tuple) and _isTupleOfInts(obj):
+            return "%s[%s]" % (self.model.romName(obj), index)
+        return "(%s >> %s & 1)" % (self.visit(node.value), index)
+
+    def accessSlice(self, node, s):
+        value = node.value
+        if isinstance(value, ast.Call):
+            f = self.getObj(value.func)
+            if type(f) is type and issubclass(f, intbv):
+                # declaration, such as intbv(0)[8:]
+                return self.visit(value)
+        e = self.visit(value)
+        hi, lo = s.lower, s.upper
+        if hi is None and lo is None:
+            return e
+        lo = '0' if lo is None else self.visit(lo)
+        if hi is None:
+            return "(%s >> %s)" % (e, lo)
+        hi = self.visit(hi)
+        try:
+            hi, lo = int(hi), int(lo)
+        except ValueError:
+            return "(%s >> %s & ((1 << (%s) - (%s)) - 1))" % (e, lo, hi, lo)
+        if lo == 0:
+            return "(%s & %s)" % (e, _mask(hi))
+        return "(%s >> %s & %s)" % (e, lo, _mask(hi - lo))
+
+    def visit_Call(self, node):
+        fn = node.func
+        f = self.getObj(fn)
+        args = node.args
+        if f is bool:
+            return "(%s != 0)" % self.visit(args[0])
+        if f is int:
+            return self.visit(args[0])
+        if f is len:
+            return repr(self.getVal(node))
+        if f is ord:
+            return repr(ord(args[0].value))
+        if type(f) is type and issubclass(f, intbv):
+            if not args:
+                return '0'
+            return self.visit(args[0])
+        if f is concat:
+            return self.concat(node)
+        if f == intbv.signed: # note equality comparison
+            operand = fn.value
+            e = self.visit(operand)
+            if _isSigned(self.getObj(operand)):
+                return e
+            h = 1 << (self.nrbits(operand) - 1)
+            return "((%s ^ %s) - %s)" % (e, h, h)
+        if hasattr(node, 'tree'):
+            self.raiseError(node, _error.NotSupported,
+                            "function call: %s" % node.tree.name)
+        name = getattr(f, '__name__', type(f).__name__)
+        self.raiseError(node, _error.NotSupported, "call to %s" % name)
+
+    def concat(self, node):
+        args = node.args
+        parts = []
+        lo = 0
+        for i in reversed(range(len(args))):
+            a = args[i]
+            e = self.visit(a)
+            if not self.isUnsigned(a):
+                e = "(%s & %s)" % (e, _mask(self.nrbits(a)))
+            if lo:
+                e = "%s << %s" % (e, lo)
+            parts.append(e)
+            if i:
+                lo += self.nrbits(a)
+        return "(%s)" % " | ".join(reversed(parts))
+
+
+class _LaneVisitor(_ConvertVisitor):
+
+    """ Convert the body of a process to Python code on NumPy arrays.
+
+    The code is straight-line: if statements are turned into masks of
+    the lanes that take a branch, and assignments in a branch only update
+    the lanes of its mask. Loops run the same number of iterations in
+    all lanes, so their bounds cannot depend on signal values.
+    """
+
+    def __init__(self, model, tree, index, seq):
+        _ConvertVisitor.__init__(self, model, tree, index, seq)
+        self.index = index
+        self.mask = None
+        self.ntemps = 0
+
+    def process(self, events=()):
+        self.declareVars()
+        body = self.tree.body[0].body
+        reset = getattr(self.tree, 'reset', None)
+        if reset is not None:
+            m = self.temp(self.resetTest(reset))
+            self.mask = m
+            self.writeReset()
+            self.mask = self.temp(self.notOp(m))
+        self.visitList(body)
+        self.mask = None
+        if not self.lines:
+            self.line("pass")
+        return self.makeProcess(events)
+
+    def declareVars(self):
+        # variables can be assigned in some lanes before any value is
+        # known in the other ones
+        for n in self.tree.vardict:
+            if n not in self.tree.nonlocaldict:
+                self.line("%s = 0" % self.var(n))
+
+    def resetProcess(self):
+        self.mask = self.temp(self.resetTest(self.tree.reset))
+        self.writeReset()
+        self.mask = None
+        return self.makeProcess()
+
+    def resetTest(self, reset):
+        return "(%s %s 0)" % (self.sigRead(reset),
+                              '!=' if reset.active else '==')
+
+    def temp(self, expr):
+        """ Assign an expression to a new temporary, and return its name. """
+        self.ntemps += 1
+        name = "_t%s_%s" % (self.index, self.ntemps)
+        self.line("%s = %s" % (name, expr))
+        return name
+
+    def assign(self, name, expr):
+        if self.mask is None:
+            self.line("%s = %s" % (name, expr))
+        else:
+            self.line("%s = np.where(%s, %s, %s)"
+                      % (name, self.mask, expr, name))
+
+    def memWrite(self, name, index, expr):
+        self.writes.add(name)
+        if self.seq:
+            if name not in self.seqmems:
+                self.seqmems.append(name)
+            self.line("_w_%s.append((%s, %s, %s))"
+                      % (name, index, expr, self.mask or 'True'))
+        elif index.isdigit():
+            # a constant index selects a row, which is updated in place
+            if self.mask is None:
+                self.line("%s[%s] = %s" % (name, index, expr))
+            else:
+                self.line("np.copyto(%s[%s], %s, where=%s)"
+                          % (name, index, expr, self.mask))
+        elif self.mask is None:
+            self.line("%s[%s, _lane] = %s" % (name, index, expr))
+        else:
+            self.line("%s[%s, _lane] = np.where(%s, %s, %s[%s, _lane])"
+                      % (name, index, self.mask, expr, name, index))
+
+    def test(self, node):
+        """ Return the expression of a condition, as a boolean per lane. """
+        if isinstance(node, ast.Compare):
+            return self.compare(node)
+        if isinstance(node, ast.BoolOp):
+            return self.boolOp(node)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return self.notOp(self.test(node.operand))
+        return "(%s != 0)" % self.visit(node)
+
+    def notSupported(self, node):
+        self.raiseError(node, _error.NotSupported,
+                        "%s in a lane-parallel model" % type(node).__name__)
+
+    # operations on masks
+
+    def andOp(self, a, b):
+        return "np.logical_and(%s, %s)" % (a, b)
+
+    def orOp(self, a, b):
+        return "np.logical_or(%s, %s)" % (a, b)
+
+    def notOp(self, a):
+        return "np.logical_not(%s)" % a
+
+    # statements
+
+    def visit_Assert(self, node):
+        test = self.test(node.test)
+        if self.mask is not None:
+            test = self.orOp(self.notOp(self.mask), test)
+        self.line("assert np.all(%s)" % test)
+
+    visit_Break = visit_Continue = visit_While = notSupported
+
+    def visit_If(self, node):
+        if node.ignore:
+            return
+        outer = self.mask
+        # all tests see the values from before the statement
+        tests = [self.temp(self.test(test)) for test, _ in node.tests]
+        rest = outer
+        for i, (t, (_, suite)) in enumerate(zip(tests, node.tests)):
+            if rest is None:
+                self.mask = t
+            else:
+                self.mask = self.temp(self.andOp(rest, t))
+            self.visitList(suite)
+            if i < len(tests) - 1 or node.else_:
+                if rest is None:
+                    rest = self.temp(self.notOp(t))
+                else:
+                    rest = self.temp(self.andOp(rest, self.notOp(t)))
+        if node.else_:
+            self.mask = rest
+            self.visitList(node.else_)
+        self.mask = outer
+
+    # expressions
+
+    def visit_BoolOp(self, node):
+        return "_int(%s)" % self.boolOp(node)
+
+    def boolOp(self, node):
+        f = self.andOp if isinstance(node.op, ast.And) else self.orOp
+        e = self.test(node.values[0])
+        for v in node.values[1:]:
+            e = f(e, self.test(v))
+        return e
+
+    def visit_UnaryOp(self, node):
+        if isinstance(node.op, ast.Not):
+            return "_int(%s)" % self.test(node)
+        return _ConvertVisitor.visit_UnaryOp(self, node)
+
+    def visit_Compare(self, node):
+        return "_int(%s)" % self.compare(node)
+
+    def compare(self, node):
+        left = self.visit(node.left)
+        parts = []
+        for op, c in zip(node.ops, node.comparators):
+            if type(op) not in opmap:
+                self.raiseError(node, _error.NotSupported, "comparison")
+            right = self.visit(c)
+            parts.append("(%s %s %s)" % (left, opmap[type(op)], right))
+            left = right
+        e = parts[0]
+        for p in parts[1:]:
+            e = self.andOp(e, p)
+        return e
+
+    def visit_IfExp(self, node):
+        return "np.where(%s, %s, %s)" % (self.test(node.test),
+                                         self.visit(node.body),
+                                         self.visit(node.orelse))
+
+    def visit_Subscript(self, node):
+        s = _slice(node)
+        obj = self.getObj(node.value)
+        if _isMem(obj) and not isinstance(s, ast.Slice):
+            name = self.model.memName(obj)
+            self.reads.add(name)
+            return "%s[%s, _lane]" % (name, self.visit(s))
+        return _ConvertVisitor.visit_Subscript(self, node)
+
+    def visit_Call(self, node):
+        if self.getObj(node.func) is bool:
+            return "_int(%s)" % self.test(node.args[0])
+        return _ConvertVisitor.visit_Call(self, node)
+
+
+class _BitSliceVisitor(_LaneVisitor):
+
+    """ Convert the body of a process to bit-sliced Python code.
+
+    All values are bools, held in integers with the value of each lane
+    in a bit, and '_ones' has a bit set for all lanes. Only bitwise
+    operators and comparisons of bools are supported; they are evaluated
+    for all lanes at once. Masks are integers of the same kind.
+    """
+
+    def notSupported(self, node, what=None):
+        self.raiseError(node, _error.NotSupported,
+                        "%s in a bit-sliced model"
+                        % (what or type(node).__name__))
+
+    def declareVars(self):
+        for n, obj in self.tree.vardict.items():
+            # bitwise operators on bools give an int; as other values
+            # cannot be expressed, such variables hold bools as well
+            if not isinstance(obj, int) or isinstance(obj, intbv):
+                self.raiseError(self.tree.body[0], _error.NotSupported,
+                                "variable %s is not a bool in a bit-sliced "
+                                "model" % n)
+            if n not in self.tree.nonlocaldict:
+                self.line("%s = 0" % self.var(n))
+
+    def resetTest(self, reset):
+        r = self.sigRead(reset)
+        if reset.active:
+            return r
+        return self.notOp(r)
+
+    def writeReset(self):
+        for s in self.tree.sigregs:
+            self.sigWrite(s, self.constant(s._init))
+        for n, _, init in self.tree.varregs:
+            self.assign(self.var(n), self.constant(init))
+
+    def constant(self, v):
+        return '_ones' if v else '0'
+
+    def assign(self, name, expr):
+        if self.mask is None:
+            self.line("%s = %s" % (name, expr))
+        else:
+            self.line("%s = %s & %s | %s & ~%s"
+                      % (name, expr, self.mask, name, self.mask))
+
+    def memWrite(self, name, index, expr):
+        self.writes.add(name)
+        if self.seq:
+            if name not in self.seqmems:
+                self.seqmems.append(name)
+            self.line("_w_%s.append((%s, %s, %s))"
+                      % (name, index, expr, self.mask or '_ones'))
+        else:
+            self.assign("%s[%s]" % (name, index), expr)
+
+    def fit(self, node, obj):
+        return self.visit(node)
+
+    def test(self, node):
+        return self.visit(node)
+
+    # operations on masks
+
+    def andOp(self, a, b):
+        return "(%s & %s)" % (a, b)
+
+    def orOp(self, a, b):
+        return "(%s | %s)" % (a, b)
+
+    def notOp(self, a):
+        return "(%s ^ _ones)" % a
+
+    # statements
+
+    def visit_Assign(self, node):
+        target = node.targets[0]
+        if isinstance(target, ast.Attribute) and \
+                isinstance(target.value, ast.Subscript):
+            mem = self.getObj(target.value.value)
+            i = self.constVal(_slice(target.value))
+            if not _isMem(mem) or i is None:
+                self.notSupported(node, "assignment target")
+            self.memWrite(self.model.memName(mem), str(i),
+                          self.visit(node.value))
+        elif isinstance(target, ast.Subscript):
+            self.notSupported(node, "partial assignment")
+        else:
+            _LaneVisitor.visit_Assign(self, node)
+
+    def visit_AugAssign(self, node):
+        target = node.target
+        if not isinstance(target, ast.Name) or \
+                target.id not in self.tree.vardict:
+            self.notSupported(node, "augmented assignment target")
+        if not isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+            self.notSupported(node, "operator")
+        name = self.var(target.id)
+        self.assign(name, "(%s %s %s)" % (name, opmap[type(node.op)],
+                                          self.visit(node.value)))
+
+    def visit_Assert(self, node):
+        test = self.visit(node.test)
+        if self.mask is not None:
+            test = self.orOp(self.notOp(self.mask), test)
+        self.line("assert %s == _ones" % test)
+
+    visit_For = _LaneVisitor.notSupported
+
+    # expressions
+
+    def visit_Attribute(self, node):
+        if node.attr not in ('val', 'next'):
+            self.notSupported(node, "attribute %s" % node.attr)
+        return _LaneVisitor.visit_Attribute(self, node)
+
+    def visit_BinOp(self, node):
+        if not isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+            self.notSupported(node, "operator")
+        return "(%s %s %s)" % (self.visit(node.left), opmap[type(node.op)],
+                               self.visit(node.right))
+
+    def visit_BoolOp(self, node):
+        return self.boolOp(node)
+
+    def visit_UnaryOp(self, node):
+        if not isinstance(node.op, (ast.Invert, ast.Not)):
+            self.notSupported(node, "operator")
+        return self.notOp(self.visit(node.operand))
+
+    def visit_Compare(self, node):
+        return self.compare(node)
+
+    def compare(self, node):
+        left = self.visit(node.left)
+        parts = []
+        for op, c in zip(node.ops, node.comparators):
+            right = self.visit(c)
+            if isinstance(op, ast.Eq):
+                e = self.notOp("%s ^ %s" % (left, right))
+            elif isinstance(op, ast.NotEq):
+                e = "(%s ^ %s)" % (left, right)
+            elif isinstance(op, ast.Lt):
+                e = self.andOp(self.notOp(left), right)
+            elif isinstance(op, ast.Gt):
+                e = self.andOp(left, self.notOp(right))
+            elif isinstance(op, ast.LtE):
+                e = self.orOp(self.notOp(left), right)
+            elif isinstance(op, ast.GtE):
+                e = self.orOp(left, self.notOp(right))
+            else:
+                self.notSupported(node, "comparison")
+            parts.append(e)
+            left = right
+        e = parts[0]
+        for p in parts[1:]:
+            e = self.andOp(e, p)
+        return e
+
+    def visit_IfExp(self, node):
+        t = self.visit(node.test)
+        return self.orOp(self.andOp(t, self.visit(node.body)),
+                         self.andOp(self.notOp(t), self.visit(node.orelse)))
+
+    def visit_Constant(self, node):
+        if node.value in (0, 1) and not isinstance(node.value, str):
+            return self.constant(node.value)
+        self.notSupported(node, "constant %r" % node.value)
+
+    def visit_Name(self, node):
+        n = node.id
+        tree = self.tree
+        if n in tree.vardict:
+            return self.var(n)
+        if n in tree.sigdict:
+            return self.sigRead(tree.sigdict[n])
+        obj = tree.symdict.get(n)
+        if isinstance(obj, int) and not isinstance(obj, EnumItemType) and \
+                obj in (0, 1):
+            return self.constant(obj)
+        self.notSupported(node, "reference to %s" % n)
+
+    def visit_Subscript(self, node):
+        obj = self.getObj(node.value)
+        i = self.constVal(_slice(node))
+        if not _isMem(obj) or i is None:
+            self.notSupported(node, "indexing")
+        name = self.model.memName(obj)
+        self.reads.add(name)
+        return "%s[%s]" % (name, i)
+
+    def visit_Call(self, node):
+        f = self.getObj(node.func)
+        if f in (bool, int) and len(node.args) == 1:
+            return self.visit(node.args[0])
+        self.notSupported(node, "call")
@@ -43,6 +43,7 @@ from myhdl._extractHierarchy import (_HierExtr, _isMem, _getMemInfo,
                                      _UserVhdlCode, _userCodeMap)
 
 from myhdl._instance import _Instantiator
+from myhdl._assertions import _Assertions
 from myhdl._Signal import _Signal, _WaiterList, posedge, negedge, Constant
 from myhdl._enum import EnumType, EnumItemType
 from myhdl._intbv import intbv
@@ -92,6 +93,8 @@ def _flatten(*args):
         elif isinstance(arg, (list, tuple, set)):
             for item in arg:
                 arglist.extend(_flatten(item))
+        elif isinstance(arg, _Assertions):
+            pass  # simulation only
         else:
             arglist.append(arg)
     return arglist
@@ -1420,7 +1423,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
 
         if isinstance(obj, EnumItemType):
             itemRepr = obj._toVHDL()
-        elif hasattr(baseobj, '_nrbits'):
+        elif isinstance(baseobj, (intbv, _Signal)):
             itemRepr = self.BitRepr(item.value, baseobj)
         else:
             raise AssertionError("Unknown type %s " % (type(obj)))
@@ -1468,7 +1471,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             item = test.case[1]
             if isinstance(item, EnumItemType):
                 itemRepr = item._toVHDL()
-            elif hasattr(obj, '_nrbits'):
+            elif isinstance(obj, (intbv, _Signal)):
                 itemRepr = self.BitRepr(item, obj)
             else:
                 itemRepr = i
@@ -43,6 +43,7 @@ from myhdl._extractHierarchy import (_HierExtr, _isMem, _getMemInfo,
                                      _UserVerilogCode, _userCodeMap)
 from myhdl._getHierarchy import _getHierarchy
 from myhdl._instance import _Instantiator
+from myhdl._assertions import _Assertions
 from myhdl._Signal import _Signal, Constant
 from myhdl._ShadowSignal import _TristateSignal, _TristateDriver
 from myhdl.conversion._misc import (_error, _kind, _context,
@@ -74,6 +75,8 @@ def _flatten(*args):
         elif isinstance(arg, (list, tuple, set)):
             for item in arg:
                 arglist.extend(_flatten(item))
+        elif isinstance(arg, _Assertions):
+            pass  # simulation only
         else:
             arglist.append(arg)
     return arglist
@@ -640,7 +643,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             self.write("integer %s" % name)
         elif isinstance(obj, _Ram):
             self.write("reg [%s-1:0] %s [0:%s-1]" % (obj.elObj._nrbits, name, obj.depth))
-        elif hasattr(obj, '_nrbits'):
+        elif isinstance(obj, (intbv, _Signal, EnumItemType)):
             s = ""
             if isinstance(obj, (intbv, _Signal)):
                 if obj._min is not None and obj._min < 0:
@@ -1651,7 +1654,8 @@ class _ConvertTaskVisitor(_ConvertVisitor):
 
 
 def _maybeNegative(obj):
-    if hasattr(obj, '_min') and (obj._min is not None) and (obj._min < 0):
+    if isinstance(obj, (intbv, _Signal)) and (obj._min is not None) and \
+            (obj._min < 0):
         return True
     if isinstance(obj, int) and obj < 0:
         return True
@@ -0,0 +1,53 @@
+from myhdl import (block, Signal, ResetSignal, intbv, delay, instance,
+                   always_comb, always_seq, packedstruct)
+
+Header = packedstruct(('opcode', 4), ('length', 8), ('par', 1), ('flags', 3),
+                      name='Header')
+
+
+@block
+def decoder(clk, reset, hdr, op, length, hout):
+
+    @always_comb
+    def comb():
+        op.next = hdr.opcode
+        length.next = hdr.length + 1
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        hout.next.opcode = hdr.flags
+        hout.next.length = hdr.length
+        hout.next.par = not hdr.par
+
+    return comb, seq
+
+
+@block
+def PackedStructBench():
+
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    hdr = Signal(Header())
+    hout = Signal(Header())
+    op = Signal(intbv(0)[4:])
+    length = Signal(intbv(0)[9:])
+
+    dut = decoder(clk, reset, hdr, op, length, hout)
+
+    @instance
+    def stimulus():
+        for i in range(32):
+            hdr.next = 0x2345 * i % 0x10000
+            yield delay(10)
+            clk.next = 1
+            yield delay(10)
+            clk.next = 0
+            print(op)
+            print(length)
+            print(hout)
+
+    return dut, stimulus
+
+
+def test_packedstruct():
+    assert PackedStructBench().verify_convert() == 0
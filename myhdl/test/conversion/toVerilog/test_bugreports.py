@@ -1,4 +1,4 @@
-from myhdl import (block, Signal, enum, intbv, always_comb, instances)
+from myhdl import (block, Signal, enum, intbv, always_comb, always, instances)
 
 from .util import verilogCompile
 
@@ -45,6 +45,31 @@ def test_bugreports_001():
     DUT_Verilog_001(x, a, b, c, d, e).convert(hdl='Verilog')
     # verilogCompile(TestModule.__name__)
 
+
+
+@block
+def intbvVariable(clk, d, q, s):
+
+    @always(clk.posedge)
+    def logic():
+        v = intbv(0)[8:]
+        w = intbv(0, min=-8, max=8)
+        v[:] = d + 1
+        w[:] = -d[3:]
+        q.next = v
+        s.next = w
+
+    return logic
+
+
+def test_intbv_variable():
+    # intbv variables are typed with the intbv class itself in the tree
+    clk = Signal(bool(0))
+    d, q = [Signal(intbv(0)[8:]) for i in range(2)]
+    s = Signal(intbv(0, min=-8, max=8))
+    intbvVariable(clk, d, q, s).convert(hdl='Verilog')
+    intbvVariable(clk, d, q, s).convert(hdl='VHDL')
+
 # test()
 
 ##############################
@@ -1,5 +1,8 @@
+import pytest
+
 from myhdl import (Signal, intbv, instance, delay, ConcatSignal, TristateSignal)
 from myhdl._Simulation import Simulation
+from myhdl._ShadowSignal import BusContentionWarning
 
 
 def bench_SliceSignal():
@@ -203,6 +206,80 @@ def test_ConcatConcatedSignal():
     Simulation(bench_ConcatConcatedSignal()).run()
 
 
+def bench_ConcatWideSignal():
+    bits = [Signal(bool(0)) for i in range(64)]
+    r = Signal(intbv(0)[3:])
+    # a signal argument may occur more than once
+    s = ConcatSignal(r, *(bits + [r]))
+
+    @instance
+    def check():
+        val = 0
+        for i in range(200):
+            k = (i * 37) % 64
+            bits[k].next = not bits[k]
+            val ^= 1 << (63 - k)
+            if i % 7 == 0:
+                r.next = i % 8
+            yield delay(10)
+            assert s == r << 67 | val << 3 | r
+        for b in bits:
+            b.next = 0
+        r.next = 0
+        yield delay(10)
+        assert s == 0
+
+    return check
+
+
+def test_ConcatWideSignal():
+    Simulation(bench_ConcatWideSignal()).run()
+
+
+def bench_ShadowDelta():
+    s = Signal(intbv(0)[8:])
+    t = Signal(bool(0))
+    hi, lo = s(8, 4), s(4, 0)
+    bit = lo(1)
+    c = ConcatSignal(lo, t, hi)
+    wakes = [0, 0]
+
+    @instance
+    def watchHi():
+        while 1:
+            yield hi
+            wakes[0] += 1
+
+    @instance
+    def watchConcat():
+        while 1:
+            yield c
+            wakes[1] += 1
+
+    @instance
+    def check():
+        for i in range(2 ** len(s)):
+            s.next = i
+            t.next = i & 1
+            # shadow signals change in the same delta cycle as their parent
+            yield s
+            assert hi == i >> 4
+            assert lo == i & 0xf
+            assert bit == (i >> 1) & 1
+            assert c == (i & 0xf) << 5 | (i & 1) << 4 | i >> 4
+            yield delay(10)
+        # only changes of the slice wake up its waiters
+        assert wakes[0] == 15
+        # argument changes in the same delta cycle give a single event
+        assert wakes[1] == 2 ** len(s) - 1
+
+    return watchHi, watchConcat, check
+
+
+def test_ShadowDelta():
+    Simulation(bench_ShadowDelta()).run()
+
+
 def bench_TristateSignal():
     s = TristateSignal(intbv(0)[8:])
     a = s.driver()
@@ -232,3 +309,33 @@ def bench_TristateSignal():
 
 def test_TristateSignal():
     Simulation(bench_TristateSignal()).run()
+
+
+def bench_TristateBus():
+    s = TristateSignal(intbv(0)[8:])
+    drivers = [s.driver() for i in range(40)]
+
+    @instance
+    def check():
+        for i, d in enumerate(drivers):
+            d.next = i
+            # the bus is resolved in the same delta cycle as the driver
+            yield s
+            assert s == i
+            d.next = None
+            yield delay(10)
+            assert s == None
+        drivers[3].next = 3
+        drivers[7].next = 7
+        yield delay(10)
+        assert s == None
+        drivers[3].next = None
+        yield delay(10)
+        assert s == 7
+
+    return check
+
+
+def test_TristateBus():
+    with pytest.warns(BusContentionWarning):
+        Simulation(bench_TristateBus()).run()
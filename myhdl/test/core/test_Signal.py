@@ -26,7 +26,9 @@ from random import randrange
 
 import pytest
 
-from myhdl import Signal, intbv
+from myhdl import (Signal, intbv, instance, always, delay,
+                   StopSimulation)
+from myhdl._Simulation import Simulation
 from myhdl._simulator import _siglist
 
 random.seed(1)  # random, but deterministic
@@ -577,3 +579,68 @@ class TestSignalIntbvBounds:
         for v in (-1, 2 ** 8, -10, 1000):
             with pytest.raises(ValueError):
                 s.next[:] = v
+
+
+class TestSignalHistory:
+
+    def bench(self, a, clk, q):
+
+        @instance
+        def stim():
+            for i in range(1, 20):
+                a.next = i
+                yield delay(3)
+                clk.next = 1
+                yield delay(2)
+                clk.next = 0
+                yield delay(5)
+            raise StopSimulation()
+
+        @always(clk.posedge)
+        def check():
+            # the value at an edge is the value before the edge, and q is
+            # the edge count from the second edge on
+            i = int(a)
+            for n in (0, 1, 3):
+                assert q.past(n) == (i - n if i - n >= 2 else 0)
+            assert a.past(1) == i - 1
+            assert a.past(2) == max(i - 2, 0)
+            q.next = a + 1
+
+        return stim, check
+
+    def testHistory(self):
+        a = Signal(intbv(0)[8:])
+        clk = Signal(bool(0))
+        q = Signal(intbv(0)[8:])
+        a.history(2)
+        q.history(3, clk.posedge)
+        for i in range(2):
+            Simulation(self.bench(a, clk, q)).run(quiet=1)
+            # the history restarts with the next simulation
+            assert q.past(3) == 0
+
+    def testValues(self):
+        a = Signal(intbv(0)[8:])
+        a.history(2)
+        for i in range(1, 5):
+            a.next = i
+            a._update()
+        assert (a.past(0), a.past(1), a.past(2)) == (4, 3, 2)
+        assert isinstance(a.past(1), intbv)
+        a.next = 9
+        a._update()
+        assert a.past(1) == 4
+        del _siglist[:]
+
+    def testErrors(self):
+        a = Signal(0)
+        with pytest.raises(ValueError):
+            a.past(1)
+        with pytest.raises(ValueError):
+            a.history(0)
+        with pytest.raises(TypeError):
+            a.history(2, Signal(bool(0)))
+        a.history(2)
+        with pytest.raises(ValueError):
+            a.past(3)
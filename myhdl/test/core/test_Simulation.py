@@ -907,3 +907,183 @@ class TimeZeroEvents(TestCase):
         s = Signal(1)
         testBench = self.bench(sig=s, nextval=0, clause=s.negedge)
         Simulation(testBench).run(quiet=QUIET)
+
+
+class InertialDelayQueue(TestCase):
+
+    """ Check that superseded transactions don't pile up """
+
+    def bench(self, sig, queue):
+        from myhdl._simulator import _futureEvents
+
+        def stimulus():
+            # glitch much faster than the delay
+            for i in range(1000):
+                sig.next = i % 7
+                yield delay(1)
+                queue.append(len(_futureEvents))
+            yield delay(2 * sig.delay)
+            assert sig.val == 999 % 7
+            sig.next = 3
+            yield delay(1)
+            # assigning the same value doesn't restart the transaction
+            sig.next = 3
+            yield delay(sig.delay - 1)
+            assert sig.val == 3
+            raise StopSimulation()
+
+        def response():
+            while 1:
+                yield sig
+                # only the last of a burst of glitches gets through
+                assert now() == 1000 - 1 + sig.delay
+                yield sig
+                assert now() == 1000 + 3 * sig.delay
+
+        return [stimulus(), response()]
+
+    def testBool(self):
+        queue = []
+        sig = Signal(0, delay=50)
+        Simulation(self.bench(sig, queue)).run(quiet=QUIET)
+        assert max(queue) <= 3
+
+    def testIntbv(self):
+        queue = []
+        sig = Signal(intbv(0)[3:], delay=50)
+        Simulation(self.bench(sig, queue)).run(quiet=QUIET)
+        assert max(queue) <= 3
+
+    def testDelayInterned(self):
+        assert delay(10) is delay(10)
+        assert delay(10)._time == 10
+        with self.assertRaises(TypeError):
+            delay(-1)
+
+
+class Watch(TestCase):
+
+    """ Check value-change monitors """
+
+    def bench(self, sig):
+
+        def stimulus():
+            for i in range(1, 10):
+                sig.next = i // 2
+                yield delay(10)
+            raise StopSimulation()
+
+        return stimulus()
+
+    def testOnChange(self):
+        sig = Signal(0)
+        changes = []
+        m = sig.on_change(lambda s: changes.append((now(), int(s))))
+        odd = []
+        sig.on_change(lambda s: odd.append(now()), lambda v: v % 2)
+        Simulation(self.bench(sig)).run(quiet=QUIET)
+        assert changes == [(10, 1), (30, 2), (50, 3), (70, 4)]
+        assert odd == [10, 50]
+        m.remove()
+        Simulation(self.bench(sig)).run(quiet=QUIET)
+        assert len(changes) == 4
+        assert odd == [10, 50, 10, 50]
+
+    def testWatch(self):
+        sig = Signal(0)
+        sim = Simulation(self.bench(sig))
+        times = []
+        sim.watch(sig, lambda s: times.append(now()))
+        # break when the value becomes 3
+        sim.watch(sig, when=3)
+        assert sim.run(quiet=QUIET) == 1
+        assert now() == 50
+        assert sig == 3
+        assert sim.run(quiet=QUIET) == 0
+        assert times == [10, 30, 50, 70]
+        # the watchpoints end with the simulation
+        assert sig._shadows == []
+
+
+class Step(TestCase):
+
+    """ Check stepping a simulation from an external loop """
+
+    def bench(self, clk, d, q, n=None):
+
+        def clkgen():
+            for i in range(n or 1000):
+                yield delay(5)
+                clk.next = not clk
+            raise StopSimulation()
+
+        def register():
+            while 1:
+                yield clk.posedge
+                q.next = q + d
+
+        return clkgen(), register()
+
+    def testStep(self):
+        clk, d, q = Signal(bool(0)), Signal(0), Signal(0)
+        sim = Simulation(self.bench(clk, d, q))
+        for i in range(1, 6):
+            d.next = i
+            assert sim.step(clock=clk) == 1
+            assert now() == 10 * i - 5
+            # the register output has settled
+            assert q == i * (i + 1) // 2
+        assert sim.step(3, clock=clk) == 1
+        assert now() == 75
+        assert q == 15 + 3 * 5
+        # mixed with run
+        assert sim.run(20, quiet=QUIET) == 1
+        assert now() == 95
+        assert q == 40
+        assert sim.step(clock=clk) == 1
+        assert now() == 105
+        assert q == 45
+        # the kernel is kept across suspends
+        kernel = sim._kernel
+        assert sim.run(20, quiet=QUIET) == 1
+        assert sim.step(clock=clk) == 1
+        assert sim._kernel is kernel
+        assert now() == 135
+        assert q == 60
+        sim.quit()
+
+    def testAdvanceTo(self):
+        clk, d, q = Signal(bool(0)), Signal(1), Signal(0)
+        sim = Simulation(self.bench(clk, d, q))
+        assert sim.advance_to(12) == 1
+        assert now() == 12
+        assert q == 1
+        assert sim.advance_to(15) == 1
+        assert q == 2
+        # an empty advance
+        assert sim.advance_to(15) == 1
+        assert q == 2
+        with raises_kind(SimulationError, _error.TimeInPast):
+            sim.advance_to(10)
+        sim.quit()
+
+    def testFinish(self):
+        clk, d, q = Signal(bool(0)), Signal(1), Signal(0)
+        sim = Simulation(self.bench(clk, d, q, n=6))
+        assert sim.step(2, clock=clk) == 1
+        assert q == 2
+        # the clock stops after the third edge
+        assert sim.step(2, clock=clk, quiet=QUIET) == 0
+        with self.assertRaises(StopSimulation):
+            sim.step(clock=clk)
+
+    def testClockArg(self):
+        clk, d, q = Signal(bool(0)), Signal(1), Signal(0)
+        sim = Simulation(self.bench(clk, d, q))
+        with raises_kind(SimulationError, _error.StepClock):
+            sim.step(1)
+        for n in (0, -1):
+            with raises_kind(SimulationError, _error.StepCount):
+                sim.step(n, clock=clk)
+        assert now() == 0
+        sim.quit()
@@ -24,7 +24,9 @@ from myhdl import (AlwaysError, Signal, Simulation, StopSimulation, delay,
                    intbv, always)
 from myhdl._always import _error
 from myhdl._Waiter import (_DelayWaiter, _EdgeTupleWaiter, _EdgeWaiter,
-                           _SignalTupleWaiter, _SignalWaiter, _Waiter)
+                           _SignalTupleWaiter, _SignalWaiter, _Waiter,
+                           _SubscribeWaiter, _CallbackWaiter,
+                           _MultiCallbackWaiter)
 from helpers import raises_kind
 
 # random.seed(3) # random, but deterministic
@@ -181,3 +183,53 @@ class TestInferWaiter:
     def testGeneral(self):
         sim = Simulation(self.bench(GeneralFunc, _Waiter))
         sim.run()
+
+
+class TestCallbackWaiter:
+
+    def testSimWaiter(self):
+        a, b = [Signal(intbv(0)) for __ in range(2)]
+        assert type(SignalFunc1(a, b, a, b, a)._simwaiter()) is \
+            _SubscribeWaiter
+        assert type(DelayFunc(a, b, a, b, a)._simwaiter()) is _DelayWaiter
+        w = EdgeFunc1(a, b, a, b, a)._simwaiter()
+        assert type(w.waiter) is _CallbackWaiter
+        w = GeneralFunc(a, b, a, b, a)._simwaiter()
+        assert type(w.waiter) is _MultiCallbackWaiter
+
+    def testOncePerDelta(self):
+        a, b, c = [Signal(intbv(0)) for __ in range(3)]
+        count = [0]
+
+        @always(a, b, c.posedge)
+        def logic():
+            count[0] += 1
+
+        def stimulus():
+            for i in range(1, 11):
+                a.next = i
+                b.next = i
+                c.next = i % 2
+                yield delay(10)
+            raise StopSimulation
+
+        Simulation(logic, stimulus()).run(quiet=QUIET)
+        assert count[0] == 10
+
+    def testNoReregistration(self):
+        clk = Signal(bool(0))
+
+        @always(clk.posedge)
+        def logic():
+            pass
+
+        def stimulus():
+            for i in range(4):
+                clk.next = not clk
+                yield delay(10)
+            assert len(clk._posedgeWaiters) == 0
+            assert clk._subs.posedge == [sub.waiter]
+            raise StopSimulation
+
+        sub = logic._simwaiter()
+        Simulation(sub, stimulus()).run(quiet=QUIET)
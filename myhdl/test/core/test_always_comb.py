@@ -425,3 +425,102 @@ class TestInferWaiter:
     def testSignalTuple1(self):
         sim = Simulation(self.bench(SignalTupleGen1, _SignalTupleWaiter))
         sim.run()
+
+
+def MemRead(mem, addr, dout, hi, lo, runs):
+
+    @always_comb
+    def comb():
+        runs[0] += 1
+        dout.next = mem[addr]
+        hi.next = mem[addr[3:] + 4]
+        lo.next = mem[2]
+
+    return comb
+
+
+class TestAlwaysCombMemory:
+
+    def testSensitivity(self):
+        mem = [Signal(intbv(0)[8:]) for __ in range(64)]
+        addr = Signal(intbv(0)[6:])
+        dout, hi, lo = [Signal(intbv(0)[8:]) for __ in range(3)]
+        runs = [0]
+        comb = MemRead(mem, addr, dout, hi, lo, runs)
+        # the full memory for conversion, the addressed element in simulation
+        assert len(comb.senslist) == 65
+        assert comb._simsenslist == (addr,)
+
+        def stimulus():
+            for __ in range(2000):
+                yield delay(randrange(1, 10))
+                if randrange(8) == 0:
+                    addr.next = randrange(64)
+                else:
+                    mem[randrange(64)].next = randrange(256)
+                if randrange(4) == 0:
+                    mem[addr].next = randrange(256)
+            raise StopSimulation
+
+        def check():
+            while 1:
+                yield delay(1)
+                assert dout == mem[addr]
+                assert hi == mem[addr[3:] + 4]
+                assert lo == mem[2]
+
+        Simulation(comb, stimulus(), check()).run(quiet=QUIET)
+        # a write to an element that is not read does not wake up comb
+        assert runs[0] < 1000
+
+    def testSameDelta(self):
+        mem = [Signal(intbv(i)[8:]) for i in range(8)]
+        addr = Signal(intbv(0)[3:])
+        dout = Signal(intbv(0)[8:])
+        runs = [0]
+
+        @always_comb
+        def comb():
+            runs[0] += 1
+            dout.next = mem[addr]
+
+        def stimulus():
+            yield delay(10)
+            # the index and the addressed element change together
+            addr.next = 1
+            mem[0].next = 10
+            mem[1].next = 11
+            yield delay(10)
+            assert dout == 11
+            raise StopSimulation
+
+        Simulation(comb, stimulus()).run(quiet=QUIET)
+        # once at the start, once for the changes
+        assert runs[0] == 2
+
+    def testSlicedMemory(self):
+        mem = [Signal(intbv(i)[8:]) for i in range(8)]
+        addr = Signal(intbv(0)[3:])
+        dout, dconst = [Signal(intbv(0)[8:]) for __ in range(2)]
+
+        @always_comb
+        def comb():
+            # a sliced memory is a list: all elements stay in the senslist
+            dout.next = mem[addr:8][0]
+            dconst.next = mem[1:3][1]
+
+        assert len(comb._simsenslist) == 9
+
+        def stimulus():
+            yield delay(10)
+            addr.next = 3
+            yield delay(10)
+            assert dout == 3
+            mem[3].next = 30
+            mem[2].next = 20
+            yield delay(10)
+            assert dout == 30
+            assert dconst == 20
+            raise StopSimulation
+
+        Simulation(comb, stimulus()).run(quiet=QUIET)
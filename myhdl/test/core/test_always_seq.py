@@ -1,5 +1,8 @@
+import pytest
 
-from myhdl import Signal, always_seq, ResetSignal
+from myhdl import (block, Signal, always_seq, ResetSignal, intbv, modbv, xbv,
+                   enum, concat, delay, instance, StopSimulation)
+from myhdl._Simulation import Simulation
 from myhdl._always_seq import AlwaysSeqError, _error
 from helpers import raises_kind
 
@@ -52,3 +55,193 @@ def test_reset():
 
     except:
         assert False
+
+
+def test_gated_pure():
+    """ check that a gated function is pure """
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    a = Signal(intbv(0)[8:])
+    q = Signal(intbv(0)[8:])
+    v = intbv(0)[8:]
+
+    with raises_kind(AlwaysSeqError, _error.NotPure):
+
+        @always_seq(clock.posedge, reset=reset, gated=True)
+        def var():
+            v[:] = v + a
+            q.next = v
+
+    with raises_kind(AlwaysSeqError, _error.NotPure):
+
+        @always_seq(clock.posedge, reset=reset, gated=True)
+        def call():
+            print(a)
+            q.next = a
+
+    log = []
+    with pytest.raises(AlwaysSeqError) as e:
+
+        @always_seq(clock.posedge, reset=reset, gated=True)
+        def method():
+            log.append(int(a))
+            q.next = a
+
+    assert e.value.kind == _error.NotPure
+    assert 'call to log.append' in str(e.value)
+
+    @always_seq(clock.posedge, reset=reset, gated=True)
+    def pure():
+        q.next = concat(a[4:], q[4:]) if a > 3 else min(int(a), 2)
+
+
+def pipe(clk, reset, en, d, q, runs, gated):
+    stages = [Signal(intbv(0)[8:]) for i in range(3)]
+
+    @always_seq(clk.posedge, reset=reset, gated=gated)
+    def first():
+        runs[0] += 1
+        if en:
+            stages[0].next = d
+
+    @always_seq(clk.posedge, reset=reset, gated=gated)
+    def rest():
+        runs[1] += 1
+        for i in range(1, 3):
+            stages[i].next = stages[i - 1] + 1
+        q.next = stages[2]
+
+    return first, rest
+
+
+@block
+def gatedBench(trace, runs, gated):
+    clk = Signal(bool(0))
+    reset = ResetSignal(1, active=1, isasync=False)
+    en = Signal(bool(0))
+    d = Signal(intbv(0)[8:])
+    q = Signal(intbv(0)[8:])
+
+    dut = block(pipe)(clk, reset, en, d, q, runs, gated)
+
+    @instance
+    def stim():
+        for i in range(200):
+            reset.next = i in (0, 1, 120)
+            en.next = i % 40 < 3
+            d.next = i if i % 80 < 20 else d
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            trace.append(int(q))
+            clk.next = 0
+        raise StopSimulation()
+
+    return dut, stim
+
+
+def test_gated():
+    """ check that gating only skips activations without effect """
+    ref, runs = [], [0, 0]
+    Simulation(gatedBench(ref, runs, False)).run(quiet=1)
+    trace, gatedRuns = [], [0, 0]
+    Simulation(gatedBench(trace, gatedRuns, True)).run(quiet=1)
+    assert trace == ref
+    assert len(set(ref)) > 3
+    assert gatedRuns[0] < runs[0] // 2
+    assert gatedRuns[1] < runs[1] // 2
+
+
+@block
+def sameDeltaBench(trace, gated):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    d = Signal(intbv(0)[8:])
+    q = Signal(intbv(0)[8:])
+
+    @always_seq(clk.posedge, reset=reset, gated=gated)
+    def reg():
+        q.next = d
+
+    @instance
+    def stim():
+        for v in (1, 1, 1, 2, 2, 3):
+            # the data changes in the delta cycle of the clock edge
+            d.next = v
+            clk.next = 1
+            yield delay(5)
+            trace.append(int(q))
+            clk.next = 0
+            yield delay(5)
+        raise StopSimulation()
+
+    return reg, stim
+
+
+def test_gated_same_delta():
+    """ check that an input change with the clock edge is seen """
+    ref, trace = [], []
+    Simulation(sameDeltaBench(ref, False)).run(quiet=1)
+    Simulation(sameDeltaBench(trace, True)).run(quiet=1)
+    assert ref == [1, 1, 1, 2, 2, 3]
+    assert trace == ref
+
+
+@block
+def resetBench(isasync):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=0, isasync=isasync)
+    t_state = enum('A', 'B', 'C')
+    b = Signal(bool(1))
+    n = Signal(5)
+    v = Signal(intbv(7, min=-8, max=8))
+    m = Signal(modbv(3)[4:])
+    e = Signal(t_state.B)
+    x = Signal(xbv('1x0'))
+    regs = [Signal(intbv(i)[8:]) for i in range(100)]
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        b.next = not b
+        n.next = n + 1
+        v.next = -v
+        m.next = m + 5
+        e.next = t_state.C
+        x.next = 5
+        for i in range(100):
+            regs[i].next = regs[i] + 1
+
+    @instance
+    def stim():
+        for i in range(3):
+            reset.next = 1
+            for j in range(i + 1):
+                yield delay(5)
+                clk.next = 1
+                yield delay(5)
+                clk.next = 0
+            odd = i % 2 == 0
+            assert (b, n, v, m, e) == (not odd, 5 + i + 1, -7 if odd else 7,
+                                       (3 + 5 * (i + 1)) % 16, t_state.C)
+            assert int(x) == 5
+            assert [int(r) for r in regs] == [(k + i + 1) % 256
+                                              for k in range(100)]
+            reset.next = 0
+            yield delay(5)
+            if not isasync:
+                clk.next = 1
+                yield delay(5)
+                clk.next = 0
+            yield delay(1)
+            assert (b, n, v, m, e) == (True, 5, 7, 3, t_state.B)
+            assert str(x) == '1x0'
+            assert [int(r) for r in regs] == list(range(100))
+        raise StopSimulation()
+
+    return seq, stim
+
+
+@pytest.mark.parametrize('isasync', [False, True])
+def test_reset_values(isasync):
+    """ check that a reset assigns the initial values """
+    Simulation(resetBench(isasync)).run(quiet=1)
@@ -0,0 +1,178 @@
+""" Run the unit tests for clocked assertions. """
+import re
+
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, delay, instance,
+                   always, always_seq, assertions, StopSimulation,
+                   PropertyError)
+from myhdl._Simulation import Simulation
+from myhdl._assertions import _error
+from helpers import raises_kind
+
+
+@block
+def handshake(clk, reset, req, ack, start, done, latencies):
+    count = Signal(intbv(0)[4:])
+    busy = Signal(bool(0))
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        ack.next = 0
+        if busy:
+            if count == 0:
+                ack.next = 1
+                busy.next = 0
+            else:
+                count.next = count - 1
+        elif req:
+            busy.next = 1
+            count.next = latencies[0]
+            latencies.append(latencies.pop(0))
+
+    @block
+    def checks():
+        props = assertions(clk.posedge, reset=reset, fatal=False,
+                           name='props')
+        props.within(req, ack, 4, name='ack')
+        props.never(lambda: req and ack, name='overlap')
+        props.exclusive(start, done, name='burst')
+        props.implies(start, lambda: not start, 1, name='pulse')
+        return props
+
+    props = checks()
+
+    return seq, props
+
+
+@block
+def bench(latencies, bursts, results):
+    clk = Signal(bool(0))
+    reset = ResetSignal(1, active=1, isasync=False)
+    req, ack = Signal(bool(0)), Signal(bool(0))
+    start, done = Signal(bool(0)), Signal(bool(0))
+
+    dut = handshake(clk, reset, req, ack, start, done, latencies)
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @instance
+    def stim():
+        yield clk.negedge
+        reset.next = 0
+        for i in range(6):
+            req.next = 1
+            yield clk.negedge
+            req.next = 0
+            yield ack.negedge
+            yield clk.negedge
+        for n in bursts:
+            start.next = 1
+            yield clk.negedge
+            start.next = 0
+            for j in range(n):
+                yield clk.negedge
+            done.next = 1
+            yield clk.negedge
+            done.next = 0
+        yield clk.negedge
+        raise StopSimulation()
+
+    results.append(dut.subs[1].subs[0])
+    return dut, clkgen, stim
+
+
+def test_pass():
+    results = []
+    Simulation(bench([0, 2, 1, 2], [2, 0, 1], results)).run(quiet=1)
+    props = results[0]
+    assert props.failures == []
+
+
+def test_fail():
+    results = []
+    Simulation(bench([0, 2, 3, 1], [2, 0, 1], results)).run(quiet=1)
+    props = results[0]
+    assert len(props.failures) == 1
+    t, path = props.failures[0]
+    assert re.match(r'bench\d+\.handshake\d+\.checks\w+\.props\.ack$', path)
+    assert t > 0
+
+
+@block
+def badBench(fatal, results):
+    clk = Signal(bool(0))
+    a = Signal(bool(0))
+    b = Signal(bool(0))
+
+    props = assertions(clk.posedge, fatal=fatal)
+    props.implies(a, b, 2)
+    results.append(props)
+
+    @instance
+    def stim():
+        for v in (1, 0, 0, 0, 1, 0, 0, 0):
+            a.next = v
+            b.next = v
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+        raise StopSimulation()
+
+    return props, stim
+
+
+def test_fatal():
+    with pytest.raises(AssertionError) as e:
+        Simulation(badBench(True, [])).run(quiet=1)
+    assert 'badBench' in str(e.value)
+    assert '.assertions.p0 ' in str(e.value)
+    assert 'time 25' in str(e.value)
+
+
+def test_nonfatal():
+    results = []
+    Simulation(badBench(False, results)).run(quiet=1)
+    assert [t for t, p in results[0].failures] == [25, 65]
+
+
+def test_errors():
+    clk = Signal(bool(0))
+    with raises_kind(PropertyError, _error.EdgeType):
+        assertions(clk)
+    with raises_kind(PropertyError, _error.ResetType):
+        assertions(clk.posedge, reset=clk)
+    props = assertions(clk.posedge)
+    with raises_kind(PropertyError, _error.ExprType):
+        props.always(1)
+    with raises_kind(PropertyError, _error.Window):
+        props.within(clk, clk, 0)
+    props.always(clk, name='a')
+    with raises_kind(PropertyError, _error.DuplicateName):
+        props.never(clk, name='a')
+
+
+def test_machines():
+    from myhdl._assertions import _Within, _Exclusive, _Implies
+
+    def trace(s):
+        return lambda: s[k[0]] == '1'
+
+    k = [0]
+
+    def run(prop, n):
+        fails = []
+        for k[0] in range(n):
+            if not prop.check():
+                fails.append(k[0])
+        return fails
+
+    a, c = '1100000100000', '0000100000000'
+    assert run(_Within('w', trace(a), trace(c), 3), len(a)) == [3, 10]
+    a, c = '1010000', '0011010'
+    assert run(_Implies('i', trace(a), trace(c), 2), len(a)) == [4]
+    s, e = '1001011010', '0000100010'
+    assert run(_Exclusive('x', trace(s), trace(e)), len(s)) == [3, 6]
@@ -0,0 +1,168 @@
+""" Run the unit tests for toggle and code coverage. """
+import sys
+
+import pytest
+
+from myhdl import (block, Signal, intbv, delay, instance, always,
+                   StopSimulation, toggleCoverage, codeCoverage)
+from myhdl._Simulation import Simulation
+
+monitoring = pytest.mark.skipif(not hasattr(sys, 'monitoring'),
+                                reason="requires sys.monitoring")
+
+
+@block
+def counter(clk, q, en):
+    dead = Signal(intbv(0)[4:])
+
+    @always(clk.posedge)
+    def seq():
+        if en:
+            q.next = (q + 1) % 8
+        dead.next = dead
+
+    return seq
+
+
+@block
+def bench():
+    clk = Signal(bool(0))
+    en = Signal(bool(0))
+    q = Signal(intbv(0)[4:])
+
+    dut = counter(clk, q, en)
+
+    @instance
+    def stim():
+        en.next = 1
+        for i in range(10):
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+        raise StopSimulation()
+
+    return dut, stim
+
+
+def test_report():
+    tb = bench()
+    cov = toggleCoverage(tb)
+    tb.run_sim(quiet=1)
+    toggles = dict((n, t) for path, nets in cov.instances for n, t in nets)
+    # the ports of the counter are reported at the top level
+    assert sorted(toggles) == ['clk', 'dead', 'en', 'q']
+    q = toggles['q']
+    # q counts 1..7, 0, 1, 2: the lower 3 bits rose and fell
+    assert (q.rise, q.fall) == (7, 7)
+    assert q.covered() == 3
+    assert q.toggles == 1 + 2 + 1 + 3 + 1 + 2 + 1 + 3 + 1 + 2
+    # the simulation stops before the last falling edge
+    assert toggles['clk'].toggles == 19
+    assert toggles['clk'].times(100) == (50, 50)
+    assert toggles['en'].covered() == 0
+    assert toggles['dead'].toggles == 0
+    report = cov.report()
+    assert 'bench.counter' in report
+    assert 'toggle coverage: 4/10 bits (40.0%)' in report
+    cov.remove()
+
+
+def test_saif(tmpdir):
+    tb = bench()
+    cov = toggleCoverage(tb)
+    tb.run_sim(quiet=1)
+    cov.remove()
+    path = str(tmpdir.join('bench.saif'))
+    cov.saif(path)
+    with open(path) as f:
+        text = f.read()
+    assert '(DURATION 100)' in text
+    assert '(clk (T0 50) (T1 50) (TX 0) (TC 19))' in text
+    assert '(q (TC 17))' in text
+    assert '(INSTANCE counter' in text
+    assert text.count('(') == text.count(')')
+
+
+def test_args():
+    with pytest.raises(TypeError):
+        toggleCoverage(Signal(bool(0)))
+
+
+@block
+def twoCounters(enables):
+    clk = Signal(bool(0))
+    ens = [Signal(bool(e)) for e in enables]
+    qs = [Signal(intbv(0)[4:]) for e in enables]
+
+    duts = [counter(clk, q, en) for q, en in zip(qs, ens)]
+
+    @instance
+    def stim():
+        for i in range(10):
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+        raise StopSimulation()
+
+    return duts, stim
+
+
+@monitoring
+def test_code_report():
+    tb = twoCounters((1, 0))
+    cov = codeCoverage(tb)
+    tb.run_sim(quiet=1)
+    cov.remove()
+    (top, stims), (path0, seqs0), (path1, seqs1) = cov.instances
+    assert [p.name for p in stims] == ['stim']
+    assert stims[0].missing() == []
+    # the instances of counter have their own code and coverage
+    seq0, seq1 = seqs0[0], seqs1[0]
+    assert seq0.code is not seq1.code
+    assert seq0.missing() == []
+    assert len(seq1.missing()) == 1
+    lines, nrlines, branches, nrbranches = seq1.counts()
+    assert (lines, nrlines) == (2, 3)
+    assert branches < nrbranches
+    report = cov.report()
+    assert 'line coverage: ' in report
+    assert 'missing %d' % seq1.missing()[0] in report
+
+
+@monitoring
+def test_code_specialize():
+    tb = twoCounters((1, 0))
+    cov = codeCoverage(tb)
+    # the optimized functions are monitored instead
+    Simulation(tb, specialize=True, fsm_dispatch=True).run(quiet=1)
+    cov.remove()
+    (top, stims), (path0, seqs0), (path1, seqs1) = cov.instances
+    assert seqs0[0].code is not seqs1[0].code
+    assert seqs0[0].missing() == []
+    assert len(seqs1[0].missing()) == 1
+
+
+@monitoring
+def test_code_remove():
+    tb = twoCounters((1, 1))
+    cov = codeCoverage(tb)
+    cov.remove()
+    # the tool id is released
+    cov = codeCoverage(tb)
+    cov.remove()
+    tb.run_sim(quiet=1)
+    assert all(not p.hits for path, procs in cov.instances for p in procs)
+
+
+@pytest.mark.skipif(hasattr(sys, 'monitoring'),
+                    reason="sys.monitoring is available")
+def test_code_nomonitoring():
+    with pytest.raises(RuntimeError):
+        codeCoverage(bench())
+
+
+def test_code_args():
+    with pytest.raises(TypeError):
+        codeCoverage(Signal(bool(0)))
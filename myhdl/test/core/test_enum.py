@@ -83,3 +83,21 @@ class TestEnum:
         l = len(t_State)
         assert l == len(t_State)
 
+
+    def testItemCodes(self):
+        t = enum("A", "B", "C", encoding="one_cold")
+        for i, name in enumerate(("A", "B", "C")):
+            item = getattr(t, name)
+            assert int(item) == int(t._codedict[name], 2)
+            assert item._index == i
+
+    def testItemCompare(self):
+        from myhdl import Signal
+        s = Signal(t_State.CONFIRM)
+        assert t_State.CONFIRM == s
+        assert t_State.SEARCH != s
+        assert not (t_State.SEARCH == t_State.SYNC)
+        with pytest.raises(TypeError):
+            t_State.SEARCH == t_Homograph.SEARCH
+        with pytest.raises(TypeError):
+            t_State.SEARCH != 0
@@ -0,0 +1,137 @@
+""" Run the unit tests for the fsm dispatch transformation. """
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, enum, delay, instance,
+                   always, always_comb, always_seq, StopSimulation)
+from myhdl._Simulation import Simulation
+from myhdl._fsmdispatch import _fsmDispatch
+
+t_state = enum('IDLE', 'LOAD', 'RUN', 'WAIT', 'DONE')
+
+
+@block
+def fsm(clk, reset, start, count, state, trace):
+
+    cnt = intbv(0, min=0, max=16)
+    t_sub = enum('A', 'B')
+    sub = Signal(t_sub.A)
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        if state == t_state.IDLE:
+            if start:
+                state.next = t_state.LOAD
+        elif t_state.LOAD == state:
+            cnt[:] = 0
+            state.next = t_state.RUN
+        elif state == t_state.RUN:
+            if sub == t_sub.A:
+                sub.next = t_sub.B
+            elif sub == t_sub.B:
+                sub.next = t_sub.A
+                for i in range(2):
+                    if cnt == 15:
+                        break
+                    cnt[:] = cnt + 1
+            if cnt == 15:
+                state.next = t_state.WAIT
+        elif state == t_state.LOAD:
+            # unreachable: the first match wins
+            state.next = t_state.IDLE
+        else:
+            state.next = t_state.DONE if state == t_state.WAIT else t_state.IDLE
+        count.next = cnt
+
+    @always(clk.posedge)
+    def log():
+        trace.append((int(count), str(state), str(sub)))
+
+    return seq, log
+
+
+@block
+def bench(trace):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    start = Signal(bool(0))
+    count = Signal(intbv(0)[4:])
+    state = Signal(t_state.IDLE)
+
+    dut = fsm(clk, reset, start, count, state, trace)
+
+    @instance
+    def stim():
+        for i in range(100):
+            start.next = i % 40 == 5
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+            yield delay(5)
+        raise StopSimulation()
+
+    return dut, stim
+
+
+def test_dispatch_equivalence():
+    ref = []
+    Simulation(bench(ref)).run(quiet=1)
+    res = []
+    Simulation(bench(res), fsm_dispatch=True).run(quiet=1)
+    assert res == ref
+    assert ('DONE' in (t[1] for t in ref))
+
+
+def test_block_config_sim():
+    res = []
+    inst = bench(res)
+    inst.config_sim(fsm_dispatch=True)
+    inst.run_sim(quiet=1)
+    assert len(res) == 100
+
+
+def test_transformed():
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    inst = fsm(clk, reset, Signal(bool(0)), Signal(intbv(0)[4:]),
+               Signal(t_state.IDLE), [])
+    seq = inst.subs[0]
+    f = _fsmDispatch(seq.func)
+    assert f is not seq.func
+    assert f.__wrapped__ is seq.func
+    # the state chain is replaced by a table covering all states
+    tables = [c.cell_contents for c in f.__closure__
+              if isinstance(c.cell_contents, dict)]
+    assert len(tables) == 1
+    assert set(str(k) for k in tables[0]) == set(t_state._names)
+    # the nested chain on sub is transformed as well
+    run = tables[0][t_state.RUN]
+    assert any(n.startswith('_myhdl_dispatch') for n in run.__code__.co_freevars)
+
+
+def test_not_transformed():
+    state = Signal(t_state.IDLE)
+    x = Signal(bool(0))
+
+    def f1():
+        if state == t_state.IDLE:
+            return
+        elif state == t_state.RUN:
+            x.next = 1
+
+    def f2():
+        v = 0
+        if state == t_state.IDLE:
+            v = 1
+        elif state == t_state.RUN:
+            v = 2
+        x.next = v
+
+    def f3():
+        # a single state is not worth dispatching
+        if state == t_state.IDLE:
+            x.next = 0
+        else:
+            x.next = 1
+
+    for f in (f1, f2, f3):
+        assert _fsmDispatch(f) is f
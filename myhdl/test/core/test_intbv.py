@@ -26,7 +26,7 @@ from random import randrange
 
 import pytest
 
-from myhdl import intbv
+from myhdl import intbv, modbv
 
 random.seed(2)  # random, but deterministic
 maxint = sys.maxsize
@@ -562,3 +562,98 @@ class TestIntbvCopy:
                 assert n.min == m.min
                 assert n.max == m.max
                 assert len(n) == len(m)
+
+
+class TestIntbvSlots:
+
+    def testNoDict(self):
+        a = intbv(5)[8:]
+        assert not hasattr(a, '__dict__')
+        with pytest.raises(AttributeError):
+            a.foo = 1
+
+    def testDerivedAttributes(self):
+        # results built through the fast internal path should carry the
+        # same attributes as those built through the public constructor
+        a = intbv(0xa5)[8:]
+        for res, ref in ((a[6:2], intbv(0x9, _nrbits=4)),
+                         (a.signed(), intbv(-91, min=-128, max=128)),
+                         (a.signed().unsigned(), intbv(0xa5)[8:]),
+                         (copy(a), intbv(0xa5, min=0, max=256))):
+            assert type(res) is type(ref)
+            assert res._val == ref._val
+            assert res.min == ref.min
+            assert res.max == ref.max
+            assert len(res) == len(ref)
+        for res in (a & a, a | a, a ^ a, a << a, a >> a, ~a):
+            assert type(res) is intbv
+            assert res.min is None and res.max is None
+            assert len(res) == 0
+
+
+class TestIntbvView:
+
+    def testRead(self):
+        a = intbv(0xabcd)[16:]
+        v = a.view(12, 4)
+        assert len(v) == 8
+        assert v.min == 0 and v.max == 256
+        assert v == 0xbc
+        assert v + 1 == 0xbd
+        assert v[8:4] == 0xb
+        assert v & 0xf == 0xc
+        a[:] = 0x1234
+        assert v == 0x23
+
+    def testWrite(self):
+        a = intbv(0xabcd)[16:]
+        v = a.view(12, 4)
+        v[:] = 0x12
+        assert a == 0xa12d
+        v[0] = 0
+        assert a == 0xa12d & ~(1 << 4)
+        v[:] = 0xff
+        v += 0
+        with pytest.raises(ValueError):
+            v += 1
+        assert a == 0xaffd
+
+    def testParentBounds(self):
+        a = intbv(0x1f, min=0x10, max=0x40)
+        v = a.view(6)
+        # clearing the slice bits is out of range for the parent, the
+        # composed value is not
+        v[5:0] = 0x11
+        assert a == 0x11
+        with pytest.raises(ValueError):
+            v[5:0] = 0x0f
+
+    def testModbvParent(self):
+        m = modbv(0)[8:]
+        v = m.view(8, 4)
+        v[:] = 15
+        assert m == 0xf0
+
+    def testCopy(self):
+        a = intbv(0xabcd)[16:]
+        v = a.view(8)
+        c = copy(v)
+        assert type(c) is intbv
+        a[:] = 0
+        assert c == 0xcd
+        assert v == 0
+
+    def testSignalNext(self):
+        from myhdl import Signal
+        a = intbv(0xabcd)[16:]
+        s = Signal(intbv(0)[8:])
+        s.next = a.view(16, 8)
+        assert s.next == 0xab
+        assert type(Signal(a.view(8))._val) is intbv
+
+    def testBounds(self):
+        a = intbv(0)[8:]
+        with pytest.raises(ValueError):
+            a.view(3, 3)
+        with pytest.raises(ValueError):
+            a.view(3, -1)
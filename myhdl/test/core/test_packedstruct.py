@@ -0,0 +1,100 @@
+""" Run the packedstruct unit tests. """
+from copy import copy, deepcopy
+
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, delay, instance,
+                   always_seq, packedstruct, PackedStructType, StopSimulation)
+from myhdl._Simulation import Simulation
+
+Header = packedstruct(('opcode', 4), ('length', 8), ('par', 1), ('flags', 3),
+                      name='Header')
+
+
+class TestPackedStruct:
+
+    def testType(self):
+        h = Header()
+        assert isinstance(h, PackedStructType)
+        assert isinstance(h, intbv)
+        assert len(h) == 16
+        assert h.min == 0 and h.max == 2 ** 16
+        assert Header._fields['opcode'] == (16, 12)
+        assert Header._fields['par'] == (4, 3)
+
+    def testFields(self):
+        h = Header(opcode=0xa, length=0x5c, flags=5)
+        assert h == 0xa5c5
+        assert h.opcode == 0xa
+        assert len(h.opcode) == 4
+        assert h.length == h[12:4]
+        assert h.par is False
+        h.par = 1
+        assert h.par is True
+        assert h == 0xa5cd
+        h.length = intbv(0xff)[8:]
+        assert h == 0xaffd
+        h.flags = -1
+        assert h.flags == 7
+        with pytest.raises(ValueError):
+            h.length = 256
+
+    def testCopy(self):
+        h = Header(opcode=3)
+        for c in (copy(h), deepcopy(h)):
+            assert type(c) is Header
+            assert c == h
+
+    def testErrors(self):
+        with pytest.raises(ValueError):
+            packedstruct()
+        with pytest.raises(ValueError):
+            packedstruct(('a', 2), ('a', 2))
+        with pytest.raises(ValueError):
+            packedstruct(('a', 0))
+        with pytest.raises(ValueError):
+            packedstruct(('next', 2))
+        with pytest.raises(ValueError):
+            packedstruct(('signed', 2))
+        with pytest.raises(TypeError):
+            packedstruct('a')
+        with pytest.raises(AttributeError):
+            Header(foo=1)
+
+
+@block
+def bench_SignalFields():
+
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    hdr = Signal(Header())
+    hout = Signal(Header())
+
+    @always_seq(clk.posedge, reset=reset)
+    def swap():
+        hout.next.opcode = hdr.flags
+        hout.next.length = hdr.length
+        hout.next.par = not hdr.par
+
+    @instance
+    def check():
+        for i in range(64):
+            hdr.next.flags = i % 8
+            hdr.next.length = 4 * i
+            hdr.next.par = i % 2
+            yield delay(10)
+            clk.next = 1
+            yield delay(10)
+            clk.next = 0
+            assert type(hout.val) is Header
+            assert hout.opcode == i % 8
+            assert hout.length == 4 * i
+            assert hout.par == (not i % 2)
+            assert hout.flags == 0
+        raise StopSimulation()
+
+    return swap, check
+
+
+def test_SignalFields():
+    Simulation(bench_SignalFields()).run(quiet=1)
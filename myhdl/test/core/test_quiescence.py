@@ -0,0 +1,151 @@
+""" Run the unit tests for the fast-forwarding of quiescent cycles. """
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, delay, now, instance,
+                   always, always_seq, StopSimulation, traceSignals)
+from myhdl import _simulator
+from myhdl._Simulation import Simulation
+
+
+def timer(clk, reset, start, busy, count, runs):
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        runs[0] += 1
+        if busy:
+            if count == 0:
+                busy.next = 0
+            else:
+                count.next = count - 1
+        elif start:
+            busy.next = 1
+            count.next = 9
+
+    return seq
+
+
+quiescentTimer = block(quiescent=True)(timer)
+plainTimer = block(timer)
+
+
+@block
+def bench(dut, trace, runs, gen=False):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    start = Signal(bool(0))
+    busy = Signal(bool(0))
+    count = Signal(intbv(0)[4:])
+
+    inst = dut(clk, reset, start, busy, count, runs)
+
+    if gen:
+        @instance
+        def clkgen():
+            while True:
+                yield delay(5)
+                clk.next = not clk
+    else:
+        @always(delay(5))
+        def clkgen():
+            clk.next = not clk
+
+    @instance
+    def stim():
+        for wait in (1000, 23, 5000, 12345):
+            yield delay(wait)
+            trace.append((now(), int(clk), int(count), int(busy)))
+            yield clk.negedge
+            start.next = 1
+            yield clk.negedge
+            start.next = 0
+            yield busy.negedge
+            trace.append((now(), int(clk), int(count), int(busy)))
+        yield delay(777)
+        trace.append((now(), int(clk), int(count), int(busy)))
+        raise StopSimulation()
+
+    return inst, clkgen, stim
+
+
+@pytest.mark.parametrize('gen', [False, True])
+def test_fastforward(gen):
+    ref, runs = [], [0]
+    Simulation(bench(plainTimer, ref, runs, gen)).run(quiet=1)
+    trace, fast = [], [0]
+    sim = Simulation(bench(quiescentTimer, trace, fast, gen))
+    assert sim._fastForward is not None
+    sim.run(quiet=1)
+    assert trace == ref
+    assert sim._fastForward.skipped > 1000
+    assert fast[0] < runs[0] // 10
+
+
+def test_duration():
+    ref, runs = [], [0]
+    sim = Simulation(bench(plainTimer, ref, runs))
+    sim.run(3000, quiet=1)
+    t = now()
+    sim.quit()
+    trace, fast = [], [0]
+    sim = Simulation(bench(quiescentTimer, trace, fast))
+    sim.run(3000, quiet=1)
+    assert now() == t
+    sim.run(quiet=1)
+    assert trace[:len(ref)] == ref
+
+
+@pytest.fixture
+def vcd_dir(tmpdir):
+    with tmpdir.as_cwd():
+        yield tmpdir
+    if _simulator._tracing:
+        _simulator._tf.close()
+        _simulator._tracing = 0
+
+
+def _vcd(dut, name):
+    traceSignals.name = name
+    try:
+        Simulation(traceSignals(bench(dut, [], [0]))).run(quiet=1)
+    finally:
+        traceSignals.name = None
+    with open(name + '.vcd') as f:
+        return f.read().split('$enddefinitions')[1]
+
+
+def test_vcd(vcd_dir):
+    assert _vcd(quiescentTimer, 'fast') == _vcd(plainTimer, 'plain')
+
+
+class Timers(object):
+
+    def timer(self, clk, reset, start, busy, count, runs):
+
+        @always_seq(clk.posedge, reset=reset)
+        def seq():
+            runs[0] += 1
+            if busy:
+                if count == 0:
+                    busy.next = 0
+                else:
+                    count.next = count - 1
+            elif start:
+                busy.next = 1
+                count.next = 9
+
+        return seq
+
+    quiescentTimer = block(quiescent=True)(timer)
+    plainTimer = block(timer)
+
+
+def test_method():
+    timers = Timers()
+    ref, runs = [], [0]
+    Simulation(bench(timers.plainTimer, ref, runs)).run(quiet=1)
+    trace, fast = [], [0]
+    sim = Simulation(bench(timers.quiescentTimer, trace, fast))
+    assert sim._fastForward is not None
+    sim.run(quiet=1)
+    assert trace == ref
+    assert fast[0] < runs[0] // 10
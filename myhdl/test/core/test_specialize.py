@@ -0,0 +1,155 @@
+""" Run the unit tests for specialised always block code. """
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, modbv, enum, delay,
+                   instance, always, always_comb, always_seq, concat,
+                   TristateSignal, StopSimulation)
+from myhdl._Simulation import Simulation
+from myhdl._specialize import _specialize
+
+t_state = enum('IDLE', 'RUN', 'DONE')
+
+
+@block
+def design(clk, reset, a, b, sel, mem, state, trace):
+
+    s = Signal(intbv(0, min=-64, max=64))
+    p = Signal(intbv(0)[8:])
+    q = Signal(modbv(0)[4:])
+    flag = Signal(bool(0))
+    acc = intbv(0)[8:]
+
+    @always_comb
+    def comb():
+        if sel:
+            s.next = a - b
+        else:
+            s.next = b - a if a < b else a - b
+        flag.next = a == b or (a > 10 and not sel)
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        if state == t_state.IDLE:
+            state.next = t_state.RUN
+        elif state == t_state.RUN:
+            mem[a[2:]].next = b
+            p.next[8:4] = a[4:]
+            p.next[0] = flag
+            q.next = q + 5
+            acc[:] = acc + mem[b[2:]]
+            if acc > 200:
+                state.next = t_state.DONE
+        else:
+            acc[:] = 0
+            state.next = t_state.IDLE
+
+    @always(clk.posedge)
+    def log():
+        trace.append((int(s), int(p), int(q), bool(flag), str(state),
+                      tuple(int(m) for m in mem), int(concat(q, flag))))
+
+    return comb, seq, log
+
+
+@block
+def bench(trace):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    a = Signal(intbv(0)[6:])
+    b = Signal(intbv(0)[6:])
+    sel = Signal(bool(0))
+    mem = [Signal(intbv(0)[8:]) for i in range(4)]
+    state = Signal(t_state.IDLE)
+
+    dut = design(clk, reset, a, b, sel, mem, state, trace)
+
+    @instance
+    def stim():
+        for i in range(200):
+            a.next = (i * 7) % 64
+            b.next = (i * 13 + 5) % 64
+            sel.next = i % 3 == 0
+            reset.next = i == 100
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+            yield delay(5)
+        raise StopSimulation()
+
+    return dut, stim
+
+
+@pytest.mark.parametrize('fsm_dispatch', [False, True])
+def test_equivalence(fsm_dispatch):
+    ref = []
+    Simulation(bench(ref)).run(quiet=1)
+    res = []
+    Simulation(bench(res), specialize=True,
+               fsm_dispatch=fsm_dispatch).run(quiet=1)
+    assert res == ref
+    assert 'DONE' in (t[4] for t in ref)
+
+
+def test_block_config_sim():
+    res = []
+    inst = bench(res)
+    inst.config_sim(specialize=True)
+    inst.run_sim(quiet=1)
+    assert len(res) == 200
+
+
+def _instances():
+    insts = []
+    for i in range(2):
+        clk = Signal(bool(0))
+        reset = ResetSignal(0, active=1, isasync=False)
+        mem = [Signal(intbv(0)[8:]) for i in range(4)]
+        inst = design(clk, reset, Signal(intbv(0)[6:]), Signal(intbv(0)[6:]),
+                      Signal(bool(0)), mem, Signal(t_state.IDLE), [])
+        insts.append(inst)
+    return insts
+
+
+def test_specialized_code():
+    i1, i2 = _instances()
+    for gen in i1.subs[:2]:
+        f = _specialize(gen.func)
+        assert f is not gen.func
+        assert f.__wrapped__ is gen.func
+        names = f.__code__.co_names
+        # signals are read and written directly
+        assert '_val' in names
+        assert '_setNextVal' in names
+    assert 'next' not in _specialize(i1.subs[0].func).__code__.co_names
+    # instances of the same block share the specialised code
+    f1 = _specialize(i1.subs[1].func)
+    f2 = _specialize(i2.subs[1].func)
+    assert f1.__code__ is f2.__code__
+    assert any(c1.cell_contents is not c2.cell_contents
+               for c1, c2 in zip(f1.__closure__, f2.__closure__))
+
+
+def test_custom_next():
+    a = Signal(intbv(0)[4:])
+    bus = TristateSignal(intbv(0)[4:])
+    drv = bus.driver()
+    x = Signal(intbv(0)[4:])
+
+    def f():
+        x.next = a + 1
+        # a driver has its own next property, which is kept
+        drv.next = a
+
+    g = _specialize(f)
+    assert g is not f
+    assert g.__code__.co_names.count('next') == 1
+
+    # objects that are not signals are left alone
+    class Node(object):
+        next = None
+    node = Node()
+
+    def h():
+        node.next = x
+
+    assert _specialize(h) is h
@@ -0,0 +1,321 @@
+""" Run the unit tests for the cycle-based Python models of toPython. """
+import importlib.util
+
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, modbv, enum, delay,
+                   instance, always, always_comb, always_seq, concat,
+                   ConcatSignal, TristateSignal, StopSimulation, toPython,
+                   ToPythonError)
+from myhdl._Simulation import Simulation
+
+t_state = enum('IDLE', 'LOAD', 'RUN', 'DONE')
+
+ROM = (3, 1, 4, 1, 5, 9, 2, 6)
+
+
+@block
+def core(clk, reset, a, b, sel, start, y, z, state, count, sq):
+
+    mem = [Signal(intbv(0)[8:]) for i in range(8)]
+    s = Signal(intbv(0, min=-64, max=64))
+    p = Signal(intbv(0)[8:])
+    q = Signal(modbv(0)[4:])
+    rd = Signal(intbv(0)[8:])
+    hi = a(6, 3)
+    cat = ConcatSignal(q, hi, sel)
+    acc = modbv(0)[10:]
+
+    @always_comb
+    def comb():
+        if sel:
+            s.next = a - b
+        else:
+            s.next = b - a if a < b else a - b
+        rd.next = mem[b[3:]]
+
+    @always_comb
+    def out():
+        y.next = concat(q, s[6:2], not sel)
+        z.next = cat + ROM[a[3:]]
+        sq.next = s.signed() * 2
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        if state == t_state.IDLE:
+            if start:
+                state.next = t_state.LOAD
+        elif state == t_state.LOAD:
+            acc[:] = 0
+            state.next = t_state.RUN
+        elif state == t_state.RUN:
+            mem[a[3:]].next = rd[6:] + b
+            p.next[8:4] = a[4:]
+            p.next[0] = sel
+            q.next = q + 5
+            for i in range(3):
+                acc[:] = acc + (rd >> i)
+            if acc > 900:
+                state.next = t_state.DONE
+        else:
+            state.next = t_state.IDLE
+        count.next = acc[10:2]
+
+    return comb, out, seq
+
+
+@block
+def bench(trace, reset):
+    clk = Signal(bool(0))
+    a = Signal(intbv(0)[6:])
+    b = Signal(intbv(0)[6:])
+    sel = Signal(bool(0))
+    start = Signal(bool(0))
+    y = Signal(intbv(0)[9:])
+    z = Signal(intbv(0)[10:])
+    sq = Signal(intbv(0, min=-256, max=256))
+    state = Signal(t_state.IDLE)
+    count = Signal(intbv(0)[8:])
+
+    dut = core(clk, reset, a, b, sel, start, y, z, state, count, sq)
+
+    @instance
+    def stim():
+        for i, inputs in enumerate(_stimulus(reset)):
+            a.next, b.next, sel.next, start.next, reset.next = inputs
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            trace.append((int(y), int(z), int(state._val), int(count),
+                          int(sq)))
+            clk.next = 0
+        raise StopSimulation()
+
+    return dut, stim
+
+
+def _stimulus(reset):
+    for i in range(300):
+        rst = i in (150, 151)
+        if not reset.active:
+            rst = not rst
+        yield ((i * 7) % 64, (i * 13 + 5) % 64, i % 3 == 0, i % 50 == 3,
+               int(rst))
+
+
+def _load(tmp_path, name):
+    spec = importlib.util.spec_from_file_location(
+        name, str(tmp_path / (name + ".py")))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, name)
+
+
+def _ports():
+    return dict(clk=Signal(bool(0)), a=Signal(intbv(0)[6:]),
+                b=Signal(intbv(0)[6:]), sel=Signal(bool(0)),
+                start=Signal(bool(0)), y=Signal(intbv(0)[9:]),
+                z=Signal(intbv(0)[10:]), state=Signal(t_state.IDLE),
+                count=Signal(intbv(0)[8:]),
+                sq=Signal(intbv(0, min=-256, max=256)))
+
+
+@pytest.mark.parametrize('isasync', [False, True])
+def test_model(tmp_path, isasync):
+    reset = ResetSignal(0, active=int(not isasync), isasync=isasync)
+    ref = []
+    Simulation(bench(ref, reset)).run(quiet=1)
+
+    reset = ResetSignal(0, active=int(not isasync), isasync=isasync)
+    inst = core(reset=reset, **_ports())
+    inst.convert(hdl='python', path=str(tmp_path))
+    model = _load(tmp_path, 'core')()
+    res = []
+    for inputs in _stimulus(reset):
+        model.a, model.b, model.sel, model.start, model.reset = inputs
+        model.posedge_clk()
+        res.append((model.y, model.z, model.state, model.count, model.sq))
+    assert res == ref
+    assert int(t_state.DONE) in (t[2] for t in ref)
+
+
+def test_step(tmp_path):
+    ports = _ports()
+    reset = ResetSignal(0, active=1, isasync=False)
+    toPython.directory = str(tmp_path)
+    toPython(core(reset=reset, **ports))
+    m1 = _load(tmp_path, 'core')()
+    m2 = _load(tmp_path, 'core')()
+    for m in (m1, m2):
+        m.a, m.b, m.start = 9, 40, 1
+    m1.step(100)
+    for i in range(100):
+        m2.posedge_clk()
+    assert m1.__dict__ == m2.__dict__
+    # conversion leaves the signals as they were
+    assert ports['y']._name is None
+
+
+@pytest.mark.parametrize('isasync', [False, True])
+def test_lanes(tmp_path, isasync):
+    np = pytest.importorskip('numpy')
+    reset = ResetSignal(0, active=int(not isasync), isasync=isasync)
+    core(reset=reset, **_ports()).convert(hdl='python', path=str(tmp_path))
+    reset = ResetSignal(0, active=int(not isasync), isasync=isasync)
+    core(reset=reset, **_ports()).convert(hdl='python', path=str(tmp_path),
+                                          name='core_lanes', lanes=16)
+    assert toPython.lanes is None
+    models = [_load(tmp_path, 'core')() for i in range(16)]
+    lanes = _load(tmp_path, 'core_lanes')()
+    rng = np.random.default_rng(3)
+    for i in range(200):
+        rst = rng.integers(0, 40, 16) == 0
+        if not reset.active:
+            rst = ~rst
+        inputs = (rng.integers(0, 64, 16), rng.integers(0, 64, 16),
+                  rng.integers(0, 2, 16), rng.integers(0, 8, 16) == 0, rst)
+        lanes.a, lanes.b, lanes.sel, lanes.start, lanes.reset = inputs
+        lanes.posedge_clk()
+        for k, m in enumerate(models):
+            m.a, m.b, m.sel, m.start, m.reset = (int(x[k]) for x in inputs)
+            m.posedge_clk()
+            assert (m.y, m.z, m.state, m.count, m.sq) == \
+                (lanes.y[k], lanes.z[k], lanes.state[k], lanes.count[k],
+                 lanes.sq[k])
+    # the lanes take different paths through the state machine
+    assert len(set(lanes.state)) > 1
+
+
+@block
+def wide(a, y):
+
+    @always_comb
+    def comb():
+        y.next = a + 1
+
+    return comb
+
+
+def test_lanes_width(tmp_path):
+    a = Signal(intbv(0)[64:])
+    y = Signal(intbv(0)[64:])
+    wide(a, y).convert(hdl='python', path=str(tmp_path))
+    with pytest.raises(ToPythonError):
+        wide(a, y).convert(hdl='python', path=str(tmp_path), lanes=8)
+
+
+@block
+def fa(a, b, ci, s, co):
+
+    @always_comb
+    def comb():
+        s.next = a ^ b ^ ci
+        co.next = (a and b) or (ci and a != b)
+
+    return comb
+
+
+@block
+def adder(clk, reset, a0, a1, b0, b1, s0, s1, s2, par, flag):
+    c0 = Signal(bool(0))
+    zero = Signal(bool(0))
+    regs = [Signal(bool(0)) for i in range(2)]
+    u0 = fa(a0, b0, zero, s0, c0)
+    u1 = fa(a1, b1, c0, s1, s2)
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        t = s0 ^ s1
+        if s2:
+            par.next = t
+            regs[0].next = not regs[1]
+        elif s1 == s0:
+            par.next = True
+        else:
+            par.next = ~par
+        regs[1].next = regs[0] if s0 else ~regs[0]
+        flag.next = regs[0] < regs[1]
+
+    return u0, u1, seq
+
+
+def _adderPorts():
+    ports = dict((n, Signal(bool(0))) for n in
+                 ('clk', 'a0', 'a1', 'b0', 'b1', 's0', 's1', 's2', 'par',
+                  'flag'))
+    ports['reset'] = ResetSignal(0, active=1, isasync=False)
+    return ports
+
+
+def test_bitslice(tmp_path):
+    adder(**_adderPorts()).convert(hdl='python', path=str(tmp_path))
+    adder(**_adderPorts()).convert(hdl='python', path=str(tmp_path),
+                                   name='adder_bits', bitslice=True)
+    assert not toPython.bitslice
+    models = [_load(tmp_path, 'adder')() for k in range(32)]
+    bits = _load(tmp_path, 'adder_bits')(32)
+    # exhaustive stimulus: lane k gets the bits of k as inputs
+    inputs = ('a0', 'a1', 'b0', 'b1', 'reset')
+    for i, n in enumerate(inputs):
+        setattr(bits, n, sum(1 << k for k in range(32) if k >> i & 1))
+    for i in range(8):
+        bits.posedge_clk()
+        for k, m in enumerate(models):
+            for j, n in enumerate(inputs):
+                setattr(m, n, k >> j & 1)
+            m.posedge_clk()
+            for n in ('s0', 's1', 's2', 'par', 'flag'):
+                assert getattr(bits, n) >> k & 1 == getattr(m, n)
+    for k in range(16):
+        a = (k & 1) + (k >> 1 & 1) * 2
+        b = (k >> 2 & 1) + (k >> 3 & 1) * 2
+        assert (bits.s0 >> k & 1) + (bits.s1 >> k & 1) * 2 + \
+            (bits.s2 >> k & 1) * 4 == a + b
+
+
+def test_bitslice_not_bool(tmp_path):
+    reset = ResetSignal(0, active=1, isasync=False)
+    with pytest.raises(ToPythonError):
+        core(reset=reset, **_ports()).convert(hdl='python', path=str(tmp_path),
+                                              bitslice=True)
+
+
+@block
+def tristate(clk, a, y):
+    bus = TristateSignal(intbv(0)[4:])
+    drv = bus.driver()
+
+    @always_seq(clk.posedge, reset=None)
+    def seq():
+        drv.next = a
+
+    @always_comb
+    def comb():
+        y.next = bus
+
+    return seq, comb
+
+
+@block
+def loop(a, y):
+    x = Signal(intbv(0)[4:])
+
+    @always_comb
+    def c1():
+        x.next = a + y
+
+    @always_comb
+    def c2():
+        y.next = x
+
+    return c1, c2
+
+
+def test_not_supported(tmp_path):
+    clk = Signal(bool(0))
+    a = Signal(intbv(0)[4:])
+    y = Signal(intbv(0)[4:])
+    with pytest.raises(ToPythonError):
+        tristate(clk, a, y).convert(hdl='python', path=str(tmp_path))
+    with pytest.raises(ToPythonError):
+        loop(a, y).convert(hdl='python', path=str(tmp_path))
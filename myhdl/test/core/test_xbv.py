@@ -0,0 +1,227 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2015 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Run the xbv unit tests. """
+import pytest
+
+from myhdl import (block, Signal, ResetSignal, intbv, xbv, delay, instance,
+                   always_comb, always_seq, StopSimulation, traceSignals)
+from myhdl import _simulator
+from myhdl._Simulation import Simulation
+
+
+class TestXbv:
+
+    def testConstruct(self):
+        a = xbv(None)[8:]
+        assert len(a) == 8
+        assert str(a) == 'xxxxxxxx'
+        b = xbv('10xz_0101')
+        assert len(b) == 8
+        assert str(b) == '10xz0101'
+        assert repr(b) == "xbv('10xz0101')"
+        c = xbv(5)[8:]
+        assert c.isknown()
+        assert int(c) == 5
+        assert not b.isknown()
+        with pytest.raises(ValueError):
+            int(b)
+
+    def testIndex(self):
+        b = xbv('10xz0101')
+        assert b[3:] == 5
+        assert b[3:].isknown()
+        assert str(b[6:4]) == 'xz'
+        assert str(b[5]) == 'x'
+        assert str(b[4]) == 'z'
+        assert b[7] is True
+        b[5] = 1
+        b[4] = 0
+        assert b == 0xa5 and b.isknown()
+        b[2] = None
+        assert str(b) == '10100x01'
+
+    def testBitwise(self):
+        b = xbv('0000xxxx')
+        # a known 0 masks X in an and, a known 1 in an or
+        assert (b & 0xf0) == 0 and (b & 0xf0).isknown()
+        assert (b | 0x0f) == 0x0f and (b | 0x0f).isknown()
+        assert str((b & 0x3)[4:]) == '00xx'
+        assert str((b | 0x3)[4:]) == 'xx11'
+        assert str((b ^ 0x3)[4:]) == 'xxxx'
+        assert str(xbv('10xz')[4:] ^ 0) == '10xx'
+        assert str((~xbv('10x1'))[4:]) == '01x0'
+        assert str((xbv('1x') << 2)[4:]) == '1x00'
+        assert (intbv(0xf0) & b) == 0
+
+    def testArith(self):
+        b = xbv('0x')
+        assert str(b + 1) == 'x'
+        assert str(1 + b) == 'x'
+        assert str(-b) == 'x'
+        c = xbv(3)[4:]
+        assert c + 1 == 4
+        assert 1 + c == 4
+        c += 1
+        assert c == 4 and len(c) == 4
+        c += b
+        assert str(c) == 'xxxx'
+
+    def testCompare(self):
+        b = xbv('10xx')
+        # known bits that differ decide the comparison
+        assert (b == 0) is False
+        assert (b != 0) is True
+        assert not (b == 0b1000)
+        assert not (b != 0b1000)
+        assert str(b == 0b1000) == 'x'
+        assert str(b < 3) == 'x'
+        assert xbv(3)[4:] < 4
+        # an unknown value is false in a condition
+        assert not xbv('x')
+        assert xbv('x1')
+
+    def testSignedUnsigned(self):
+        b = xbv('x011')
+        assert str(b.signed()[4:]) == 'x011'
+        assert str(b.signed()[6:]) == 'xxx011'
+        assert str(xbv('0x11').signed()[4:]) == '0x11'
+        s = xbv(-2, min=-8, max=8)
+        assert s.unsigned() == 14
+
+    def testSignal(self):
+        s = Signal(xbv(None)[4:])
+        assert not s.isknown()
+        s.next = 3
+        s._update()
+        assert s == 3
+        s.next = None
+        s._update()
+        assert str(s._val) == 'zzzz'
+        s.next = xbv('x1x1')
+        s._update()
+        assert str(s._val) == 'x1x1'
+        s.next = xbv('x1x1')
+        assert s._update() == []
+        with pytest.raises(ValueError):
+            s.next = 16
+
+
+@block
+def counter(clk, reset, load, d, q):
+
+    @always_seq(clk.posedge, reset=reset)
+    def seq():
+        if load:
+            q.next = d
+        else:
+            q.next = q + 1
+
+    return seq
+
+
+@block
+def bench(trace):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, isasync=False)
+    load = Signal(bool(0))
+    d = Signal(xbv(None)[8:])
+    q = Signal(xbv(None)[8:])
+    y = Signal(xbv(0)[8:])
+
+    dut = counter(clk, reset, load, d, q)
+
+    @always_comb
+    def comb():
+        y.next = q & 0x0f
+
+    @instance
+    def stim():
+        for i in range(8):
+            load.next = i == 3
+            d.next = 0x2d if i >= 2 else None
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            trace.append((str(q.val), str(y.val)))
+            clk.next = 0
+        raise StopSimulation()
+
+    return dut, comb, stim
+
+
+@pytest.mark.parametrize('specialize', [False, True])
+def testPropagation(specialize):
+    trace = []
+    # specialized blocks keep the xbv operators
+    Simulation(bench(trace), specialize=specialize,
+               fsm_dispatch=specialize).run(quiet=1)
+    assert trace[:3] == [('xxxxxxxx', '0000xxxx')] * 3
+    # known values print as for intbv
+    assert trace[3:] == [('2d', '0d'), ('2e', '0e'), ('2f', '0f'),
+                         ('30', '00'), ('31', '01')]
+
+
+@block
+def edges(clk, count):
+
+    @instance
+    def logic():
+        while True:
+            yield clk.posedge
+            count[0] += 1
+
+    return logic
+
+
+def testEdges():
+    clk = Signal(xbv('0'))
+    count = [0]
+    levels = ['x', '1', '0', 'x', '0', '1', 'z', '0']
+
+    @instance
+    def stim():
+        for v in levels:
+            yield delay(10)
+            clk.next = xbv(v)
+        yield delay(10)
+        raise StopSimulation()
+
+    Simulation(edges(clk, count), stim).run(quiet=1)
+    # 0->x, x->1, 0->x, 0->1, but not 1->z or x->0
+    assert count[0] == 4
+
+
+@pytest.fixture
+def vcd_dir(tmpdir):
+    with tmpdir.as_cwd():
+        yield tmpdir
+    if _simulator._tracing:
+        _simulator._tf.close()
+        _simulator._tracing = 0
+
+
+def testVcd(vcd_dir):
+    trace = []
+    Simulation(traceSignals(bench(trace))).run(quiet=1)
+    with open('bench.vcd') as f:
+        vcd = f.read()
+    assert 'bxxxxxxxx ' in vcd
+    assert 'b0000xxxx ' in vcd
+    assert 'b00101101 ' in vcd
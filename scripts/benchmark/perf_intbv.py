@@ -0,0 +1,94 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2008 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Microbenchmarks for the intbv arithmetic and bit access methods.
+
+Usage: python perf_intbv.py [number]
+
+Each line reports the time per call in nanoseconds.
+"""
+import sys
+import timeit
+
+SETUP = """
+from copy import copy
+from myhdl import intbv, modbv
+a = intbv(0x5a)[8:]
+b = intbv(0x33)[8:]
+s = intbv(-3, min=-128, max=128)
+m = modbv(0x5a)[8:]
+"""
+
+STMTS = (
+    # construction
+    "intbv(5)",
+    "intbv(5)[8:]",
+    "intbv(5, min=-16, max=16)",
+    "copy(a)",
+    # arithmetic, returning int
+    "a + b",
+    "a - b",
+    "a * b",
+    "a // b",
+    "a % b",
+    "a + 1",
+    "1 + a",
+    "-s",
+    # bitwise, returning intbv
+    "a & b",
+    "a | b",
+    "a ^ b",
+    "a & 0xf",
+    "a << 2",
+    "a >> 2",
+    "~a",
+    # indexing and slicing
+    "a[3]",
+    "a[6:2]",
+    "a[4:]",
+    "m[6:2]",
+    "a.signed()",
+    "s.unsigned()",
+    "list(a)",
+    # in-place, with bounds handling
+    "a[6:2] = 5",
+    "a[3] = 1",
+    "m += 1",
+    "a &= 0xff",
+    # comparisons and conversions
+    "a == b",
+    "a < 100",
+    "int(a)",
+    "bool(a)",
+    "len(a)",
+)
+
+
+def main(number=200000):
+    width = max(len(stmt) for stmt in STMTS)
+    for stmt in STMTS:
+        t = min(timeit.repeat(stmt, SETUP, repeat=3, number=number))
+        print("%-*s %8.1f ns" % (width, stmt, t / number * 1e9))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()